@@ -0,0 +1,60 @@
+"""Throughput of the transaction journal.
+
+Scans random items on a checkout with a journal attached and reports
+the number of scan events per second for several group commit sizes,
+next to the same scans without a journal. Every group commit fsyncs
+the journal, so the results depend heavily on the disk.
+
+Run from any directory:
+    python benchmarks/bench_journal.py [--events N] [--directory DIR]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from checkout import Checkout
+from journal import TransactionJournal
+
+
+def scanEvents(checkout_, itemCodes):
+    """Scan every item code and return the elapsed seconds"""
+
+    start = time.perf_counter()
+    for itemCode in itemCodes:
+        checkout_.scan(itemCode, "weak")
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--directory", default=None,
+                        help="directory of the journal files, a temporary directory by default")
+    arguments = parser.parse_args()
+
+    itemCodes = [random.choice("ABP") for event in range(arguments.events)]
+    elapsed = scanEvents(Checkout(), itemCodes)
+    print("no journal          {:10.0f} events/s".format(arguments.events / elapsed))
+
+    with tempfile.TemporaryDirectory(dir=arguments.directory) as directory:
+        for groupSize in [1, 16, 256, 4096]:
+            path = os.path.join(directory, "bench{}.journal".format(groupSize))
+            journal = TransactionJournal(path, groupSize=groupSize, commitInterval=1.)
+            checkout_ = Checkout()
+            journal.attach(checkout_, "bench")
+            elapsed = scanEvents(checkout_, itemCodes)
+            start = time.perf_counter()
+            journal.close()
+            elapsed += time.perf_counter() - start
+            print("groupSize {:<9} {:10.0f} events/s, {:8d} bytes".format(
+                groupSize, arguments.events / elapsed, os.path.getsize(path)))
+
+
+if __name__ == "__main__":
+    main()
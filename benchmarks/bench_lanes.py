@@ -0,0 +1,80 @@
+"""Throughput of the lane server with many simulated lanes.
+
+Starts a lane server in this process and connects one client per lane.
+Every lane scans random items and checks out repeatedly, waiting for
+each response before sending the next request, as a till would. Reports
+requests per second and the median and 99th percentile latency.
+
+Run from any directory:
+    python benchmarks/bench_lanes.py [--lanes N] [--transactions N] [--items N] [--socket PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from laneserver import LaneServer, SessionManager
+
+
+async def simulateLane(laneId, connect, transactions, items, latencies):
+    """Run the transactions of one lane over its own connection"""
+
+    reader, writer = await connect()
+    for transaction in range(transactions):
+        requests = [{"lane": laneId, "op": "scan", "item": random.choice("ABP")} for item in range(items)]
+        requests.append({"lane": laneId, "op": "checkout"})
+        for request in requests:
+            start = time.perf_counter()
+            writer.write(json.dumps(request).encode("utf-8") + b"\n")
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - start)
+            if (not response["ok"]):
+                raise RuntimeError(response)
+    writer.close()
+    await writer.wait_closed()
+
+
+async def run(arguments):
+    server = LaneServer(SessionManager(maxSessions=max(arguments.lanes, 1)))
+    listening = await server.start(arguments.socket)
+    if (arguments.socket is not None):
+        connect = lambda: asyncio.open_unix_connection(arguments.socket)
+    else:
+        port = listening.sockets[0].getsockname()[1]
+        connect = lambda: asyncio.open_connection("127.0.0.1", port)
+
+    latencies = []
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(simulateLane(str(lane), connect, arguments.transactions, arguments.items, latencies)
+                               for lane in range(arguments.lanes)))
+    finally:
+        await server.close()
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    print("{} lanes, {} requests in {:.2f} s: {:.0f} requests/s".format(
+        arguments.lanes, len(latencies), elapsed, len(latencies) / elapsed))
+    print("latency median {:.3f} ms, p99 {:.3f} ms".format(
+        statistics.median(latencies) * 1000, latencies[int(len(latencies) * 0.99)] * 1000))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lanes", type=int, default=200)
+    parser.add_argument("--transactions", type=int, default=5)
+    parser.add_argument("--items", type=int, default=10)
+    parser.add_argument("--socket", default=None, help="Unix domain socket path, TCP on 127.0.0.1 by default")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Insert rate and report latency of the sales ledger.
+
+Records a year of random transactions in a fresh ledger, then times
+the report of revenue and savings by item code over a day, a month and
+the whole year.
+
+Run from any directory:
+    python benchmarks/bench_ledger.py [--per-day N] [--batch-size N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from checkout import Checkout
+from ledger import SalesLedger
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--per-day", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    arguments = parser.parse_args()
+
+    # A handful of baskets priced once, recorded many times
+    baskets = []
+    for index in range(20):
+        checkout_ = Checkout()
+        checkout_.scanMany(random.choice("ABP") for item in range(random.randint(1, 15)))
+        baskets.append(checkout_)
+
+    firstDay = datetime(2023, 1, 1, 8)
+    with tempfile.TemporaryDirectory() as directory:
+        ledger = SalesLedger(os.path.join(directory, "sales.db"), arguments.batch_size)
+        start = time.perf_counter()
+        for day in range(365):
+            opening = (firstDay + timedelta(days=day)).timestamp()
+            for transaction in range(arguments.per_day):
+                ledger.recordTransaction(random.choice(baskets), "bench", opening + transaction * 43200 / arguments.per_day)
+        ledger.flush()
+        elapsed = time.perf_counter() - start
+        numberOfTransactions = 365 * arguments.per_day
+        print("recorded {} transactions in {:.1f} s ({:.0f} transactions/s)".format(
+            numberOfTransactions, elapsed, numberOfTransactions / elapsed))
+
+        for name, startDate, endDate in [("one day", date(2023, 6, 1), date(2023, 6, 1)),
+                                         ("one month", date(2023, 6, 1), date(2023, 6, 30)),
+                                         ("one year", date(2023, 1, 1), date(2023, 12, 31))]:
+            start = time.perf_counter()
+            ledger.revenueBySku(startDate, endDate)
+            print("revenueBySku over {:<9} {:8.2f} ms".format(name, (time.perf_counter() - start) * 1000))
+        ledger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Memory used by many checkout lanes sharing a large catalogue.
+
+Builds a catalogue of synthetic items and measures, with tracemalloc,
+the memory of the items and of many copies of a Checkout (one per
+lane) with the dictionary basket and with the compact array basket.
+
+Run from any directory:
+    python benchmarks/bench_memory.py [--items N] [--lanes N]
+"""
+
+import argparse
+import os
+import sys
+import tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from catalogue import Catalogue
+from checkout import Checkout
+from item import Item
+
+
+class DictItem():
+    """Item with the same attributes as Item but with a __dict__"""
+
+    def __init__(self, code, price, multibuyMinimumPopulation, offerOnPopulation, offerOnPrice, name="", imagePath=""):
+        self._code = code
+        self._name = name
+        self._imagePath = imagePath
+        self._price = price
+        self._multibuyMinimumPopulation = multibuyMinimumPopulation
+        self._offerOnPopulation = offerOnPopulation
+        self._offerOnPrice = offerOnPrice
+        self._costTable = None
+
+
+def makeCatalogue(numberOfItems):
+    """Return a catalogue of numberOfItems synthetic items"""
+
+    records = []
+    for index in range(numberOfItems):
+        records.append({"code": "SKU{:06d}".format(index), "name": "Item {}".format(index), "image": "",
+                        "price": 10 + index % 90, "multibuyMinimumPopulation": 1 + index % 3,
+                        "offerOnPopulation": 0, "offerOnPrice": 0})
+    return Catalogue(records)
+
+
+def measure(function):
+    """Return (result, bytes allocated and still alive) of a call"""
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = function()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=40000)
+    parser.add_argument("--lanes", type=int, default=100)
+    arguments = parser.parse_args()
+
+    catalogue_ = makeCatalogue(arguments.items)
+    codes = list(catalogue_.getItems())
+
+    # The codes are not built-in, so the items are built as a Catalogue does
+    names = {code: catalogue_.getItem(code).getName() for code in codes}
+    _, slotsBytes = measure(lambda: [Item.trusted(code, 25, 3, 2, 0, name=names[code], imagePath="") for code in codes])
+    _, dictBytes = measure(lambda: [DictItem(code, 25, 3, 2, 0, names[code], "") for code in codes])
+    print("{} items: {:.1f} MB with __slots__, {:.1f} MB with __dict__ ({:.0%} less)".format(
+        arguments.items, slotsBytes / 1e6, dictBytes / 1e6, 1 - slotsBytes / dictBytes))
+
+    results = {}
+    for compactBasket in [False, True]:
+        def openLanes():
+            original = Checkout(None, catalogue_, compactBasket)
+            original.scanMany(codes[:20])
+            return [Checkout(orig=original) for lane in range(arguments.lanes)]
+        _, results[compactBasket] = measure(openLanes)
+        print("{} lanes with a {} basket: {:.1f} MB".format(
+            arguments.lanes, "compact" if compactBasket else "dictionary", results[compactBasket] / 1e6))
+    print("Compact baskets use {:.0%} less memory".format(1 - results[True] / results[False]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Cold start time of the point of sale application.
+
+Measures in fresh interpreters the import time of the modules on the
+path to the first scan, as reported by python -X importtime, and, if a
+display is available, the time until the customer page is first drawn.
+
+Run from any directory:
+    python benchmarks/bench_startup.py [--runs N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+# Replaces the main loop with a single redraw so that the process exits
+# as soon as the page has been drawn once
+FIRST_FRAME_SCRIPT = """
+import time
+start = time.perf_counter()
+import tkinter as tk
+def firstFrame(self, n=0):
+    self.update()
+    print(time.perf_counter() - start)
+    self.destroy()
+tk.Tk.mainloop = firstFrame
+import customerpage
+customerpage.CustomerPage()
+"""
+
+
+def importTimes(statement):
+    """Return a dictionary with module names as keys and cumulative
+    import times in microseconds as values for one run of statement
+    """
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=SOURCE, capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if (not line.startswith("import time:") or "cumulative" in line):
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    arguments = parser.parse_args()
+
+    for module in ["checkout", "headless", "customerpage"]:
+        runs = [importTimes("import " + module)[module] for run in range(arguments.runs)]
+        print("import {:<13} {:8.1f} ms (median of {} runs)".format(module, statistics.median(runs) / 1000, arguments.runs))
+
+    if (os.environ.get("DISPLAY") or sys.platform in ["win32", "darwin"]):
+        runs = []
+        for run in range(arguments.runs):
+            result = subprocess.run([sys.executable, "-c", FIRST_FRAME_SCRIPT], cwd=SOURCE,
+                                    capture_output=True, text=True, check=True)
+            runs.append(float(result.stdout.strip().splitlines()[-1]))
+        print("first frame of the customer page {:8.1f} ms (median of {} runs)".format(
+            statistics.median(runs) * 1000, arguments.runs))
+    else:
+        print("no display: time to first frame not measured")
+
+
+if __name__ == "__main__":
+    main()
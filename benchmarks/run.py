@@ -0,0 +1,274 @@
+"""Benchmark suite of the checkout engine and of the signal path.
+
+Times Checkout.scan, total, checkout and copyTo, their unchecked
+versions on the trusted view of the checkout, and the fan-out of a
+signal to its listeners, for several catalogue and basket sizes. The
+listeners are stubs doing the work of ItemInfoCard and
+BasketTotalWidget without tkinter. With --gui and a display (e.g.
+under Xvfb), the fan-out to the real widgets is timed too.
+
+Every run is appended to a JSON history together with the git commit
+it was run on, and compared with the last run of a different commit,
+so that regressions stand out.
+
+Run from any directory:
+    python benchmarks/run.py [--quick] [--filter TEXT] [--gui] [--history FILE]
+
+Under Xvfb:
+    xvfb-run python benchmarks/run.py --gui
+"""
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from catalogue import Catalogue
+from checkout import Checkout
+from item import Item
+
+
+class StubCard():
+    """Listener doing the work of ItemInfoCard.slot without tkinter"""
+
+    def __init__(self, itemCode):
+        self.itemCode = itemCode
+
+    def slot(self, checkout, signalStrength="strong", changedItems=None):
+        if (not isinstance(checkout, Checkout)):
+            raise TypeError
+        if (changedItems is not None and not self.itemCode in changedItems):
+            return
+        self.itemPopulation = checkout.getNumberOfItems(self.itemCode)
+        self.itemTotals = checkout.total(self.itemCode)
+
+
+class StubTotal():
+    """Listener doing the work of BasketTotalWidget.slot without tkinter"""
+
+    def slot(self, checkout, signalStrength="strong", changedItems=None):
+        if (not isinstance(checkout, Checkout)):
+            raise TypeError
+        self.totals = checkout.total()
+
+
+def makeCatalogue(numberOfItems):
+    """Return a catalogue of numberOfItems synthetic items"""
+
+    records = []
+    for index in range(numberOfItems):
+        records.append({"code": "BENCH{:06d}".format(index), "name": "Item {}".format(index), "image": "",
+                        "price": 10 + index % 90, "multibuyMinimumPopulation": 1 + index % 3,
+                        "offerOnPopulation": 0, "offerOnPrice": 0})
+    return Catalogue(records)
+
+
+def makeCheckout(catalogue_, basketSize):
+    """Return a checkout on catalogue_ with basketSize items spread
+    over as many categories as possible
+    """
+
+    checkout_ = Checkout(None, catalogue_)
+    itemCodes = list(catalogue_.getItems())
+    checkout_.scanMany(itemCodes[index % len(itemCodes)] for index in range(basketSize))
+    return checkout_
+
+
+def engineCases(catalogueSize, basketSize):
+    """Yield (name, function) pairs timing the engine on one catalogue
+    and basket size
+    """
+
+    catalogue_ = makeCatalogue(catalogueSize)
+    itemCodes = list(catalogue_.getItems())
+    checkout_ = makeCheckout(catalogue_, basketSize)
+    nextCode = itertools.cycle(itemCodes[:basketSize]).__next__
+    suffix = "[catalogue={},basket={}]".format(catalogueSize, basketSize)
+
+    yield "scan" + suffix, lambda: checkout_.scan(nextCode())
+    yield "total" + suffix, lambda: checkout_.total()
+    yield "totalItem" + suffix, lambda: checkout_.total(itemCodes[0])
+
+    # Only the categories in the basket, as the checkout button passes
+    basket = {itemCode: checkout_.getNumberOfItems(itemCode) for itemCode in checkout_.getItemCategoriesInBasket()}
+    prices = {itemCode: catalogue_.getItem(itemCode).getPrice() for itemCode in checkout_.getItemCategoriesInBasket()}
+    yield "checkout" + suffix, lambda: checkout_.checkout(basket, prices)
+
+    # The same calls without validation
+    trusted = checkout_.trusted()
+    yield "trustedScan" + suffix, lambda: trusted.scan(nextCode())
+    yield "trustedTotalItem" + suffix, lambda: trusted.total(itemCodes[0])
+    yield "trustedCheckout" + suffix, lambda: trusted.checkout(basket)
+
+    target = Checkout(None, catalogue_)
+    yield "copyTo" + suffix, lambda: checkout_.copyTo(target)
+
+    # One card per item of the catalogue, subscribed to its item, and
+    # one basket total, as on the staff page
+    listening = makeCheckout(catalogue_, basketSize)
+    for itemCode in itemCodes:
+        listening.register(StubCard(itemCode), [itemCode])
+    listening.register(StubTotal())
+    yield "scanFanOut" + suffix, lambda: listening.scan(nextCode())
+    yield "signalFanOut" + suffix, lambda: listening.signal()
+
+
+def itemCases():
+    """Yield (name, function) pairs timing the construction of items
+    with and without validation
+    """
+
+    yield "itemInit", lambda: Item("B", 40, 3, 0, 100)
+    yield "itemTrusted", lambda: Item.trusted("B", 40, 3, 0, 100)
+
+
+def guiCases():
+    """Yield (name, function) pairs timing the fan-out of a signal to
+    the real widgets, or nothing if there is no display
+    """
+
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except (ImportError, RuntimeError) as error:
+        print("no display: GUI benchmarks skipped ({})".format(error))
+        return
+    except tk.TclError as error:
+        print("no display: GUI benchmarks skipped ({})".format(error))
+        return
+
+    import baskettotalwidget
+    import basketview
+    os.chdir(os.path.join(ROOT, "src"))
+    root.withdraw()
+    frame = tk.Frame(root)
+    checkout_ = Checkout()
+    itemsCatalogue = checkout_.getItemsCatalogue()
+    # The basket list and total of the customer page
+    view = basketview.BasketView(frame, checkout_)
+    view.pack(fill="both", expand=True)
+    checkout_.register(view)
+    checkout_.register(baskettotalwidget.BasketTotalWidget(frame))
+    checkout_.scanMany(["A", "B", "P"])
+    nextCode = itertools.cycle(list(itemsCatalogue)).__next__
+    yield "guiScanFanOut", lambda: checkout_.scan(nextCode())
+    yield "guiSignalFanOut", lambda: checkout_.signal()
+
+
+def timePerCall(function, repeat):
+    """Return the best time in seconds of one call of function"""
+
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def gitCommit():
+    """Return the current git commit, marked -dirty if the tree has
+    uncommitted changes, or "unknown" outside of a git checkout
+    """
+
+    try:
+        result = subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def loadHistory(path):
+    """Return the list of runs in the history file"""
+
+    if (not os.path.exists(path)):
+        return []
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+
+def saveHistory(path, history):
+    """Write the history file atomically"""
+
+    temporaryPath = path + ".tmp"
+    with open(temporaryPath, "w", encoding="utf-8") as file:
+        json.dump(history, file, indent=1)
+    os.replace(temporaryPath, path)
+
+
+def compare(results, previous, threshold):
+    """Print the ratio of every result to the previous run and return
+    the names of the benchmarks that got slower than threshold
+    """
+
+    print("\ncompared with {} ({})".format(previous["commit"], previous["timestamp"]))
+    regressions = []
+    for name, seconds in results.items():
+        if (not name in previous["results"]):
+            continue
+        ratio = seconds / previous["results"][name]
+        flag = ""
+        if (ratio > threshold):
+            flag = "  SLOWER"
+            regressions.append(name)
+        elif (ratio < 1 / threshold):
+            flag = "  faster"
+        print("{:<50} {:6.2f}x{}".format(name, ratio, flag))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="fewer sizes and repeats")
+    parser.add_argument("--filter", default="", help="only run benchmarks whose name contains this text")
+    parser.add_argument("--gui", action="store_true", help="also time the real widgets (needs a display)")
+    parser.add_argument("--history", default=os.path.join(ROOT, "benchmarks", "history.json"),
+                        help="JSON history of the runs (default: benchmarks/history.json)")
+    parser.add_argument("--no-save", action="store_true", help="do not append this run to the history")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="slowdown ratio reported as a regression (default: 1.2)")
+    arguments = parser.parse_args()
+
+    if (arguments.quick):
+        sizes = [(3, 10), (1000, 100)]
+        repeat = 3
+    else:
+        sizes = [(3, 10), (3, 1000), (100, 10), (100, 1000), (10000, 100), (10000, 10000)]
+        repeat = 5
+    cases = itertools.chain.from_iterable(engineCases(catalogueSize, basketSize) for catalogueSize, basketSize in sizes)
+    cases = itertools.chain(itemCases(), cases)
+    if (arguments.gui):
+        cases = itertools.chain(cases, guiCases())
+
+    results = {}
+    for name, function in cases:
+        if (not arguments.filter in name):
+            continue
+        results[name] = timePerCall(function, repeat)
+        print("{:<50} {:10.3f} us".format(name, results[name] * 1e6))
+
+    history = loadHistory(arguments.history)
+    commit = gitCommit()
+    previousRuns = [run for run in history if run["commit"] != commit]
+    regressions = []
+    if (previousRuns):
+        regressions = compare(results, previousRuns[-1], arguments.threshold)
+
+    if (not arguments.no_save):
+        history.append({"commit": commit,
+                        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+                        "python": platform.python_version(),
+                        "machine": platform.machine(),
+                        "results": results})
+        saveHistory(arguments.history, history)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
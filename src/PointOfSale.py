@@ -10,12 +10,73 @@ The application allows advanced controls on the basket via a store
 page that needs staff credentials to open. In that page, staff can
 remove items from the basket and either confirm the changes or return
 to the main page without affecting the basket.
+
+With --headless, the checkout engine runs without a graphical user
+interface (and without importing tkinter) on scan events read from a
+file or the standard input, and prints the totals of every transaction.
+See headless.py for the format of the events.
+
+With --serve, the checkouts of many lanes run in one back-office
+process that answers requests on a local socket. See laneserver.py for
+the protocol.
+
+With --instrument, the latencies of the path from a scan to the repaint
+of the screen are recorded and dumped on the standard error when the
+process receives SIGUSR1. See instrumentation.py.
 """
 
-import customerpage
+import argparse
+import sys
+
+def Main(arguments=None):
+ parser = argparse.ArgumentParser(description="Point of sale application")
+ parser.add_argument("--headless", action="store_true",
+   help="run the checkout engine on scan events without the graphical user interface")
+ parser.add_argument("--serve", action="store_true",
+   help="run the checkouts of many lanes in a server answering JSON lines on a local socket")
+ parser.add_argument("--socket", metavar="PATH",
+   help="Unix domain socket of the lane server (default: TCP on 127.0.0.1)")
+ parser.add_argument("--port", type=int, default=8765,
+   help="TCP port of the lane server on 127.0.0.1")
+ parser.add_argument("--input", metavar="FILE",
+   help="file with the scan events of the headless mode (default: standard input)")
+ parser.add_argument("--catalogue", metavar="FILE",
+   help="CSV, JSON or SQLite items catalogue of the headless mode and of the lane server")
+ parser.add_argument("--journal", metavar="FILE",
+   help="transaction journal from which an interrupted basket is recovered and to which basket changes are written")
+ parser.add_argument("--ledger", metavar="FILE",
+   help="SQLite sales ledger in which the completed transactions are recorded for reporting")
+ parser.add_argument("--scanner", metavar="PATH",
+   help="FIFO, serial device or Unix domain socket from which barcode scans are read")
+ parser.add_argument("--price-updates", metavar="FILE",
+   help="JSON file of price and offer updates applied whenever it changes")
+ parser.add_argument("--instrument", action="store_true",
+   help="record latency histograms, dumped on SIGUSR1 (and at the end of the headless mode)")
+ options = parser.parse_args(arguments)
+
+ instrumentation_ = None
+ if (options.instrument and (options.serve or options.headless)):
+  import instrumentation
+  instrumentation_ = instrumentation.getSharedInstrumentation()
+  instrumentation_.enable(widgets=False)
+  instrumentation_.installSignalHandler()
+
+ if (options.serve):
+  import laneserver
+  return laneserver.main(options.socket, options.port, options.catalogue)
+
+ if (options.headless):
+  import headless
+  try:
+   return headless.main(options.input, options.catalogue, options.journal, options.ledger)
+  finally:
+   if (instrumentation_ is not None):
+    instrumentation_.dump()
 
-def Main():
- guiApplication = customerpage.CustomerPage()
+ import customerpage
+ guiApplication = customerpage.CustomerPage(options.journal, options.ledger, options.scanner, options.price_updates,
+   options.instrument)
+ return 0
 
 if __name__ == "__main__":
-  Main()
\ No newline at end of file
+  sys.exit(Main())
\ No newline at end of file
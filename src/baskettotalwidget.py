@@ -10,7 +10,7 @@ class BasketTotalWidget(tk.Frame):
       savingsLabel (tkinter Label): Displays basket savings in pence
 
     Methods:
-        slot(self, checkout, signalStrength="strong"):
+        slot(self, checkout, signalStrength="strong", changedItems=None):
         _getAll(self):
         _setAll(self, other):
         _update(self, checkout):
@@ -24,7 +24,7 @@ class BasketTotalWidget(tk.Frame):
                 which this widget will be displayed.
 
         Methods:
-            slot(self, signalStrength = "strong")
+            slot(self, checkout, signalStrength = "strong", changedItems = None)
         """
 
         tk.Frame.__init__(self, parent, bg="white", highlightbackground="#F2F2F2", highlightthickness=5)
@@ -39,7 +39,7 @@ class BasketTotalWidget(tk.Frame):
         self.savingsLabel = tk.Label(self, bg="white", anchor=tk.E, font="Calibri 20 bold", fg="#76B620")
         self.savingsLabel.grid(row=1, column=0, sticky="news", padx=0, pady=0)
 
-    def slot(self, checkout, signalStrength="strong"):
+    def slot(self, checkout, signalStrength="strong", changedItems=None):
         """Method triggered by the signal of the checkout class"""
         if (not isinstance(checkout, Checkout)):
             raise TypeError
@@ -0,0 +1,246 @@
+import tkinter as tk
+import iteminfocard
+import rowallocator
+from checkout import Checkout
+
+class BasketView(tk.Frame):
+    """Scrollable list of the item categories in a basket.
+
+    The view has one row per item category in the basket but only
+    creates ItemInfoCard widgets for the rows that fit in its viewport.
+    The cards form a pool which is recycled as the basket changes or
+    the list is scrolled: every card is bound to the item of the row it
+    shows with ItemInfoCard.setItem. The memory used by the view and
+    the cost of an update therefore depend on the height of the view,
+    not on the size of the basket or of the items catalogue.
+
+    The view is registered with the checkout as a listener of the whole
+    basket, since it must know of every category added or emptied.
+    The rows are kept by a RowAllocator, so adding, removing or moving
+    a row and finding the item of a row cost O(log n), without asking
+    tkinter about its grid. Rows are in the order in which their
+    categories were added ("insertion"), with new categories taking the
+    first emptied row ("firstFree") or with the categories scanned last
+    at the top ("recentFirst"). The view scrolls to show a category
+    when it is added.
+
+    Attributes:
+        _checkout (Checkout instance): The checkout whose basket is
+            shown.
+        _rowHeight (int): Height of a row in pixels.
+        _viewport (tkinter Frame): Frame in which the cards are placed.
+        _scrollbar (tkinter Scrollbar): Vertical scrollbar of the list.
+        _scrollTag (str): Binding tag of the widgets that scroll the
+            list with the mouse wheel.
+        _rows (RowAllocator instance): Codes of the item categories in
+            the basket in the order of the rows.
+        _order (str): Ordering policy of the rows.
+        _firstRow (int): Index of the row at the top of the viewport.
+        _visibleRows (int): Number of rows that fit in the viewport.
+        _pool (list): ItemInfoCard instances, one per visible row.
+        _cardItems (list): Code of the item shown by every card of the
+            pool, or None if the card is not placed.
+
+    Methods:
+        slot(self, checkout, signalStrength="strong", changedItems=None)
+
+        getRows(self)
+
+        getPoolSize(self)
+
+        scrollTo(self, row)
+    """
+
+    def __init__(self, parent, checkout, rowHeight=110, order="insertion"):
+        """Initialise an empty view.
+
+        Parameters:
+            parent (tkinter widget): Widget in which the view is placed.
+
+            checkout (Checkout instance): The checkout whose basket is
+                shown. The view must be registered with it.
+
+            rowHeight (int): Height of a row in pixels.
+
+            order (str): "insertion", "firstFree" or "recentFirst", the
+                ordering policy of the rows.
+        """
+
+        tk.Frame.__init__(self, parent, bg="white", bd=0)
+
+        if (not isinstance(checkout, Checkout)):
+            raise TypeError
+        if (not isinstance(rowHeight, int)):
+            raise TypeError
+        if (rowHeight <= 0):
+            raise ValueError
+
+        self._checkout = checkout
+        self._rowHeight = rowHeight
+        self._rows = rowallocator.RowAllocator(order)
+        self._order = order
+        self._firstRow = 0
+        self._visibleRows = 1
+        self._pool = []
+        self._cardItems = []
+
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+        self.columnconfigure(1, weight=0)
+
+        self._viewport = tk.Frame(self, bg="white", bd=0)
+        self._viewport.grid(row=0, column=0, sticky="news")
+        self._viewport.bind("<Configure>", self._onResize)
+
+        self._scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self._onScroll)
+        self._scrollbar.grid(row=0, column=1, sticky="ns")
+
+        # The cards are created later, so the mouse wheel is bound to
+        # a tag that every card is given
+        self._scrollTag = "BasketView{}".format(id(self))
+        self.bind_class(self._scrollTag, "<MouseWheel>", self._onMouseWheel)
+        self.bind_class(self._scrollTag, "<Button-4>", lambda event: self._scrollBy(-1))
+        self.bind_class(self._scrollTag, "<Button-5>", lambda event: self._scrollBy(1))
+        self._addScrollTag(self._viewport)
+
+    def slot(self, checkout, signalStrength="strong", changedItems=None):
+        """Method triggered by the signal of the checkout class"""
+
+        if (not isinstance(checkout, Checkout)):
+            raise TypeError
+        if (not isinstance(signalStrength, str)):
+            raise TypeError
+        if (not signalStrength in ["weak", "strong"]):
+            raise ValueError
+
+        self._checkout = checkout
+        if (changedItems is None):
+            # Anything may have changed, e.g. after a copy of a basket
+            categories = checkout.getItemCategoriesInBasket()
+            inBasket = set(categories)
+            for itemCode in self._rows.keys():
+                if (not itemCode in inBasket):
+                    self._rows.remove(itemCode)
+            for itemCode in categories:
+                if (not itemCode in self._rows):
+                    self._rows.add(itemCode)
+        else:
+            shownItem = None
+            for itemCode in sorted(changedItems):
+                if (checkout.getNumberOfItems(itemCode) > 0):
+                    if (not itemCode in self._rows):
+                        self._rows.add(itemCode)
+                        shownItem = itemCode
+                    elif (self._order == "recentFirst"):
+                        self._rows.touch(itemCode)
+                        shownItem = itemCode
+                elif (itemCode in self._rows):
+                    self._rows.remove(itemCode)
+            if (shownItem is not None):
+                self._showRow(self._rows.rowOf(shownItem))
+        self._refresh(signalStrength, changedItems)
+
+    def getRows(self):
+        """Return the list of the item codes of the rows"""
+
+        return self._rows.keys()
+
+    def getPoolSize(self):
+        """Return the number of cards created by the view"""
+
+        return len(self._pool)
+
+    def scrollTo(self, row):
+        """Show row at the top of the viewport, or as near the top as
+        the number of rows allows
+        """
+
+        if (not isinstance(row, int)):
+            raise TypeError
+        self._firstRow = row
+        self._refresh("strong", None)
+
+    def _showRow(self, row):
+        """Scroll the least needed to show row"""
+
+        if (row < self._firstRow):
+            self._firstRow = row
+        elif (row >= self._firstRow + self._visibleRows):
+            self._firstRow = row - self._visibleRows + 1
+
+    def _scrollBy(self, rows):
+        """Scroll the list by a number of rows"""
+
+        self.scrollTo(self._firstRow + rows)
+
+    def _onScroll(self, action, amount, unit=None):
+        """Command of the scrollbar"""
+
+        if (action == "moveto"):
+            self.scrollTo(int(float(amount) * len(self._rows)))
+        elif (action == "scroll"):
+            self._scrollBy(int(amount) * (self._visibleRows if unit == "pages" else 1))
+
+    def _onMouseWheel(self, event):
+        """Scroll with the mouse wheel on Windows and macOS"""
+
+        self._scrollBy(-1 if event.delta > 0 else 1)
+
+    def _onResize(self, event):
+        """Fit the pool of cards to the new height of the viewport"""
+
+        visibleRows = max(1, -(-event.height // self._rowHeight))
+        if (visibleRows != self._visibleRows):
+            self._visibleRows = visibleRows
+            self._refresh("strong", None)
+
+    def _addScrollTag(self, widget):
+        """Let widget and its children scroll the list"""
+
+        widget.bindtags(widget.bindtags() + (self._scrollTag,))
+        for child in widget.winfo_children():
+            self._addScrollTag(child)
+
+    def _newCard(self, item):
+        """Return a new card of the pool"""
+
+        card = iteminfocard.ItemInfoCard(self._viewport, item, "basketView")
+        self._addScrollTag(card)
+        self._pool.append(card)
+        self._cardItems.append(None)
+        return card
+
+    def _refresh(self, signalStrength, changedItems):
+        """Bind the cards of the pool to the visible rows and update the
+        cards whose item changed
+        """
+
+        self._firstRow = max(0, min(self._firstRow, len(self._rows) - self._visibleRows))
+        itemsCatalogue = self._checkout.getItemsCatalogue()
+        for position in range(max(self._visibleRows, len(self._pool))):
+            row = self._firstRow + position
+            itemCode = self._rows.keyAt(row) if (position < self._visibleRows and row < len(self._rows)) else None
+            if (itemCode is None):
+                if (position < len(self._pool) and self._cardItems[position] is not None):
+                    self._pool[position].place_forget()
+                    self._cardItems[position] = None
+                continue
+
+            if (position < len(self._pool)):
+                card = self._pool[position]
+            else:
+                card = self._newCard(itemsCatalogue[itemCode])
+            if (self._cardItems[position] is None):
+                card.place(x=0, y=position * self._rowHeight, relwidth=1, height=self._rowHeight)
+            if (self._cardItems[position] != itemCode):
+                card.setItem(itemsCatalogue[itemCode])
+                card.slot(self._checkout, signalStrength)
+            elif (changedItems is None or itemCode in changedItems):
+                card.slot(self._checkout, signalStrength)
+            self._cardItems[position] = itemCode
+
+        if (self._rows):
+            self._scrollbar.set(self._firstRow / len(self._rows),
+                                min(1., (self._firstRow + self._visibleRows) / len(self._rows)))
+        else:
+            self._scrollbar.set(0., 1.)
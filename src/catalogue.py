@@ -0,0 +1,336 @@
+import os
+import weakref
+from item import Item
+
+class Catalogue():
+    """The items sold at the supermarket, indexed by item code.
+
+    A catalogue is loaded from a CSV, JSON or SQLite file holding one
+    record per item with the fields listed in Catalogue.fields. The
+    whole file is validated in a single pass when it is loaded, so
+    that the items can later be looked up by code in O(1) without any
+    further checks. Item codes can be any non-empty string. Names and
+    image paths are kept by the items of the catalogue, so catalogues
+    with the same item codes do not affect each other.
+
+    Prices and offers can be changed while the application runs with
+    applyUpdates. Every accepted batch of updates increments the version
+    of the catalogue and reprices the open baskets of the checkouts
+    using the catalogue, touching only the updated item categories.
+
+    Attributes:
+        _items (dict): Item codes as keys and Item instances as values
+            in the order in which they were loaded.
+        _positions (None or dict): Item codes as keys and their
+            position in the catalogue as values, built on first use.
+        _version (int): Number of batches of updates applied.
+        _checkouts (weakref.WeakSet): Checkouts using the catalogue.
+
+    Methods:
+        load(cls, path)
+
+        fromItemsAndPrices(cls, itemsAndPrices)
+
+        loadCsv(cls, path)
+
+        loadJson(cls, path)
+
+        loadSqlite(cls, path, table="items")
+
+        getItem(self, itemCode)
+
+        getItems(self)
+
+        getItemsAndPrices(self)
+
+        getPositions(self)
+
+        getVersion(self)
+
+        register(self, checkout)
+
+        applyUpdates(self, updates)
+    """
+
+    # Fields of every record of a catalogue file
+    fields = ("code", "name", "image", "price", "multibuyMinimumPopulation", "offerOnPopulation", "offerOnPrice")
+
+    def __init__(self, records, imageDirectory=""):
+        """Initialise the catalogue from item records.
+
+        Parameters:
+            records (iterable): Mappings with the keys of
+                Catalogue.fields, one per item.
+
+            imageDirectory (str): Directory against which relative
+                image paths are resolved.
+        """
+
+        if (not isinstance(imageDirectory, str)):
+            raise TypeError
+
+        # Validate all records before creating any item
+        names = {}
+        imagePaths = {}
+        prices = {}
+        for index, record in enumerate(records):
+            itemCode, name, imagePath, pricing = self._parseRecord(record, index)
+            if (itemCode in names):
+                raise ValueError("record {}: duplicate item code {!r}".format(index, itemCode))
+            names[itemCode] = name
+            imagePaths[itemCode] = os.path.join(imageDirectory, imagePath) if imagePath else ""
+            prices[itemCode] = pricing
+        if (not bool(names)):
+            raise ValueError("the catalogue has no items")
+
+        self._positions = None
+        self._version = 0
+        self._checkouts = weakref.WeakSet()
+        self._items = {}
+        # The records were validated by _parseRecord
+        for itemCode in prices:
+            self._items[itemCode] = Item.trusted(itemCode, *prices[itemCode],
+                                                 name=names[itemCode], imagePath=imagePaths[itemCode])
+
+    @classmethod
+    def fromItemsAndPrices(cls, itemsAndPrices):
+        """Return a catalogue of the items of a dictionary in the format
+        accepted by Checkout, with item codes as keys and lists of item
+        price and multi-buy details as values. Names and image paths
+        are those of the Item class.
+        """
+
+        if (not isinstance(itemsAndPrices, dict)):
+            raise TypeError
+
+        records = []
+        for itemCode in itemsAndPrices:
+            if (not itemCode in Item.dictItemNamePerCode):
+                raise ValueError("unknown item code {!r}".format(itemCode))
+            record = {"code": itemCode,
+                      "name": Item.dictItemNamePerCode[itemCode],
+                      "image": Item.dictItemImagePath.get(itemCode, "")}
+            try:
+                record.update(zip(cls.fields[3:], itemsAndPrices[itemCode]))
+            except TypeError:
+                raise TypeError
+            records.append(record)
+        return cls(records)
+
+    @classmethod
+    def load(cls, path):
+        """Load a catalogue from a .csv, .json, .db, .sqlite or
+        .sqlite3 file
+        """
+
+        if (not isinstance(path, str)):
+            raise TypeError
+
+        extension = os.path.splitext(path)[1].lower()
+        if (extension == ".csv"):
+            return cls.loadCsv(path)
+        if (extension == ".json"):
+            return cls.loadJson(path)
+        if (extension in [".db", ".sqlite", ".sqlite3"]):
+            return cls.loadSqlite(path)
+        raise ValueError("unsupported catalogue file {}".format(path))
+
+    @classmethod
+    def loadCsv(cls, path):
+        """Load a catalogue from a CSV file with a header row naming
+        the fields of Catalogue.fields
+        """
+
+        # File format modules are only imported when they are needed
+        import csv
+        with open(path, newline="", encoding="utf-8") as file:
+            return cls(csv.DictReader(file), os.path.dirname(path))
+
+    @classmethod
+    def loadJson(cls, path):
+        """Load a catalogue from a JSON file holding a list of objects
+        with the fields of Catalogue.fields
+        """
+
+        import json
+        with open(path, encoding="utf-8") as file:
+            records = json.load(file)
+        if (not isinstance(records, list)):
+            raise ValueError("{} must hold a list of items".format(path))
+        return cls(records, os.path.dirname(path))
+
+    @classmethod
+    def loadSqlite(cls, path, table="items"):
+        """Load a catalogue from a table of an SQLite database with one
+        column per field of Catalogue.fields
+        """
+
+        import sqlite3
+        if (not table.isidentifier()):
+            raise ValueError
+        connection = sqlite3.connect("file:{}?mode=ro".format(path), uri=True)
+        try:
+            connection.row_factory = sqlite3.Row
+            rows = connection.execute("SELECT {} FROM {}".format(", ".join(cls.fields), table))
+            return cls(rows, os.path.dirname(path))
+        finally:
+            connection.close()
+
+    def _parseRecord(self, record, index):
+        """Return (code, name, image path, [price,
+        multibuyMinimumPopulation, offerOnPopulation, offerOnPrice])
+        of a record after checking it against the rules of Item.
+        """
+
+        try:
+            itemCode = record["code"]
+            name = record["name"]
+            imagePath = record["image"] or ""
+            pricing = [record[field] for field in self.fields[3:]]
+        except (KeyError, IndexError, TypeError):
+            raise ValueError("record {}: expected the fields {}".format(index, ", ".join(self.fields)))
+
+        if (not isinstance(itemCode, str) or not isinstance(name, str) or not isinstance(imagePath, str)):
+            raise TypeError("record {}: code, name and image must be strings".format(index))
+        if (itemCode == ""):
+            raise ValueError("record {}: empty item code".format(index))
+        for position, number in enumerate(pricing):
+            # CSV files hold strings only
+            if (isinstance(number, str)):
+                try:
+                    number = int(number)
+                except ValueError:
+                    raise TypeError("record {}: {} must be an integer".format(index, self.fields[3+position]))
+            if (not isinstance(number, int) or isinstance(number, bool)):
+                raise TypeError("record {}: {} must be an integer".format(index, self.fields[3+position]))
+            pricing[position] = number
+
+        price, multibuyMinimumPopulation, offerOnPopulation, offerOnPrice = pricing
+        if (price <= 0 or multibuyMinimumPopulation <= 0 or offerOnPopulation < 0 or offerOnPrice < 0):
+            raise ValueError("record {}: invalid price or offer of item {!r}".format(index, itemCode))
+        if (offerOnPopulation != 0 and offerOnPrice != 0):
+            raise ValueError("record {}: item {!r} has two offers".format(index, itemCode))
+        return itemCode, name, imagePath, pricing
+
+    def __len__(self):
+        """Return the number of items in the catalogue"""
+
+        return len(self._items)
+
+    def __contains__(self, itemCode):
+        """Return True if an item with this code is in the catalogue"""
+
+        return itemCode in self._items
+
+    def getItem(self, itemCode):
+        """Return the item with this code"""
+
+        if (not isinstance(itemCode, str)):
+            raise TypeError
+        if (not itemCode in self._items):
+            raise ValueError
+        return self._items[itemCode]
+
+    def getItems(self):
+        """Return a dictionary with item codes as keys and Item
+        instances as values
+        """
+
+        return self._items
+
+    def getItemsAndPrices(self):
+        """Return the catalogue in the format expected by Checkout: a
+        dictionary with item codes as keys and lists of item price and
+        multi-buy details as values
+        """
+
+        itemsAndPrices = {}
+        for itemCode, item in self._items.items():
+            itemsAndPrices[itemCode] = [item.getPrice(),
+                                        item.getMultibuyMinimumPopulation(),
+                                        item.getOfferOnPopulation(),
+                                        item.getOfferOnPrice()]
+        return itemsAndPrices
+
+    def getPositions(self):
+        """Return a dictionary with item codes as keys and the position
+        of the items in the catalogue as values. The dictionary is
+        built once and shared by all its users, e.g. the CompactBasket
+        of every Checkout using this catalogue.
+        """
+
+        if (self._positions is None):
+            self._positions = {itemCode: index for index, itemCode in enumerate(self._items)}
+        return self._positions
+
+    def getVersion(self):
+        """Return the number of batches of updates applied so far"""
+
+        return self._version
+
+    def register(self, checkout):
+        """Reprice the basket of checkout whenever the catalogue is
+        updated. Checkouts are held by weak references.
+        """
+
+        if (checkout is None):
+            raise TypeError
+        self._checkouts.add(checkout)
+
+    def applyUpdates(self, updates):
+        """Change the prices and offers of items and reprice the baskets
+        of the registered checkouts. The whole batch is validated before
+        any item is changed. Return the frozenset of the codes of the
+        items that changed.
+
+        Parameters:
+            updates (mapping): Item codes as keys and mappings as
+                values, with the new values of some of the fields
+                price, multibuyMinimumPopulation, offerOnPopulation and
+                offerOnPrice. Unspecified fields keep their value.
+        """
+
+        if (not isinstance(updates, dict)):
+            raise TypeError("the updates must be a dictionary of item codes")
+
+        pricing = {}
+        for index, itemCode in enumerate(updates):
+            if (not isinstance(itemCode, str)):
+                raise TypeError("update {}: item codes must be strings".format(index))
+            if (not itemCode in self._items):
+                raise ValueError("update {}: unknown item code {!r}".format(index, itemCode))
+            if (not isinstance(updates[itemCode], dict)):
+                raise TypeError("update {}: expected a dictionary of fields".format(index))
+            for field in updates[itemCode]:
+                if (not field in self.fields[3:]):
+                    raise ValueError("update {}: unknown field {!r}".format(index, field))
+            item = self._items[itemCode]
+            record = {"code": itemCode, "name": item.getName(), "image": "",
+                      "price": item.getPrice(),
+                      "multibuyMinimumPopulation": item.getMultibuyMinimumPopulation(),
+                      "offerOnPopulation": item.getOfferOnPopulation(),
+                      "offerOnPrice": item.getOfferOnPrice()}
+            # Changing the kind of offer must not clash with the old one
+            if ("offerOnPopulation" in updates[itemCode] and not "offerOnPrice" in updates[itemCode]):
+                record["offerOnPrice"] = 0
+            if ("offerOnPrice" in updates[itemCode] and not "offerOnPopulation" in updates[itemCode]):
+                record["offerOnPopulation"] = 0
+            record.update(updates[itemCode])
+            newPricing = self._parseRecord(record, index)[3]
+            if (newPricing != [item.getPrice(), item.getMultibuyMinimumPopulation(),
+                               item.getOfferOnPopulation(), item.getOfferOnPrice()]):
+                pricing[itemCode] = newPricing
+
+        if (not pricing):
+            return frozenset()
+        for itemCode, (price, multibuyMinimumPopulation, offerOnPopulation, offerOnPrice) in pricing.items():
+            self._items[itemCode].setPrice(price)
+            self._items[itemCode].setOffer(multibuyMinimumPopulation, offerOnPopulation, offerOnPrice)
+        self._version += 1
+
+        changedItems = frozenset(pricing)
+        for checkout in list(self._checkouts):
+            # Checkouts that switched to another catalogue are skipped
+            if (checkout._catalogue is self):
+                checkout.reprice(changedItems)
+        return changedItems
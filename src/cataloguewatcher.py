@@ -0,0 +1,115 @@
+import json
+import os
+import sys
+
+class CatalogueWatcher():
+    """Applies the price and offer updates written to a file.
+
+    The watcher polls the modification time and size of a JSON file on
+    the tkinter event loop and, whenever they change, applies the
+    updates it holds to a catalogue, which reprices the open baskets.
+    The file holds an object with item codes as keys and objects with
+    the new values of some of the fields price,
+    multibuyMinimumPopulation, offerOnPopulation and offerOnPrice as
+    values, e.g. {"A": {"price": 30}, "B": {"offerOnPrice": 90}}.
+    Invalid files are reported and ignored, so that a half-written file
+    is simply picked up on the next change.
+
+    Attributes:
+        _catalogue (Catalogue instance): The catalogue to update.
+        _path (str): Path of the updates file.
+        _root (tkinter widget): Widget whose after method schedules the
+            polls.
+        _interval (int): Milliseconds between two polls.
+        _onError (function): Called with a message when the file is
+            invalid.
+        _signature (None or tuple): Modification time and size of the
+            file when it was last read.
+        _afterId (None or str): Identifier of the next poll.
+
+    Methods:
+        start(self)
+
+        stop(self)
+
+        poll(self)
+    """
+
+    def __init__(self, catalogue, path, root, interval=1000, onError=None):
+        """Initialise the watcher.
+
+        Parameters:
+            catalogue (Catalogue instance): The catalogue to update.
+
+            path (str): Path of the JSON updates file.
+
+            root (tkinter widget): Widget whose after method schedules
+                the polls, e.g. the root window.
+
+            interval (int): Milliseconds between two polls.
+
+            onError (None or function): Called with a message when the
+                file is invalid. The message is printed on the standard
+                error if None.
+        """
+
+        if (catalogue is None or root is None):
+            raise TypeError
+        if (not isinstance(path, str)):
+            raise TypeError
+        if (not isinstance(interval, int)):
+            raise TypeError
+        if (interval <= 0):
+            raise ValueError
+
+        self._catalogue = catalogue
+        self._path = path
+        self._root = root
+        self._interval = interval
+        self._onError = onError if onError is not None else (lambda message: print(message, file=sys.stderr))
+        self._signature = None
+        self._afterId = None
+
+    def start(self):
+        """Apply the current updates, if any, and poll the file every
+        interval milliseconds
+        """
+
+        if (self._afterId is None):
+            self._onScheduledPoll()
+
+    def stop(self):
+        """Stop polling the file"""
+
+        if (self._afterId is not None):
+            self._root.after_cancel(self._afterId)
+            self._afterId = None
+
+    def _onScheduledPoll(self):
+        """Poll triggered by the event loop"""
+
+        self.poll()
+        self._afterId = self._root.after(self._interval, self._onScheduledPoll)
+
+    def poll(self):
+        """Apply the updates of the file if it changed since it was last
+        read. Return the frozenset of the codes of the items that
+        changed.
+        """
+
+        try:
+            status = os.stat(self._path)
+        except OSError:
+            return frozenset()
+        signature = (status.st_mtime_ns, status.st_size)
+        if (signature == self._signature):
+            return frozenset()
+        self._signature = signature
+
+        try:
+            with open(self._path, encoding="utf-8") as file:
+                updates = json.load(file)
+            return self._catalogue.applyUpdates(updates)
+        except (OSError, TypeError, ValueError) as error:
+            self._onError("Price updates in {} were not applied: {}".format(self._path, error))
+            return frozenset()
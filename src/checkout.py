@@ -1,5 +1,10 @@
 import item
+import catalogue
+import compactbasket
 import copy
+from array import array
+from collections import Counter
+from collections.abc import Mapping
 
 class Checkout():
     """The main engine that calculates data and updates the GUI.
@@ -9,26 +14,61 @@ class Checkout():
     interface about any changes in the basket. Members of the GUI are
     listed as listeners to the signaling mechanism of the class to that
     they can be triggered by the signal and read information from it.
+    Listeners subscribe either to the whole basket or to some items, in
+    which case they are only signalled the changes of those items.
 
     Attributes:
-        _basket (dict): dictionary with item codes as keys and with
-            number of items scanned as values.
+        _basket (dict or CompactBasket): dictionary with item codes as
+            keys and with number of items scanned as values.
         _itemsCatalogue (dict): dictionary with item codes as keys and
-            with lists of item price and multi-buy details as values.
+            with Item instances as values. It is never modified, so it
+            is shared by copies of the checkout.
+        _itemTotals (dict): dictionary with the codes of the item
+            categories in the basket as keys and with (total cost,
+            savings) tuples of the items of that category as values.
+        _totalCost (int): running total cost of the basket in pence.
+        _totalSavings (int): running multi-buy savings of the basket
+            in pence.
+        _numberOfItems (int): running number of items in the basket.
+        _catalogue (None or Catalogue instance): The catalogue the items
+            come from, which reprices the basket when it is updated.
+        defaultItemsAndPrices (dict): The items catalogue used when
+            none is given.
+        listeners (set): Listeners signalled every change of the
+            basket.
+        _topics (dict): Item codes as keys and sets of the listeners
+            signalled the changes of that item as values.
+        _subscriptions (dict): Listeners of items as keys and
+            frozensets of the codes of their items as values.
+        consistencyCheck (bool): class-wide switch that makes every
+            signal verify the running totals against a full
+            recalculation. Meant for tests.
 
     Methods:
         copyTo(self, other)
 
-        register(self,listener)
+        register(self, listener, itemCodes=None)
 
         unregister(self,listener)
 
-        signal(self, signalStrength = "strong")
+        signal(self, signalStrength = "strong", changedItems = None)
+
+        _audience(self, changedItems)
+
+        _publish(self, signalStrength, changedItems)
+
+        _validateItemsAndPrices(self, itemsAndPrices)
 
         _initItemsCatalogue(self,dictItemsAndPrices)
 
         initBasket(self)
 
+        _setItemCount(self, itemCode, count)
+
+        _recalculateTotals(self)
+
+        checkTotals(self)
+
         getItemsCatalogue(self)
 
         getBasket(self)
@@ -43,10 +83,23 @@ class Checkout():
 
         clearBasket(self, itemCode="all", signalStrength = "strong")
 
+        scanMany(self, itemCodes, signalStrength = "strong")
+
+        apply(self, deltas, signalStrength = "strong")
+
+        reprice(self, itemCodes, signalStrength = "strong")
+
         total(self, item="all")
+
+        trusted(self)
     """
 
-    def __init__(self, orig=None, itemsAndPrices = {"A": [25, 3, 2, 0], "B": [40, 3, 0, 100], "P": [30, 1, 0, 0]}):
+    # Verify the running totals on every signal when set to True
+    consistencyCheck = False
+
+    defaultItemsAndPrices = {"A": [25, 3, 2, 0], "B": [40, 3, 0, 100], "P": [30, 1, 0, 0]}
+
+    def __init__(self, orig=None, itemsAndPrices = defaultItemsAndPrices, compactBasket = False):
         """Initialise the core application engine with an empty basket.
 
         Parameters:
@@ -54,14 +107,64 @@ class Checkout():
                 class instance will be instanciated from scratch or
                 it will be an independent copy of another instance.
 
-            itemsAndPrices (dict): Dictionary with the supermarket
-                items catalogue. Keys are the item codes and values
-                are lists of item price and multi-buy details.
+            itemsAndPrices (dict or Catalogue instance): Dictionary
+                with the supermarket items catalogue. Keys are the item
+                codes and values are lists of item price and multi-buy
+                details. Item codes must be built-in codes, i.e. keys
+                of Item.dictItemNamePerCode. A Catalogue instance can
+                be given instead, e.g. for other item codes, in which
+                case its items are used as they are and the basket is
+                repriced when the catalogue is updated.
+
+            compactBasket (bool): Store the basket in a CompactBasket
+                backed by an array of counts instead of a dictionary.
+                Copies follow the basket type of the original.
         """
 
         # Raise exceptions before initialisation
         if (not (orig is None or isinstance(orig, Checkout))):
             raise TypeError 
+        if (not isinstance(compactBasket, bool)):
+            raise TypeError
+        # Catalogues are validated when they are loaded
+        if (not isinstance(itemsAndPrices, catalogue.Catalogue)):
+            self._validateItemsAndPrices(itemsAndPrices)
+        
+        # Default constructor
+        if (orig is None):
+            self._basket = {}
+            self._itemsCatalogue = {}
+            self._itemTotals = {}
+            self._catalogue = None
+            self._initItemsCatalogue(itemsAndPrices)
+            if (compactBasket):
+                if (isinstance(itemsAndPrices, catalogue.Catalogue)):
+                    positions = itemsAndPrices.getPositions()
+                else:
+                    positions = {itemCode: index for index, itemCode in enumerate(self._itemsCatalogue)}
+                self._basket = compactbasket.CompactBasket(positions)
+            self.initBasket()
+        # copy constructor: the catalogue is shared, not copied
+        else:
+            self._basket = copy.copy(orig._basket)
+            self._itemsCatalogue = orig._itemsCatalogue
+            self._itemTotals = copy.copy(orig._itemTotals)
+            self._totalCost = orig._totalCost
+            self._totalSavings = orig._totalSavings
+            self._numberOfItems = orig._numberOfItems
+            self._catalogue = orig._catalogue
+        if (self._catalogue is not None):
+            self._catalogue.register(self)
+        
+        # Instances must start with no listeners regardless of the
+        # constructor used to build them
+        self._initListeners()
+
+    def _validateItemsAndPrices(self, itemsAndPrices):
+        """Raise TypeError or ValueError if a dictionary of item codes
+        and prices is not a valid items catalogue
+        """
+
         if (not isinstance(itemsAndPrices, dict)):
             raise TypeError
         if (not bool(itemsAndPrices)):
@@ -70,13 +173,11 @@ class Checkout():
         for itemCode in itemsAndPrices.keys():
             if (not isinstance(itemCode, str)):
                 raise TypeError
-            elif (len(itemCode)>1):
-                raise ValueError
             elif (not isinstance(itemsAndPrices[itemCode],list)):
                 raise TypeError
             elif (len(itemsAndPrices[itemCode])!=4):
                 raise ValueError
-            elif (not itemCode in "ABP"):
+            elif (not itemCode in item.Item.dictItemNamePerCode):
                 raise ValueError
         
             for number in itemsAndPrices[itemCode]:
@@ -93,21 +194,6 @@ class Checkout():
                 raise ValueError
             if (itemsAndPrices[itemCode][2] != 0 and itemsAndPrices[itemCode][3] != 0):
                 raise ValueError
-        
-        # Default constructor
-        if (orig is None):
-            self._basket = {}
-            self._itemsCatalogue = {}
-            self._initItemsCatalogue(itemsAndPrices)
-            self.initBasket()
-        # copy constructor
-        else:
-            self._basket = copy.copy(orig._basket)
-            self._itemsCatalogue = copy.copy(orig._itemsCatalogue)
-        
-        # Instances must start with an empty list of listeners
-        # regardless of the constructor used to build them
-        self.listeners = set()
 
     def copyTo(self, other):
         """Copy the contents of this basket to the other basket and
@@ -119,38 +205,131 @@ class Checkout():
             raise TypeError
 
         other._basket = copy.copy(self._basket)
-        other._itemsCatalogue = copy.copy(self._itemsCatalogue)
+        other._itemsCatalogue = self._itemsCatalogue
+        other._itemTotals = copy.copy(self._itemTotals)
+        other._totalCost = self._totalCost
+        other._totalSavings = self._totalSavings
+        other._numberOfItems = self._numberOfItems
+        other._useCatalogue(self._catalogue)
         other.signal()
 
-    def register(self,listener):
-        """Add listener to listeners list"""
+    def _useCatalogue(self, catalogue_):
+        """Follow the updates of catalogue_, the catalogue whose items
+        the basket now uses
+        """
+
+        self._catalogue = catalogue_
+        if (catalogue_ is not None):
+            catalogue_.register(self)
+
+    def _initListeners(self):
+        """Start with no listeners"""
+
+        self.listeners = set()
+        self._topics = {}
+        self._subscriptions = {}
+
+    def register(self, listener, itemCodes=None):
+        """Add listener to the listeners of the basket.
+
+        Parameters:
+            listener: Object with a slot method.
+
+            itemCodes (None or iterable): Codes of the items whose
+                changes the listener is signalled, e.g. the item of a
+                card. The listener is signalled every change of the
+                basket if None, e.g. a basket total. Signals that do
+                not name the changed items reach every listener.
+        """
 
         if (listener is None):
             raise TypeError
-        self.listeners.add(listener)
+        if (itemCodes is None):
+            # Listeners of the whole basket need no item topics
+            self.unregister(listener)
+            self.listeners.add(listener)
+            return
+        if (isinstance(itemCodes, str)):
+            raise TypeError
+        itemCodes = frozenset(itemCodes)
+        for itemCode in itemCodes:
+            if (not isinstance(itemCode, str)):
+                raise TypeError
+            if (not itemCode in self._itemsCatalogue):
+                raise ValueError
+        if (listener in self.listeners):
+            return
+        self._subscriptions[listener] = self._subscriptions.get(listener, frozenset()) | itemCodes
+        for itemCode in itemCodes:
+            self._topics.setdefault(itemCode, set()).add(listener)
 
     def unregister(self,listener):
-        """Remove listener from listeners list"""
+        """Remove listener from the listeners of the basket and of its
+        items
+        """
 
         if (listener is None):
             raise TypeError
         self.listeners.discard(listener)
+        for itemCode in self._subscriptions.pop(listener, ()):
+            self._topics[itemCode].discard(listener)
+            if (not self._topics[itemCode]):
+                del self._topics[itemCode]
 
-    def signal(self, signalStrength = "strong"):
-        """Send a signal to all listeners"""
+    def signal(self, signalStrength = "strong", changedItems = None):
+        """Send a signal to all listeners
+
+        Parameters:
+            signalStrength (str): "weak" or "strong".
+
+            changedItems (None or frozenset): The item codes whose
+                count changed, so that listeners can skip untouched
+                categories. None means that anything may have changed.
+        """
 
         if (not isinstance(signalStrength, str)):
             raise TypeError
         if (not signalStrength in ["weak", "strong"]):
             raise ValueError
-        for listener in self.listeners:
-            listener.slot(self, signalStrength)
+        if (not (changedItems is None or isinstance(changedItems, frozenset))):
+            raise TypeError
+        self._publish(signalStrength, changedItems)
+
+    def _audience(self, changedItems):
+        """Return the list of the listeners of a signal: the listeners
+        of the whole basket and, once each, those of the changed items
+        """
+
+        if (changedItems is None):
+            return list(self.listeners) + list(self._subscriptions)
+        audience = list(self.listeners)
+        if (len(changedItems) == 1):
+            for itemCode in changedItems:
+                audience.extend(self._topics.get(itemCode, ()))
+        else:
+            subscribers = set()
+            for itemCode in changedItems:
+                subscribers.update(self._topics.get(itemCode, ()))
+            audience.extend(subscribers)
+        return audience
+
+    def _publish(self, signalStrength, changedItems):
+        """Call the slot of the listeners of a validated signal"""
+
+        if (self.consistencyCheck):
+            self.checkTotals()
+        for listener in self._audience(changedItems):
+            listener.slot(self, signalStrength, changedItems)
 
     def _initItemsCatalogue(self,dictItemsAndPrices):
         """Initialise the catalogue of items sold at the supermarket
         and their prices
         """
 
+        if (isinstance(dictItemsAndPrices, catalogue.Catalogue)):
+            self._itemsCatalogue = dictItemsAndPrices.getItems()
+            self._catalogue = dictItemsAndPrices
+            return
         if (not isinstance(dictItemsAndPrices, dict)):
             raise TypeError
 
@@ -163,20 +342,78 @@ class Checkout():
             itmOfferPop = dictItemsAndPrices[itemCode][2]
             # item offer on price
             itmOfferPrc = dictItemsAndPrices[itemCode][3]
-            # init the item and append to the item catalogue
-            self._itemsCatalogue[itemCode] = item.Item(itemCode,
-                                                       itmPrice,
-                                                       itmMinMBP,
-                                                       itmOfferPop,
-                                                       itmOfferPrc)
+            # init the item and append to the item catalogue. The
+            # details were validated by _validateItemsAndPrices
+            self._itemsCatalogue[itemCode] = item.Item.trusted(itemCode,
+                                                               itmPrice,
+                                                               itmMinMBP,
+                                                               itmOfferPop,
+                                                               itmOfferPrc)
 
 
     def initBasket(self):
         """Initialise an empty basket"""
 
-        for itemCode in self._itemsCatalogue:
-            self._basket[itemCode] = 0
-    
+        if (isinstance(self._basket, compactbasket.CompactBasket)):
+            self._basket = compactbasket.CompactBasket(self._basket._positions)
+        else:
+            for itemCode in self._itemsCatalogue:
+                self._basket[itemCode] = 0
+        self._recalculateTotals()
+
+    def _setItemCount(self, itemCode, count):
+        """Set the number of items of one category in the basket and
+        update the running totals of the basket in O(1)
+        """
+
+        previousCost, previousSavings = self._itemTotals.get(itemCode, (0, 0))
+        itemCost, itemSavings = self._itemsCatalogue[itemCode].getMultibuyCost(count)
+        self._numberOfItems += count - self._basket[itemCode]
+        self._totalCost += itemCost - previousCost
+        self._totalSavings += itemSavings - previousSavings
+        self._basket[itemCode] = count
+        # Only categories present in the basket are kept
+        if (count > 0):
+            self._itemTotals[itemCode] = (itemCost, itemSavings)
+        else:
+            self._itemTotals.pop(itemCode, None)
+
+    def _recalculateTotals(self):
+        """Rebuild the per category and basket-wide running totals from
+        the contents of the basket
+        """
+
+        self._itemTotals = {}
+        self._totalCost = 0
+        self._totalSavings = 0
+        self._numberOfItems = 0
+        for itemCode in self._basket:
+            if (self._basket[itemCode] == 0):
+                continue
+            itemCost, itemSavings = self._itemsCatalogue[itemCode].getMultibuyCost(self._basket[itemCode])
+            self._itemTotals[itemCode] = (itemCost, itemSavings)
+            self._totalCost += itemCost
+            self._totalSavings += itemSavings
+            self._numberOfItems += self._basket[itemCode]
+
+    def checkTotals(self):
+        """Raise RuntimeError if the running totals differ from a full
+        recalculation of the basket
+        """
+
+        totalCost = 0
+        totalSavings = 0
+        numberOfItems = 0
+        for itemCode in self._basket:
+            itemTotals = self._itemsCatalogue[itemCode].getMultibuyCost(self._basket[itemCode])
+            if (self._itemTotals.get(itemCode, (0, 0)) != itemTotals):
+                raise RuntimeError("Running totals of item {} are out of sync with the basket".format(itemCode))
+            totalCost += itemTotals[0]
+            totalSavings += itemTotals[1]
+            numberOfItems += self._basket[itemCode]
+        if ((totalCost, totalSavings, numberOfItems) != (self._totalCost, self._totalSavings, self._numberOfItems)):
+            raise RuntimeError("Running totals are out of sync with the basket")
+
 
     def getItemsCatalogue(self):
         """Get the catalogue of items sold at the supermarket"""
@@ -191,13 +428,12 @@ class Checkout():
 
 
     def getItemCategoriesInBasket(self):
-        """Return a list of the item categories in the basket"""
+        """Return a list of the item categories in the basket in the
+        order in which they were added
+        """
 
-        scannedItemsList=[]    
-        for category in self._basket:
-          if (self._basket[category]>0):
-            scannedItemsList.append(category)
-        return scannedItemsList
+        # The running totals only hold the categories in the basket
+        return list(self._itemTotals)
 
 
     def getNumberOfItems(self,itemCode=""):
@@ -206,10 +442,7 @@ class Checkout():
         if (not isinstance(itemCode, str)):
             raise TypeError
         if (itemCode==""):
-            n = 0
-            for itemCode in self._basket:
-                n+=self._basket[itemCode]
-            return n
+            return self._numberOfItems
         else:
             if (not itemCode in self._itemsCatalogue.keys()):
                 raise ValueError
@@ -227,8 +460,8 @@ class Checkout():
             raise ValueError
         if (not signalStrength in ["weak", "strong"]):
             raise ValueError
-        self._basket[itemCode]+=1
-        self.signal(signalStrength)
+        self._setItemCount(itemCode, self._basket[itemCode]+1)
+        self.signal(signalStrength, frozenset((itemCode,)))
 
 
     def unscan(self,itemCode, signalStrength = "strong"):
@@ -243,8 +476,8 @@ class Checkout():
             raise ValueError
 
         if (self._basket[itemCode]>0):
-            self._basket[itemCode]-=1
-            self.signal(signalStrength)
+            self._setItemCount(itemCode, self._basket[itemCode]-1)
+            self.signal(signalStrength, frozenset((itemCode,)))
 
         if (self._basket[itemCode] <= 0):
             raise ValueError
@@ -263,56 +496,179 @@ class Checkout():
             raise ValueError
 
         if (itemCode == "all"):
-            for i_itemCode in self._basket:
-                self._basket[i_itemCode] = 0
+            changedItems = self.getItemCategoriesInBasket()
+            for i_itemCode in changedItems:
+                self._setItemCount(i_itemCode, 0)
+            self.signal(signalStrength, frozenset(changedItems))
         else:
-            self._basket[itemCode] = 0
-        self.signal(signalStrength)
+            self._setItemCount(itemCode, 0)
+            self.signal(signalStrength, frozenset((itemCode,)))
+
+
+    def scanMany(self, itemCodes, signalStrength = "strong"):
+        """Add many items to the basket at once and send a single
+        signal for all of them.
+
+        Parameters:
+            itemCodes (iterable or mapping): Either an iterable of
+                item codes, one per scanned item, or a mapping (e.g. a
+                Counter) with item codes as keys and number of scanned
+                items as values.
+        """
+
+        if (isinstance(itemCodes, str)):
+            raise TypeError
+        if (isinstance(itemCodes, Mapping)):
+            counts = itemCodes
+        else:
+            try:
+                counts = Counter(itemCodes)
+            except TypeError:
+                raise TypeError
+        for itemCode in counts:
+            if (not isinstance(counts[itemCode], int)):
+                raise TypeError
+            if (counts[itemCode] < 0):
+                raise ValueError
+        self.apply(counts, signalStrength)
+
+
+    def apply(self, deltas, signalStrength = "strong"):
+        """Change the number of items of many categories at once.
+
+        All changes are validated before any of them is applied, so
+        either the whole update goes through or the basket is left
+        untouched. A single signal is sent with the codes of the
+        categories that changed.
+
+        Parameters:
+            deltas (mapping): Item codes as keys and the number of
+                items to add (positive) or remove (negative) as values.
+        """
+
+        if (not isinstance(deltas, Mapping)):
+            raise TypeError
+        if (not isinstance(signalStrength, str)):
+            raise TypeError
+        if (not signalStrength in ["weak", "strong"]):
+            raise ValueError
+        for itemCode in deltas:
+            if (not isinstance(itemCode, str)):
+                raise TypeError
+            if (not isinstance(deltas[itemCode], int)):
+                raise TypeError
+            if (not itemCode in self._itemsCatalogue):
+                raise ValueError
+            if (self._basket[itemCode] + deltas[itemCode] < 0):
+                raise ValueError
+
+        changedItems = []
+        for itemCode in deltas:
+            if (deltas[itemCode] != 0):
+                self._setItemCount(itemCode, self._basket[itemCode] + deltas[itemCode])
+                changedItems.append(itemCode)
+        if (changedItems):
+            self.signal(signalStrength, frozenset(changedItems))
+
+
+    def reprice(self, itemCodes, signalStrength = "strong"):
+        """Update the running totals after the price or offer of some
+        items changed and send a single signal naming them. Only the
+        given categories are recalculated.
+
+        Parameters:
+            itemCodes (iterable): Codes of the items whose price or
+                offer changed.
+        """
+
+        if (isinstance(itemCodes, str)):
+            raise TypeError
+        try:
+            itemCodes = frozenset(itemCodes)
+        except TypeError:
+            raise TypeError
+        for itemCode in itemCodes:
+            if (not isinstance(itemCode, str)):
+                raise TypeError
+            if (not itemCode in self._itemsCatalogue):
+                raise ValueError
+
+        if (itemCodes):
+            self._repriceItems(itemCodes)
+            self.signal(signalStrength, itemCodes)
+
+    def _repriceItems(self, itemCodes):
+        """Recalculate the running totals of some categories"""
+
+        for itemCode in itemCodes:
+            if (self._basket[itemCode] > 0):
+                self._setItemCount(itemCode, self._basket[itemCode])
 
 
     def checkout(self, listOfItems, itemsCatalogue):
-        """Takes a list of item codes and their current prices and returns
+        """Takes the scanned items and their current prices and returns
         the total price in pence, after applying any relevant offers.
 
+        The cost is calculated once per distinct item category, so it
+        scales with the number of categories rather than the number of
+        items when the items are given as counts.
+
         Parameters:
-            listOfItems (list): List of item codes
+            listOfItems (list, mapping or array): Either a list of item
+                codes, one per item, or a mapping (e.g. a Counter or
+                the basket itself) with item codes as keys and number
+                of items as values, or an array.array of item counts
+                in the order of the items catalogue.
             itemsCatalogue (dict): Dictionary with the supermarket
                 items catalogue. Keys are the item codes and values
                 are lists of item price and multi-buy details.
         """
 
-        if (not isinstance(listOfItems, list)):
+        if (isinstance(listOfItems, list)):
+            # Counting is done in C, validation once per distinct code
+            try:
+                counts = Counter(listOfItems)
+            except TypeError:
+                raise TypeError
+        elif (isinstance(listOfItems, Mapping)):
+            counts = listOfItems
+        elif (isinstance(listOfItems, array)):
+            if (len(listOfItems) != len(self._itemsCatalogue)):
+                raise ValueError
+            counts = dict(zip(self._itemsCatalogue, listOfItems))
+        else:
             raise TypeError
 
         if (not isinstance(itemsCatalogue, dict)):
             raise TypeError
 
-        for itemCode in listOfItems:
+        for itemCode in counts:
             if (not isinstance(itemCode, str)):
                 raise TypeError
-            if (not itemCode in self.getItemsCatalogue().keys()):
+            if (not itemCode in self._itemsCatalogue):
+                raise ValueError
+            if (not isinstance(counts[itemCode], int)):
+                raise TypeError
+            if (counts[itemCode] < 0):
                 raise ValueError
 
-        for itemCode in itemsCatalogue.keys():
-            if (not itemCode in self.getItemsCatalogue().keys()):
+        for itemCode in itemsCatalogue:
+            if (not itemCode in self._itemsCatalogue):
                 raise ValueError
             if (not isinstance(itemsCatalogue[itemCode], int)):
                 raise TypeError
             if (itemsCatalogue[itemCode] <= 0):
                 raise ValueError
-            if (itemsCatalogue[itemCode] != self.getItemsCatalogue()[itemCode].getPrice()):
+            if (itemsCatalogue[itemCode] != self._itemsCatalogue[itemCode].getPrice()):
                 raise ValueError
 
         # We can apply the same elegant calculation used in self.total(self, item)
-        # so we must create a temporary basket from the list and pass it
-        tempBasket = {"A": 0, "B": 0, "P": 0}
-        for itemCode in listOfItems:
-            tempBasket[itemCode]+=1
-
+        # on every category with at least one item
         totalCost = 0
-        for itemCode in tempBasket:
-            _totalCost, _ =self._itemsCatalogue[itemCode].getMultibuyCost(tempBasket[itemCode])
-            totalCost+=_totalCost
+        for itemCode in counts:
+            if (counts[itemCode] > 0):
+                _totalCost, _ =self._itemsCatalogue[itemCode].getMultibuyCost(counts[itemCode])
+                totalCost+=_totalCost
 
         return totalCost
 
@@ -320,25 +676,136 @@ class Checkout():
     def total(self, item="all"):
         """
         Returns the total cost and the savings after applying any
-        relevant offers on individual item categories or the whole basket
+        relevant offers on individual item categories or the whole basket.
+        Values are read from the running totals of the basket.
         :param item: the item on which to calculate the cost and the savings
         :returns: tuple of 2 integers
-        :raises Nothing
+        :raises TypeError, ValueError
         """
 
         if (not isinstance(item, str)):
             raise TypeError
 
-        for itemCode in self._basket:
-            if (not (item=="all" or itemCode==item)):
-                raise ValueError
+        if (item=="all"):
+            return self._totalCost, self._totalSavings
+        if (not item in self._itemsCatalogue):
+            raise ValueError
+        return self._itemTotals.get(item, (0, 0))
 
-        totalCost=0
-        savings=0
-        for itemCode in self._basket:
-            if (item=="all" or itemCode==item):
-                _totalCost, _savings =self._itemsCatalogue[itemCode].getMultibuyCost(self._basket[itemCode])
-                totalCost+=_totalCost
-                savings+=_savings
-            
-        return totalCost, savings
+    def trusted(self):
+        """Return a view of the checkout whose methods skip the
+        validation of their arguments, for callers that validated them
+        already, e.g. against the items catalogue of the checkout.
+        """
+
+        return _TrustedCheckout(self)
+
+
+class _TrustedCheckout():
+    """Unchecked access to a checkout for trusted callers.
+
+    The view has the same methods as the checkout for changing and
+    reading the basket, without the type and value checks of their
+    arguments. Arguments must be valid: item codes must be in the items
+    catalogue, counts must be ints and must not take any category below
+    zero and signal strengths must be "weak" or "strong". Invalid
+    arguments leave the basket in an undefined state rather than
+    raising TypeError or ValueError. Listeners are signalled as with
+    the checkout itself, without the checks of signal.
+    """
+
+    __slots__ = ("_checkout",)
+
+    def __init__(self, checkout):
+        self._checkout = checkout
+
+    def getNumberOfItems(self, itemCode=""):
+        """Return the number of items of a category, or of the basket
+        if itemCode is ""
+        """
+
+        if (itemCode == ""):
+            return self._checkout._numberOfItems
+        return self._checkout._basket[itemCode]
+
+    def total(self, item="all"):
+        """Return the (total cost, savings) of a category, or of the
+        basket if item is "all"
+        """
+
+        if (item == "all"):
+            return self._checkout._totalCost, self._checkout._totalSavings
+        return self._checkout._itemTotals.get(item, (0, 0))
+
+    def scan(self, itemCode, signalStrength="strong"):
+        """Add an item to the basket"""
+
+        checkout = self._checkout
+        checkout._setItemCount(itemCode, checkout._basket[itemCode] + 1)
+        checkout._publish(signalStrength, frozenset((itemCode,)))
+
+    def unscan(self, itemCode, signalStrength="strong"):
+        """Remove an item from the basket. As with Checkout.unscan,
+        ValueError is raised if no item of the category is left,
+        including when the last one is removed.
+        """
+
+        checkout = self._checkout
+        count = checkout._basket[itemCode]
+        if (count > 0):
+            count -= 1
+            checkout._setItemCount(itemCode, count)
+            checkout._publish(signalStrength, frozenset((itemCode,)))
+        if (count <= 0):
+            raise ValueError
+
+    def clearBasket(self, itemCode="all", signalStrength="strong"):
+        """Remove all items of a category, or all items if itemCode is
+        "all"
+        """
+
+        checkout = self._checkout
+        changedItems = checkout.getItemCategoriesInBasket() if itemCode == "all" else [itemCode]
+        for i_itemCode in changedItems:
+            checkout._setItemCount(i_itemCode, 0)
+        checkout._publish(signalStrength, frozenset(changedItems))
+
+    def scanMany(self, itemCodes, signalStrength="strong"):
+        """Add many items, given as an iterable of item codes or as a
+        mapping of item codes and counts, with a single signal
+        """
+
+        if (not isinstance(itemCodes, Mapping)):
+            itemCodes = Counter(itemCodes)
+        self.apply(itemCodes, signalStrength)
+
+    def apply(self, deltas, signalStrength="strong"):
+        """Change the number of items of many categories with a single
+        signal
+        """
+
+        checkout = self._checkout
+        basket = checkout._basket
+        changedItems = [itemCode for itemCode in deltas if deltas[itemCode] != 0]
+        for itemCode in changedItems:
+            checkout._setItemCount(itemCode, basket[itemCode] + deltas[itemCode])
+        if (changedItems):
+            checkout._publish(signalStrength, frozenset(changedItems))
+
+    def checkout(self, listOfItems, itemsCatalogue=None):
+        """Return the total price in pence of a list of item codes, a
+        mapping of item codes and counts or an array.array of counts in
+        the order of the items catalogue. The prices are those of the
+        items catalogue of the checkout, so itemsCatalogue is ignored.
+        """
+
+        itemsCatalogue = self._checkout._itemsCatalogue
+        if (isinstance(listOfItems, array)):
+            listOfItems = dict(zip(itemsCatalogue, listOfItems))
+        elif (not isinstance(listOfItems, Mapping)):
+            listOfItems = Counter(listOfItems)
+        totalCost = 0
+        for itemCode in listOfItems:
+            if (listOfItems[itemCode] > 0):
+                totalCost += itemsCatalogue[itemCode].getMultibuyCost(listOfItems[itemCode])[0]
+        return totalCost
@@ -0,0 +1,138 @@
+import copy
+from collections import ChainMap
+from checkout import Checkout
+
+class CheckoutOverlay(Checkout):
+    """Copy-on-write view of the basket of another checkout.
+
+    The overlay reads the basket of its base checkout and records only
+    the categories whose count is changed through the overlay. Opening
+    an overlay, discarding it and applying it back to its base cost
+    the same regardless of the size of the basket and of the items
+    catalogue. It is used by the staff page, whose edits are applied
+    to the customer's basket on confirmation or dropped on cancel.
+
+    The base checkout is not expected to change while the overlay is
+    open.
+
+    Attributes:
+        _base (Checkout instance): The checkout the overlay reads from.
+        _counts (dict): Item codes as keys and the number of items in
+            the overlay as values, for the changed categories only.
+        _countTotals (dict): Item codes as keys and (total cost,
+            savings) tuples as values, for the changed categories only.
+
+    Methods:
+        getChanges(self)
+
+        discard(self)
+
+        copyTo(self, other)
+    """
+
+    def __init__(self, base):
+        """Open an overlay on top of the basket of base.
+
+        Parameters:
+            base (Checkout instance): The checkout whose basket is
+                read through the overlay.
+        """
+
+        if (not isinstance(base, Checkout)):
+            raise TypeError
+
+        self._base = base
+        self._itemsCatalogue = base._itemsCatalogue
+        self._initListeners()
+        self.discard()
+        self._useCatalogue(base._catalogue)
+
+    def discard(self):
+        """Drop all the changes made through the overlay"""
+
+        self._counts = {}
+        self._countTotals = {}
+        # Reads fall through to the base, writes land in the overlay
+        self._basket = ChainMap(self._counts, self._base._basket)
+        self._itemTotals = ChainMap(self._countTotals, self._base._itemTotals)
+        self._totalCost = self._base._totalCost
+        self._totalSavings = self._base._totalSavings
+        self._numberOfItems = self._base._numberOfItems
+
+    def getChanges(self):
+        """Return a dictionary with the codes of the categories changed
+        through the overlay as keys and the difference in their number
+        of items from the base as values
+        """
+
+        changes = {}
+        for itemCode in self._counts:
+            delta = self._counts[itemCode] - self._base._basket[itemCode]
+            if (delta != 0):
+                changes[itemCode] = delta
+        return changes
+
+    def _setItemCount(self, itemCode, count):
+        """Set the number of items of one category in the overlay and
+        update the running totals of the overlay in O(1)
+        """
+
+        previousCost, previousSavings = self._itemTotals.get(itemCode, (0, 0))
+        itemCost, itemSavings = self._itemsCatalogue[itemCode].getMultibuyCost(count)
+        self._numberOfItems += count - self._basket[itemCode]
+        self._totalCost += itemCost - previousCost
+        self._totalSavings += itemSavings - previousSavings
+        self._counts[itemCode] = count
+        self._countTotals[itemCode] = (itemCost, itemSavings)
+
+    def _repriceItems(self, itemCodes):
+        """Recalculate the totals of the overlay after a catalogue
+        update. The base may not have been repriced yet, so the basket
+        totals are summed from the items rather than from the base.
+        """
+
+        for itemCode in itemCodes:
+            if (itemCode in self._counts):
+                self._countTotals[itemCode] = self._itemsCatalogue[itemCode].getMultibuyCost(self._counts[itemCode])
+        self._totalCost = 0
+        self._totalSavings = 0
+        for itemCode in self.getItemCategoriesInBasket():
+            itemCost, itemSavings = self._itemsCatalogue[itemCode].getMultibuyCost(self._basket[itemCode])
+            self._totalCost += itemCost
+            self._totalSavings += itemSavings
+
+    def getItemCategoriesInBasket(self):
+        """Return a list of the item categories in the basket of the
+        overlay in the order in which they were added
+        """
+
+        itemCategories = [itemCode for itemCode in self._base.getItemCategoriesInBasket()
+                          if self._basket[itemCode] > 0]
+        for itemCode in self._counts:
+            if (self._counts[itemCode] > 0 and not itemCode in self._base._itemTotals):
+                itemCategories.append(itemCode)
+        return itemCategories
+
+    def copyTo(self, other):
+        """Apply the basket of the overlay to the other checkout.
+
+        Applying the overlay to its own base only applies the changed
+        categories and sends a single signal naming them. Any other
+        checkout receives a full copy of the basket and a full signal.
+        """
+
+        if (not isinstance(other, Checkout)):
+            raise TypeError
+
+        if (other is self._base):
+            other.apply(self.getChanges())
+            return
+
+        basket = copy.copy(self._base._basket)
+        for itemCode in self._counts:
+            basket[itemCode] = self._counts[itemCode]
+        other._basket = basket
+        other._itemsCatalogue = self._itemsCatalogue
+        other._useCatalogue(self._catalogue)
+        other._recalculateTotals()
+        other.signal()
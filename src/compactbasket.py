@@ -0,0 +1,77 @@
+from array import array
+from collections.abc import MutableMapping
+
+class CompactBasket(MutableMapping):
+    """Basket that stores item counts in a flat array of unsigned ints.
+
+    The basket behaves like the dictionary of item codes and counts
+    used by Checkout, but keeps one 4-byte counter per catalogue item
+    in an array('I') indexed by the position of the item in the
+    catalogue. The dictionary of positions is shared by all copies of
+    a basket, so copying a basket only copies the array.
+
+    Attributes:
+        _positions (dict): Item codes as keys and array indices as
+            values. Shared between copies and never modified.
+        _counts (array): Number of items per catalogue position.
+
+    Methods:
+        getCounts(self)
+    """
+
+    __slots__ = ("_positions", "_counts")
+
+    def __init__(self, positions, counts=None):
+        """Initialise the basket.
+
+        Parameters:
+            positions (dict): Item codes as keys and array indices
+                from 0 to len(positions)-1 as values.
+
+            counts (None or array): Item counts per position. The
+                basket is empty if None.
+        """
+
+        if (not isinstance(positions, dict)):
+            raise TypeError
+        if (counts is None):
+            counts = array("I", bytes(4 * len(positions)))
+        elif (not (isinstance(counts, array) and counts.typecode == "I")):
+            raise TypeError
+        elif (len(counts) != len(positions)):
+            raise ValueError
+
+        self._positions = positions
+        self._counts = counts
+
+    def __getitem__(self, itemCode):
+        return self._counts[self._positions[itemCode]]
+
+    def __setitem__(self, itemCode, count):
+        # Raises KeyError for item codes that are not in the catalogue
+        # and OverflowError for negative counts
+        self._counts[self._positions[itemCode]] = count
+
+    def __delitem__(self, itemCode):
+        # Every catalogue item always has a counter
+        raise TypeError("items cannot be deleted from a CompactBasket")
+
+    def __contains__(self, itemCode):
+        return itemCode in self._positions
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __copy__(self):
+        return CompactBasket(self._positions, array("I", self._counts))
+
+    def __repr__(self):
+        return "CompactBasket({})".format(dict(self.items()))
+
+    def getCounts(self):
+        """Return the array of item counts in catalogue order"""
+
+        return self._counts
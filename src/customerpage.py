@@ -1,10 +1,9 @@
 import tkinter as tk
 import tkinter.ttk as ttk
+import catalogue
 import checkout
+import updatescheduler
 import baskettotalwidget
-import iteminfocard
-import staffpage
-import staffloginpopup
 from time import strftime
 
 class CustomerPage:
@@ -16,11 +15,50 @@ class CustomerPage:
     login for advanced controls on the customer's basket.
     """
 
-    def __init__(self):
-        """Initialise the page"""
+    def __init__(self, journalPath=None, ledgerPath=None, scannerSource=None, priceUpdatesPath=None, instrument=False):
+        """Initialise the page
 
-        # default constructor for the checkout engine class
-        self._checkout = checkout.Checkout()
+        Parameters:
+            journalPath (None or str): Path of the transaction journal
+                from which an interrupted basket is recovered and to
+                which every change of the basket is written. Nothing
+                is journaled if None.
+
+            ledgerPath (None or str): Path of the SQLite sales ledger
+                in which the completed transactions are recorded.
+                Nothing is recorded if None.
+
+            scannerSource (None, str or tuple): FIFO, device or socket
+                path, or (host, port), from which a barcode scanner
+                is read. Items are only added with the buttons if None.
+
+            priceUpdatesPath (None or str): Path of a JSON file of price
+                and offer updates, which are applied to the catalogue
+                whenever the file changes.
+
+            instrument (bool): Record the latencies from the scans to
+                the repaints of the screen, which are dumped on SIGUSR1
+                or with Control-Alt-i on the staff page.
+        """
+
+        # checkout engine on a catalogue of the default items, which
+        # reprices the basket when prices or offers are updated
+        self._catalogue = catalogue.Catalogue.fromItemsAndPrices(checkout.Checkout.defaultItemsAndPrices)
+        self._checkout = checkout.Checkout(None, self._catalogue)
+
+        # Recover the basket of a crashed session and journal the new changes
+        self._journal = None
+        if (journalPath is not None):
+            import journal
+            self._journal = journal.TransactionJournal(journalPath)
+            droppedItems = self._journal.attach(self._checkout, "customerPage")
+            for itemCode in droppedItems:
+                print("Unknown item code {!r} was dropped from the recovered basket.".format(itemCode))
+
+        self._ledger = None
+        if (ledgerPath is not None):
+            import ledger
+            self._ledger = ledger.SalesLedger(ledgerPath)
 
         # root with 2 rows
         self.root = tk.Tk()
@@ -28,6 +66,12 @@ class CustomerPage:
         self.root.resizable(False,False)
         self.root.title("Point of sale")
         self.root.iconbitmap(r"../resources/shoppingCart.ico")
+        self.root.protocol("WM_DELETE_WINDOW", self._onClose)
+
+        if (instrument):
+            import instrumentation
+            instrumentation.getSharedInstrumentation().enable(self.root)
+            instrumentation.getSharedInstrumentation().installSignalHandler()
 
         # Main window has 2 rows
         self.root.rowconfigure(0,weight=0)
@@ -74,12 +118,10 @@ class CustomerPage:
         self.scanButtonsFrame.grid_propagate(False)
 
         # The scan apple button
-        photoScanApple = tk.PhotoImage(file = r"../resources/AppleIcon.png").subsample(6,6)
         self.btnScanApple = \
           tk.Button(self.scanButtonsFrame,
           text = "Apple",
           font = "Calibri 20 bold",
-          image=photoScanApple,
           compound=tk.BOTTOM,
           bg="white", activebackground="white",
           bd=2,
@@ -87,12 +129,10 @@ class CustomerPage:
         self.btnScanApple.grid(row=0, column=0, sticky="news", pady=3)
 
         # The scan banana button
-        photoScanBanana = tk.PhotoImage(file = r"../resources/BananaIcon.png").subsample(6,6)
         self.btnScanBanana = \
           tk.Button(self.scanButtonsFrame,
           text = "Banana",
           font = "Calibri 20 bold",
-          image=photoScanBanana,
           compound=tk.BOTTOM,
           bg="white", activebackground="white",
           bd=2,
@@ -100,12 +140,10 @@ class CustomerPage:
         self.btnScanBanana.grid(row=1, column=0, sticky="news", pady=3)
 
         # The scan pear button
-        photoScanPear = tk.PhotoImage(file = r"../resources/PearIcon.png").subsample(6,6)
         self.btnScanPear = \
           tk.Button(self.scanButtonsFrame,
           text = "Pear",
           font = "Calibri 20 bold",
-          image=photoScanPear,
           compound=tk.BOTTOM,
           bg="white", activebackground="white",
           bd=2,
@@ -114,45 +152,112 @@ class CustomerPage:
 
         # frame for the list of the already scanned items
         self.scannedItemsFrame = tk.LabelFrame(self.shoppingFrame, width = 350, bg="white", padx=10, pady=5, bd=0, highlightthickness=0, highlightbackground="darkgrey")
-        # frame has 5 rows, 3 for the 3 items, 1 empty and 1 for the total cost
-        self.scannedItemsFrame.rowconfigure(0,weight=0)
+        # frame has 2 rows, 1 for the scrollable list of items and 1 for the total cost
+        self.scannedItemsFrame.rowconfigure(0,weight=1)
         self.scannedItemsFrame.rowconfigure(1,weight=0)
-        self.scannedItemsFrame.rowconfigure(2,weight=0)
-        self.scannedItemsFrame.rowconfigure(3,weight=1)
         self.scannedItemsFrame.columnconfigure(0,weight=1)
 
         # frame is positioned on the right side of the bottom row of the parent
         self.scannedItemsFrame.grid(row=0,column=1, sticky="news", padx=10)
         self.scannedItemsFrame.grid_propagate(False)
 
-        # the 3 items
-        itemsCatalogue = self._checkout.getItemsCatalogue()
-        self.labelApple = iteminfocard.ItemInfoCard(self.scannedItemsFrame, itemsCatalogue["A"], "customerPage")
-        self.labelBanana = iteminfocard.ItemInfoCard(self.scannedItemsFrame, itemsCatalogue["B"], "customerPage")
-        self.labelPear = iteminfocard.ItemInfoCard(self.scannedItemsFrame, itemsCatalogue["P"], "customerPage")
-        self._checkout.register(self.labelApple)
-        self._checkout.register(self.labelBanana)
-        self._checkout.register(self.labelPear)
+        # Widgets are updated at most once per frame however fast items are scanned
+        self._updateScheduler = updatescheduler.UpdateScheduler(self.root)
 
         # total and checkout
         self.basketAndCheckout = tk.LabelFrame(self.scannedItemsFrame, bg="white", bd=0, highlightthickness=0)
         self.basketAndCheckout.columnconfigure(0,weight=1)
         self.basketAndCheckout.columnconfigure(1,weight=0)
         self.basketAndCheckout.rowconfigure(0,weight=1)
-        self.basketAndCheckout.grid(row=3, column=0, sticky = "ews", padx=0)
+        self.basketAndCheckout.grid(row=1, column=0, sticky = "ews", padx=0)
 
         self.labelTotalWidget = baskettotalwidget.BasketTotalWidget(self.basketAndCheckout)
         self.labelTotalWidget.grid(row=0, column=0, sticky="ew", padx=5, pady=5)
-        self._checkout.register(self.labelTotalWidget)
+        self._checkout.register(self._updateScheduler.deferred(self.labelTotalWidget))
 
         self.btnCheckout = tk.Button(self.basketAndCheckout, text = "Checkout", font = "Calibri 20 bold",
           bg="#51990F", activebackground="#B6E119", bd=2,command = lambda: self._onCheckout())
         self.btnCheckout.grid(row=0, column=1, sticky="news", padx=5, pady=5)
 
         self._showTime()
+        if (self._journal is not None):
+            self._commitJournal()
+
+        self._catalogueWatcher = None
+        if (priceUpdatesPath is not None):
+            import cataloguewatcher
+            self._catalogueWatcher = cataloguewatcher.CatalogueWatcher(self._catalogue, priceUpdatesPath, self.root)
+            self._catalogueWatcher.start()
+
+        # Bursts of scans are read on a background thread and applied
+        # to the basket in batches on this thread
+        self._scannerInput = None
+        if (scannerSource is not None):
+            import scannerinput
+            self._scannerInput = scannerinput.ScannerInput(self.root, self._checkout, self._onUnknownItem)
+            self._scannerInput.start(scannerSource)
+
+        # The basket list and the icons are not needed to show the page, so
+        # they are built once the skeleton of the page is on the screen
+        self._deferredWidgetsLoaded = False
+        self.root.bind("<Map>", self._onMap)
 
         # Run the window
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self._shutDown()
+
+    def _onMap(self, event):
+        """Schedule the deferred widgets once the main window is shown"""
+
+        if (event.widget is self.root and not self._deferredWidgetsLoaded):
+            self._deferredWidgetsLoaded = True
+            self.root.after_idle(self._loadDeferredWidgets)
+
+    def _loadDeferredWidgets(self):
+        """Build the basket list and load the icons of the scan buttons"""
+
+        import basketview
+
+        # Scrollable list of the items in the basket, with cards for
+        # the visible rows only
+        self.basketView = basketview.BasketView(self.scannedItemsFrame, self._checkout)
+        self.basketView.grid(row=0, column=0, sticky="news")
+        self._checkout.register(self._updateScheduler.deferred(self.basketView))
+        # Show any items scanned before the list existed
+        self.basketView.slot(self._checkout)
+
+        # Icons of the scan buttons come from the shared image cache
+        itemsCatalogue = self._checkout.getItemsCatalogue()
+        self.btnScanApple.config(image=itemsCatalogue["A"].getImage(6))
+        self.btnScanBanana.config(image=itemsCatalogue["B"].getImage(6))
+        self.btnScanPear.config(image=itemsCatalogue["P"].getImage(6))
+
+    def _onClose(self):
+        """Action for when the main window is closed"""
+
+        self._shutDown()
+        self.root.destroy()
+
+    def _shutDown(self):
+        """Stop the background inputs and write and close the ledger and
+        the journal. Closing the window and leaving the main loop both
+        shut down, so the second time does nothing.
+        """
+
+        if (self._scannerInput is not None):
+            self._scannerInput.stop()
+            self._scannerInput = None
+        if (self._catalogueWatcher is not None):
+            self._catalogueWatcher.stop()
+            self._catalogueWatcher = None
+        if (self._ledger is not None):
+            self._ledger.close()
+            self._ledger = None
+        if (self._journal is not None):
+            self._journal.close()
+            self._journal = None
 
     def getPageName(self):
         """Return 'customerPage'"""
@@ -162,6 +267,7 @@ class CustomerPage:
     def _staffLogin(self):
         """Load the staff login page"""
 
+        import staffloginpopup
         self.staffLoginPopup = staffloginpopup.StaffLoginPopup(self)
 
     def openStorePage(self, username):
@@ -169,9 +275,26 @@ class CustomerPage:
 
         if (not isinstance(username, str)):
             raise TypeError
+        import staffpage
         self.storePage = staffpage.StaffPage(self, username)
+        # The staff page edits a snapshot of the basket, so scans wait
+        # in the queue until it is closed
+        if (self._scannerInput is not None):
+            self._scannerInput.paused = True
+            self.storePage.bind("<Destroy>", self._onStorePageDestroyed, add="+")
         self.staffLoginPopup.after(400, self.staffLoginPopup.destroy)
 
+    def _onStorePageDestroyed(self, event):
+        """Resume the scanner input once the staff page is closed"""
+
+        if (event.widget is self.storePage):
+            self._scannerInput.paused = False
+
+    def _onUnknownItem(self, itemCode):
+        """Report an item code read from the scanner that is not sold"""
+
+        print("Unknown item code {!r} was scanned.".format(itemCode))
+
     def _showTime(self):
         """Update the clock of the application every 1 second"""
 
@@ -179,6 +302,15 @@ class CustomerPage:
         self.labelTime.config(text=time_string, font = "Calibri 15", fg="white")
         self.labelTime.after(1000,self._showTime) # time delay of 1000 milliseconds 
 
+    def _commitJournal(self):
+        """Write the buffered journal records to disk every 100ms"""
+
+        # The journal is closed when the page shuts down
+        if (self._journal is None):
+            return
+        self._journal.commit()
+        self.root.after(100, self._commitJournal)
+
     def getCheckout(self):
         """Get the internal engine that runs under the hood of this page"""
 
@@ -196,7 +328,8 @@ class CustomerPage:
 
         if (not isinstance(listItemCodeAndaction, str)):
             raise TypeError
-        if (not (len(listItemCodeAndaction) <= 3 and( listItemCodeAndaction=="all" or listItemCodeAndaction.endswith("-A") or not listItemCodeAndaction in self._checkout.getBasket().keys()))):
+        # Actions are "all" or an item code followed by "-A", "+1", "-1" or " 0"
+        if (not (listItemCodeAndaction=="all" or listItemCodeAndaction[:-2] in self._checkout.getItemsCatalogue())):
             raise ValueError
         if (not isinstance(signalStrength, str)):
             raise TypeError
@@ -210,40 +343,42 @@ class CustomerPage:
             # This block is added merely because this specific functionality was asked
             # to be implemented in this specific way.
             #
-            tempItemCodeList = []
-            # get the basket keys
-            for itemCode in self._checkout.getBasket().keys():
-                # Append the itemCode to the temporary list as many times
-                # as there are items with itemCode in the basket
-                for index in range(self._checkout.getBasket()[itemCode]):
-                    tempItemCodeList.append(itemCode)
+            # The basket already holds the number of items per item code,
+            # so only its categories with items are passed instead of
+            # expanding it to a list of item codes that would then be
+            # counted again
+            basket = self._checkout.getBasket()
+            basket = {itemCode: basket[itemCode] for itemCode in self._checkout.getItemCategoriesInBasket()}
 
             # Create a temporary dictionary that only holds
-            # item code and item price
+            # item code and item price of the items in the basket
             tempItemPricesDict = {}
-            for itemCode in self._checkout.getItemsCatalogue().keys():
+            for itemCode in self._checkout.getItemCategoriesInBasket():
                 tempItemPricesDict[itemCode]=self._checkout.getItemsCatalogue()[itemCode].getPrice()
 
             # call the function
-            print("You paid {}p.".format(self._checkout.checkout(tempItemCodeList, tempItemPricesDict)))
+            print("You paid {}p.".format(self._checkout.checkout(basket, tempItemPricesDict)))
             #
             # END OF BLOCK
             #
             ###################################################
 
+            if (self._ledger is not None):
+                # The journal forgets the basket once it is checked out,
+                # so the sale is written now rather than with a batch
+                self._ledger.recordTransaction(self._checkout, "customerPage")
+                self._ledger.flush()
+            if (self._journal is not None):
+                self._journal.recordCheckout(self._checkout)
             self._checkout.clearBasket()
             return
         # Remove all items that belong to a specific category
         elif (listItemCodeAndaction.endswith("-A")):
-            for widget in self.scannedItemsFrame.grid_slaves():
-              if (not isinstance(widget, iteminfocard.ItemInfoCard)):
-                continue
-              if (widget.getItemCode()==listItemCodeAndaction[0]):
-                self._checkout.clearBasket(widget.getItemCode(), signalStrength)
+            self._checkout.clearBasket(listItemCodeAndaction[:-2], signalStrength)
         # add or remove 1 item
         else:
-            itemCode = listItemCodeAndaction[0]
-            action=int(listItemCodeAndaction[1:3])
+            itemCode = listItemCodeAndaction[:-2]
+            action=int(listItemCodeAndaction[-2:])
             if (action==-1):
                 self._checkout.unscan(itemCode, signalStrength)
             elif (action==1):
@@ -0,0 +1,170 @@
+"""Headless mode of the point of sale application.
+
+Drives the checkout engine from a stream of scan events, e.g. a file
+or the standard input, without importing tkinter, and prints the total
+cost and savings of every transaction. Every line holds one event:
+
+    A                 scan one item with code A
+    scan A [count]    scan count items with code A (default 1)
+    unscan A [count]  remove count items with code A (default 1)
+    clear [A]         remove all items with code A, or all items
+    checkout          pay for the basket and start a new transaction
+
+Blank lines and lines starting with # are ignored.
+"""
+
+import sys
+import catalogue
+import checkout
+import journal
+
+class HeadlessCheckout():
+    """Checkout engine driven by text scan events.
+
+    Attributes:
+        _checkout (Checkout instance): The engine holding the basket.
+        _output (file): Where transaction totals are printed.
+        _errors (file): Where invalid events are reported.
+        _journal (None or TransactionJournal instance): Journal of the
+            basket changes and checkouts.
+        _ledger (None or SalesLedger instance): Ledger in which the
+            completed transactions are recorded.
+        numberOfTransactions (int): Transactions checked out so far.
+        numberOfErrors (int): Invalid events seen so far.
+
+    Methods:
+        processEvent(self, line)
+
+        run(self, stream)
+    """
+
+    def __init__(self, checkout_, output=None, errors=None, journal=None, ledger=None):
+        """Initialise the headless engine.
+
+        Parameters:
+            checkout_ (Checkout instance): The engine to drive.
+
+            output (None or file): Where transaction totals are
+                printed. Standard output if None.
+
+            errors (None or file): Where invalid events are reported.
+                Standard error if None.
+
+            journal (None or TransactionJournal instance): Journal
+                attached to checkout_ in which checkouts are recorded.
+
+            ledger (None or SalesLedger instance): Ledger in which the
+                completed transactions are recorded.
+        """
+
+        if (not isinstance(checkout_, checkout.Checkout)):
+            raise TypeError
+
+        self._checkout = checkout_
+        self._output = output if output is not None else sys.stdout
+        self._errors = errors if errors is not None else sys.stderr
+        self._journal = journal
+        self._ledger = ledger
+        self.numberOfTransactions = 0
+        self.numberOfErrors = 0
+
+    def processEvent(self, line):
+        """Apply one scan event to the basket. Raise ValueError or
+        TypeError if the event is invalid.
+        """
+
+        if (not isinstance(line, str)):
+            raise TypeError
+
+        words = line.split()
+        if (not words or words[0].startswith("#")):
+            return
+        action = words[0].lower()
+
+        if (action == "checkout" and len(words) == 1):
+            self._checkoutBasket()
+        elif (action == "clear" and len(words) <= 2):
+            self._checkout.clearBasket(words[1] if len(words) == 2 else "all", "weak")
+        elif (action in ["scan", "unscan"] and len(words) in [2, 3]):
+            count = int(words[2]) if len(words) == 3 else 1
+            if (count <= 0):
+                raise ValueError
+            self._checkout.apply({words[1]: count if action == "scan" else -count}, "weak")
+        elif (len(words) == 1):
+            self._checkout.scan(words[0], "weak")
+        else:
+            raise ValueError
+
+    def _checkoutBasket(self):
+        """Print the totals of the basket and empty it"""
+
+        totalCost, savings = self._checkout.total()
+        self.numberOfTransactions += 1
+        self._output.write("Transaction {}: {} items, total {}p, savings {}p\n".format(
+            self.numberOfTransactions, self._checkout.getNumberOfItems(), totalCost, savings))
+        if (self._ledger is not None):
+            # The journal forgets the basket once it is checked out,
+            # so the sale is written now rather than with a batch
+            self._ledger.recordTransaction(self._checkout, "headless")
+            self._ledger.flush()
+        if (self._journal is not None):
+            self._journal.recordCheckout(self._checkout)
+        self._checkout.clearBasket(signalStrength="weak")
+
+    def run(self, stream):
+        """Process every event of stream. Invalid events are reported
+        and skipped. Return the number of invalid events.
+        """
+
+        for lineNumber, line in enumerate(stream, 1):
+            try:
+                self.processEvent(line)
+            except (TypeError, ValueError):
+                self.numberOfErrors += 1
+                self._errors.write("line {}: invalid event {!r}\n".format(lineNumber, line.strip()))
+
+        if (self._checkout.getNumberOfItems() > 0):
+            self._errors.write("{} items were scanned after the last checkout\n".format(
+                self._checkout.getNumberOfItems()))
+        return self.numberOfErrors
+
+
+def main(inputPath=None, cataloguePath=None, journalPath=None, ledgerPath=None):
+    """Run the headless engine on a file, or on the standard input if
+    inputPath is None. The basket is recovered from and journaled to
+    journalPath if it is not None, and the completed transactions are
+    recorded in the sales ledger at ledgerPath if it is not None.
+    Return 1 if any event was invalid, else 0.
+    """
+
+    if (cataloguePath is None):
+        checkout_ = checkout.Checkout()
+    else:
+        checkout_ = checkout.Checkout(None, catalogue.Catalogue.load(cataloguePath))
+
+    journal_ = None
+    if (journalPath is not None):
+        journal_ = journal.TransactionJournal(journalPath)
+        droppedItems = journal_.attach(checkout_, "headless")
+        for itemCode in droppedItems:
+            print("Unknown item code {!r} was dropped from the recovered basket.".format(itemCode), file=sys.stderr)
+
+    ledger_ = None
+    if (ledgerPath is not None):
+        # sqlite3 is only imported when a ledger is kept
+        import ledger
+        ledger_ = ledger.SalesLedger(ledgerPath)
+
+    engine = HeadlessCheckout(checkout_, journal=journal_, ledger=ledger_)
+    try:
+        if (inputPath is None):
+            numberOfErrors = engine.run(sys.stdin)
+        else:
+            with open(inputPath, encoding="utf-8") as stream:
+                numberOfErrors = engine.run(stream)
+    finally:
+        if (ledger_ is not None):
+            ledger_.close()
+        if (journal_ is not None):
+            journal_.close()
+    return 1 if numberOfErrors else 0
@@ -0,0 +1,169 @@
+import tkinter as tk
+import hashlib
+import os
+from collections import OrderedDict
+
+class ImageCache():
+    """Cache of decoded and pre-scaled images shared by all pages.
+
+    Images are decoded from disk the first time they are requested and
+    kept in memory keyed by (path, subsample factor), so that pages and
+    widgets showing the same icon share a single PhotoImage. The least
+    recently used images are evicted when the estimated memory of the
+    cached images exceeds a cap. Scaled down images can optionally be
+    written to a thumbnail directory so that later runs of the
+    application load the small image instead of decoding and
+    subsampling the original one.
+
+    Attributes:
+        _maxBytes (int): Memory cap of the cache in bytes.
+        _thumbnailDirectory (None or str): Directory of the on-disk
+            cache of pre-scaled images.
+        _loader (callable): Function that decodes an image file into a
+            tkinter PhotoImage (or any object with the same width,
+            height, subsample and write methods).
+        _images (OrderedDict): (path, subsample) tuples as keys and
+            images as values in least to most recently used order.
+        _usedBytes (int): Estimated memory of the cached images.
+
+    Methods:
+        getImage(self, path, subsample=1)
+
+        getUsedBytes(self)
+
+        clear(self)
+    """
+
+    # Estimated memory of every pixel of a decoded image
+    bytesPerPixel = 4
+
+    def __init__(self, maxBytes=32*1024*1024, thumbnailDirectory=None, loader=None):
+        """Initialise an empty cache.
+
+        Parameters:
+            maxBytes (int): Memory cap of the cache in bytes.
+
+            thumbnailDirectory (None or str): Directory in which to
+                keep pre-scaled images. No images are written to disk
+                if None.
+
+            loader (None or callable): Function that takes a path and
+                returns a decoded image. tkinter PhotoImage if None.
+        """
+
+        if (not isinstance(maxBytes, int)):
+            raise TypeError
+        if (maxBytes <= 0):
+            raise ValueError
+        if (not (thumbnailDirectory is None or isinstance(thumbnailDirectory, str))):
+            raise TypeError
+        if (not (loader is None or callable(loader))):
+            raise TypeError
+
+        self._maxBytes = maxBytes
+        self._thumbnailDirectory = thumbnailDirectory
+        self._loader = loader if loader is not None else (lambda path: tk.PhotoImage(file = path))
+        self._images = OrderedDict()
+        self._usedBytes = 0
+
+    def getImage(self, path, subsample=1):
+        """Return the image at path scaled down by subsample, decoding
+        it only if it is not already cached.
+        """
+
+        if (not isinstance(path, str)):
+            raise TypeError
+        if (not isinstance(subsample, int)):
+            raise TypeError
+        if (subsample <= 0):
+            raise ValueError
+
+        key = (path, subsample)
+        if (key in self._images):
+            self._images.move_to_end(key)
+            return self._images[key]
+
+        image = self._load(path, subsample)
+        self._images[key] = image
+        self._usedBytes += self._sizeOf(image)
+        # Evict least recently used images but always keep the new one
+        while (self._usedBytes > self._maxBytes and len(self._images) > 1):
+            _, evictedImage = self._images.popitem(last=False)
+            self._usedBytes -= self._sizeOf(evictedImage)
+        return image
+
+    def getUsedBytes(self):
+        """Return the estimated memory of the cached images in bytes"""
+
+        return self._usedBytes
+
+    def clear(self):
+        """Remove all images from the memory cache"""
+
+        self._images.clear()
+        self._usedBytes = 0
+
+    def _sizeOf(self, image):
+        """Return the estimated memory of a decoded image in bytes"""
+
+        return image.width() * image.height() * self.bytesPerPixel
+
+    def _thumbnailPath(self, path, subsample):
+        """Return the path of the pre-scaled copy of an image. The name
+        changes whenever the original image file changes.
+        """
+
+        status = os.stat(path)
+        fingerprint = "{}|{}|{}".format(os.path.abspath(path), status.st_mtime_ns, status.st_size)
+        name = "{}_{}.png".format(hashlib.sha1(fingerprint.encode("utf-8")).hexdigest(), subsample)
+        return os.path.join(self._thumbnailDirectory, name)
+
+    def _load(self, path, subsample):
+        """Decode the image at path and scale it down by subsample,
+        going through the thumbnail directory if there is one
+        """
+
+        if (subsample == 1 or self._thumbnailDirectory is None):
+            image = self._loader(path)
+            return image if subsample == 1 else image.subsample(subsample, subsample)
+
+        thumbnailPath = self._thumbnailPath(path, subsample)
+        if (os.path.isfile(thumbnailPath)):
+            return self._loader(thumbnailPath)
+
+        image = self._loader(path).subsample(subsample, subsample)
+        try:
+            os.makedirs(self._thumbnailDirectory, exist_ok=True)
+            # Write to a temporary file first so that a crash never
+            # leaves a half written thumbnail behind
+            temporaryPath = thumbnailPath + ".tmp"
+            image.write(temporaryPath, format="png")
+            os.replace(temporaryPath, thumbnailPath)
+        except (OSError, tk.TclError):
+            # The on-disk cache is an optimisation only
+            pass
+        return image
+
+
+# The cache shared by all pages of the application
+_sharedCache = None
+
+def getSharedCache():
+    """Return the image cache shared by all pages, creating it on first
+    use.
+    """
+
+    global _sharedCache
+    if (_sharedCache is None):
+        _sharedCache = ImageCache()
+    return _sharedCache
+
+def setSharedCache(cache):
+    """Replace the image cache shared by all pages, e.g. with one that
+    has a thumbnail directory or a different memory cap.
+    """
+
+    global _sharedCache
+    if (not isinstance(cache, ImageCache)):
+        raise TypeError
+    _sharedCache = cache
@@ -0,0 +1,481 @@
+import functools
+import importlib
+import sys
+import time
+from collections import Counter
+
+class LatencyHistogram():
+    """Log-linear histogram of latencies in nanoseconds, in the style
+    of an HDR histogram.
+
+    Every power of two is split into 2**subBucketBits buckets of equal
+    width, so that any recorded value is known to within 1 part in
+    2**subBucketBits (about 3% by default) whatever its magnitude.
+    Recording a value is a couple of integer operations and an
+    increment, and the memory used grows with the logarithm of the
+    largest value recorded.
+
+    Attributes:
+        _subBucketBits (int): Number of bits of precision kept.
+        _counts (list): Number of values recorded in every bucket.
+        count (int): Number of values recorded.
+        total (int): Sum of the values recorded.
+        min (None or int): Smallest value recorded.
+        max (None or int): Largest value recorded.
+
+    Methods:
+        record(self, value)
+
+        percentile(self, percent)
+
+        mean(self)
+
+        reset(self)
+
+        toDict(self)
+    """
+
+    __slots__ = ("_subBucketBits", "_counts", "count", "total", "min", "max")
+
+    def __init__(self, subBucketBits=5):
+        """Initialise an empty histogram.
+
+        Parameters:
+            subBucketBits (int): Buckets per power of two, as a power
+                of two.
+        """
+
+        if (not isinstance(subBucketBits, int)):
+            raise TypeError
+        if (subBucketBits < 1 or subBucketBits > 16):
+            raise ValueError
+
+        self._subBucketBits = subBucketBits
+        self._counts = []
+        self.reset()
+
+    def reset(self):
+        """Forget all the recorded values"""
+
+        self._counts = []
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def _bucketIndex(self, value):
+        """Return the index of the bucket of value"""
+
+        shift = value.bit_length() - self._subBucketBits - 1
+        if (shift <= 0):
+            return value
+        return (shift << self._subBucketBits) + (value >> shift)
+
+    def _bucketBounds(self, index):
+        """Return the lowest and highest values of the bucket index"""
+
+        if (index < 2 << self._subBucketBits):
+            return index, index
+        shift = (index >> self._subBucketBits) - 1
+        mantissa = index - (shift << self._subBucketBits)
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def record(self, value):
+        """Record one latency in nanoseconds"""
+
+        if (value < 0):
+            value = 0
+        index = self._bucketIndex(value)
+        counts = self._counts
+        if (index >= len(counts)):
+            counts.extend([0] * (index + 1 - len(counts)))
+        counts[index] += 1
+        self.count += 1
+        self.total += value
+        if (self.min is None or value < self.min):
+            self.min = value
+        if (self.max is None or value > self.max):
+            self.max = value
+
+    def percentile(self, percent):
+        """Return the highest value of the bucket holding the given
+        percentile of the recorded values, or 0 if nothing is recorded
+        """
+
+        if (not isinstance(percent, (int, float))):
+            raise TypeError
+        if (percent < 0 or percent > 100):
+            raise ValueError
+        if (self.count == 0):
+            return 0
+
+        rank = max(1, -(-self.count * percent // 100))
+        seen = 0
+        for index, count in enumerate(self._counts):
+            seen += count
+            if (seen >= rank):
+                return min(self._bucketBounds(index)[1], self.max)
+        return self.max
+
+    def mean(self):
+        """Return the mean of the recorded values, 0 if there are none"""
+
+        return self.total / self.count if self.count else 0
+
+    def toDict(self):
+        """Return the summary statistics of the histogram"""
+
+        return {"count": self.count, "mean": self.mean(), "min": self.min or 0,
+                "p50": self.percentile(50), "p90": self.percentile(90),
+                "p99": self.percentile(99), "p999": self.percentile(99.9), "max": self.max or 0}
+
+
+class Instrumentation():
+    """Latency histograms and counters of the path from a scan to the
+    repaint of the screen.
+
+    When enabled, the methods named in targets are replaced on their
+    classes with wrappers timing every call into a histogram named
+    after the class and the method, e.g. "ItemInfoCard._update". The
+    wrappers cover the mutations of the checkout and of its trusted
+    view, its signal, the slot of every kind of listener, the update
+    methods of the widgets and the flushes of the update scheduler. The time spent in a scan
+    outside of _setItemCount and signal is validation.
+
+    Given the root window, the time between the first change of a
+    basket and the moment the event loop is idle again after the next
+    flush of an update scheduler, i.e. after tkinter has redrawn the
+    widgets, is recorded as "scanToPaint", and the part after the flush
+    as "tkRepaint". The clock is kept per checkout and only a flush of
+    the listeners of a checkout paints its changes. Changes signalled
+    to no listener of an update scheduler, e.g. those of the staff page
+    overlay or of a recovered basket, are never painted by a flush and
+    are not recorded.
+
+    When disabled, the original methods are put back, so instrumentation
+    costs nothing unless it is enabled. Recording takes no lock, so
+    calls made on several threads at once, e.g. by the lane server, may
+    occasionally be missed by the histograms.
+
+    Attributes:
+        _targets (tuple): (module name, class name, method names)
+            tuples of the methods to time.
+        _clock (callable): Returns the time in nanoseconds.
+        _histograms (dict): Names as keys and LatencyHistogram
+            instances as values.
+        _counters (Counter): Names as keys and counts as values.
+        _originals (list): (class, method name, original method)
+            tuples of the methods replaced while enabled.
+        _root (None or tkinter widget): Widget whose after_idle method
+            schedules the repaint probes.
+        _changeStarts (dict): Checkouts as keys and the time of the
+            first change of their basket not yet flushed as values.
+        _paintStarts (dict): Checkouts as keys and the time of the
+            first change of their basket flushed but not yet painted
+            as values.
+        _flushEnd (None or int): Time of the end of the last flush not
+            yet painted.
+        _probeId (None or str): Identifier of the scheduled probe.
+
+    Methods:
+        enable(self, root=None, widgets=True)
+
+        disable(self)
+
+        isEnabled(self)
+
+        histogram(self, name)
+
+        count(self, name, increment=1)
+
+        reset(self)
+
+        toDict(self)
+
+        report(self)
+
+        dump(self, stream=None, format="text")
+
+        installSignalHandler(self, signalNumber=None, stream=None, format="text")
+    """
+
+    # Checkout methods that change a basket
+    mutations = ("scan", "unscan", "clearBasket", "scanMany", "apply", "reprice")
+
+    defaultTargets = (
+        ("checkout", "Checkout", mutations + ("_setItemCount", "signal", "_publish", "copyTo", "checkout")),
+        ("checkout", "_TrustedCheckout", mutations + ("checkout",)),
+        ("checkoutoverlay", "CheckoutOverlay", ("_setItemCount", "copyTo", "discard")),
+        ("journal", "TransactionJournal", ("slot", "commit")),
+        ("updatescheduler", "UpdateScheduler", ("flush",)),
+        ("updatescheduler", "_DeferredListener", ("slot",)),
+        ("iteminfocard", "ItemInfoCard", ("slot", "_update")),
+        ("baskettotalwidget", "BasketTotalWidget", ("slot", "_update")),
+        ("basketview", "BasketView", ("slot", "_refresh")),
+        ("staffpagecontrols", "StaffPageControls", ("slot",)))
+
+    # Modules of the targets that import tkinter
+    widgetModules = ("updatescheduler", "iteminfocard", "baskettotalwidget", "basketview", "staffpagecontrols")
+
+    def __init__(self, targets=None, clock=time.perf_counter_ns):
+        """Initialise disabled instrumentation.
+
+        Parameters:
+            targets (None or iterable): (module name, class name, method
+                names) tuples of the methods to time. defaultTargets if
+                None.
+
+            clock (callable): Returns the time in nanoseconds.
+        """
+
+        if (not callable(clock)):
+            raise TypeError
+
+        self._targets = self.defaultTargets if targets is None else tuple(targets)
+        for target in self._targets:
+            if (not isinstance(target, tuple) or len(target) != 3):
+                raise TypeError
+        self._clock = clock
+        self._histograms = {}
+        self._counters = Counter()
+        self._originals = []
+        self._root = None
+        self._changeStarts = {}
+        self._paintStarts = {}
+        self._flushEnd = None
+        self._probeId = None
+
+    def isEnabled(self):
+        """Return True if the methods are being timed"""
+
+        return bool(self._originals)
+
+    def enable(self, root=None, widgets=True):
+        """Start timing the target methods.
+
+        Parameters:
+            root (None or tkinter widget): Widget whose after_idle
+                method schedules the probes of the repaints, e.g. the
+                root window. Repaints are not timed if None.
+
+            widgets (bool): Also time the widgets and the update
+                scheduler, which imports tkinter. False for the
+                headless mode and the lane server.
+        """
+
+        if (not isinstance(widgets, bool)):
+            raise TypeError
+        if (self.isEnabled()):
+            return
+
+        self._root = root
+        for moduleName, className, methodNames in self._targets:
+            if (not widgets and moduleName in self.widgetModules):
+                continue
+            try:
+                module = importlib.import_module(moduleName)
+            except ImportError:
+                # e.g. tkinter is not installed
+                continue
+            cls = getattr(module, className)
+            for methodName in methodNames:
+                # Inherited methods are timed on the class defining them
+                if (not methodName in cls.__dict__):
+                    continue
+                original = cls.__dict__[methodName]
+                self._originals.append((cls, methodName, original))
+                setattr(cls, methodName, self._wrap(cls, methodName, original))
+
+    def disable(self):
+        """Put the original methods back. The statistics are kept."""
+
+        for cls, methodName, original in reversed(self._originals):
+            setattr(cls, methodName, original)
+        self._originals = []
+        if (self._probeId is not None):
+            self._root.after_cancel(self._probeId)
+        self._root = None
+        self._changeStarts = {}
+        self._paintStarts = {}
+        self._flushEnd = None
+        self._probeId = None
+
+    def _wrap(self, cls, methodName, function):
+        """Return a wrapper of function timing its calls"""
+
+        histogram = self.histogram("{}.{}".format(cls.__name__, methodName))
+        clock = self._clock
+        # The trusted view of a checkout changes the basket without
+        # going through the methods of the checkout, e.g. for the scans
+        # of a barcode scanner
+        if (cls.__name__ in ["Checkout", "_TrustedCheckout"] and methodName in self.mutations):
+            onStart = self._onChange
+        elif (cls.__name__ == "Checkout" and methodName == "_publish"):
+            onStart = self._onSignal
+        elif (cls.__name__ == "UpdateScheduler" and methodName == "flush"):
+            onStart = self._onFlush
+        else:
+            onStart = None
+        onEnd = self._onFlushed if (cls.__name__ == "UpdateScheduler" and methodName == "flush") else None
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = clock()
+            if (onStart is not None):
+                onStart(start, args)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                end = clock()
+                histogram.record(end - start)
+                if (onEnd is not None):
+                    onEnd(end)
+        return wrapper
+
+    def _onChange(self, start, args):
+        """Note the first unpainted change of a basket"""
+
+        # The trusted view of a checkout changes the checkout itself
+        checkout = getattr(args[0], "_checkout", args[0])
+        if (not checkout in self._changeStarts):
+            self._changeStarts[checkout] = start
+
+    def _onSignal(self, start, args):
+        """Count the signals and the listeners they reach, and forget
+        the changes that no flush will paint
+        """
+
+        checkout = args[0]
+        audience = checkout._audience(args[2])
+        self._counters["signals"] += 1
+        self._counters["signalledListeners"] += len(audience)
+        if (checkout in self._changeStarts):
+            # The scheduler is only loaded by the graphical user interface
+            scheduler = sys.modules.get("updatescheduler")
+            if (scheduler is None or
+                not any(isinstance(listener, scheduler._DeferredListener) for listener in audience)):
+                del self._changeStarts[checkout]
+
+    def _onFlush(self, start, args):
+        """Note the changes of the checkouts whose listeners are being
+        flushed as waiting for the repaint
+        """
+
+        for pending in args[0]._pending.values():
+            checkout = pending[0]
+            if (checkout in self._changeStarts):
+                changeStart = self._changeStarts.pop(checkout)
+                self._paintStarts[checkout] = min(changeStart, self._paintStarts.get(checkout, changeStart))
+
+    def _onFlushed(self, end):
+        """Probe the end of the repaint that follows a flush"""
+
+        self._flushEnd = end
+        if (self._root is not None and self._probeId is None):
+            self._probeId = self._root.after_idle(self._onIdle)
+
+    def _onIdle(self):
+        """Record the latencies ending with the repaint"""
+
+        now = self._clock()
+        self._probeId = None
+        if (self._flushEnd is not None):
+            self.histogram("tkRepaint").record(now - self._flushEnd)
+            self._flushEnd = None
+        for changeStart in self._paintStarts.values():
+            self.histogram("scanToPaint").record(now - changeStart)
+        self._paintStarts = {}
+
+    def histogram(self, name):
+        """Return the histogram with this name, creating it if needed"""
+
+        if (not isinstance(name, str)):
+            raise TypeError
+        if (not name in self._histograms):
+            self._histograms[name] = LatencyHistogram()
+        return self._histograms[name]
+
+    def count(self, name, increment=1):
+        """Add increment to the counter with this name"""
+
+        if (not isinstance(name, str) or not isinstance(increment, int)):
+            raise TypeError
+        self._counters[name] += increment
+
+    def reset(self):
+        """Forget all the statistics"""
+
+        for histogram in self._histograms.values():
+            histogram.reset()
+        self._counters.clear()
+
+    def toDict(self):
+        """Return the statistics of the histograms, in nanoseconds, and
+        the counters
+        """
+
+        return {"enabled": self.isEnabled(),
+                "histograms": {name: histogram.toDict() for name, histogram in sorted(self._histograms.items())
+                               if histogram.count},
+                "counters": dict(sorted(self._counters.items()))}
+
+    def report(self):
+        """Return the statistics as a text table in microseconds"""
+
+        lines = ["{:<32} {:>9} {:>9} {:>9} {:>9} {:>9} {:>9}".format(
+            "latency (us)", "count", "mean", "p50", "p90", "p99", "max")]
+        statistics = self.toDict()
+        for name, summary in statistics["histograms"].items():
+            lines.append("{:<32} {:>9} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f} {:>9.1f}".format(
+                name, summary["count"], summary["mean"] / 1000, summary["p50"] / 1000,
+                summary["p90"] / 1000, summary["p99"] / 1000, summary["max"] / 1000))
+        for name, value in statistics["counters"].items():
+            lines.append("{:<32} {:>9}".format(name, value))
+        if (not statistics["enabled"]):
+            lines.append("(instrumentation is disabled)")
+        return "\n".join(lines)
+
+    def dump(self, stream=None, format="text"):
+        """Write the statistics to stream, the standard error if None,
+        as a text table or as JSON
+        """
+
+        if (not format in ["text", "json"]):
+            raise ValueError
+        if (stream is None):
+            stream = sys.stderr
+        if (format == "json"):
+            import json
+            stream.write(json.dumps(self.toDict(), indent=1) + "\n")
+        else:
+            stream.write(self.report() + "\n")
+        stream.flush()
+
+    def installSignalHandler(self, signalNumber=None, stream=None, format="text"):
+        """Dump the statistics whenever the process receives a signal,
+        SIGUSR1 if signalNumber is None. Returns False on platforms
+        without SIGUSR1, e.g. Windows.
+        """
+
+        if (not format in ["text", "json"]):
+            raise ValueError
+        import signal
+        if (signalNumber is None):
+            if (not hasattr(signal, "SIGUSR1")):
+                return False
+            signalNumber = signal.SIGUSR1
+        signal.signal(signalNumber, lambda number, frame: self.dump(stream, format))
+        return True
+
+
+_sharedInstrumentation = None
+
+def getSharedInstrumentation():
+    """Return the instrumentation shared by all pages, creating it
+    disabled on first use.
+    """
+
+    global _sharedInstrumentation
+    if (_sharedInstrumentation is None):
+        _sharedInstrumentation = Instrumentation()
+    return _sharedInstrumentation
@@ -1,5 +1,3 @@
-import tkinter as tk
-
 class Item():
     """Class of items that can be bought from the supermarket.
 
@@ -19,8 +17,21 @@ class Item():
             and strings of paths to items' pictures as values. One
             picture per item and one path per picture.
 
+        costTableSize (int): Number of group sizes, from 0, for which
+            the cost of an item is first tabulated.
+
+        maxCostTableSize (int): Largest number of group sizes that the
+            cost table of an item grows to. Larger groups are priced
+            with the formula.
+
     Instance attributes:
-        code (str): 1-character alphabetic code.
+        code (str): Item code, one of the keys of dictItemNamePerCode
+            unless the item was loaded with a Catalogue.
+
+        name (str): Name of the item.
+
+        imagePath (str): Path to the picture of the item, empty if the
+            item has no picture.
 
         price (int): the price per item of this item in pence.
 
@@ -36,22 +47,47 @@ class Item():
         'multibuyMinimumPopulation' items be charged. For example 3 for
         100 pence.
 
+        costTable (None or list): (total cost, savings) tuples of
+            groups of 0, 1, 2... items, built on first use and dropped
+            when the price or the offer changes.
+
     Methods:
         __init__
 
+        trusted(cls, code, price, multibuyMinimumPopulation, offerOnPopulation, offerOnPrice, name=None, imagePath=None)
+
         getName(self)
 
+        getImagePath(self)
+
         getCode(self)
 
         getPrice(self)
 
-        getImage(self)
+        getMultibuyMinimumPopulation(self)
+
+        getOfferOnPopulation(self)
+
+        getOfferOnPrice(self)
+
+        setPrice(self, price)
+
+        setOffer(self, multibuyMinimumPopulation, offerOnPopulation, offerOnPrice)
+
+        getImage(self, subsample=1)
 
         printOffer(self)
 
         getMultibuyCost(self, groupSize)
     """
 
+    # Instances only hold these attributes, without a __dict__
+    __slots__ = ("_code", "_name", "_imagePath", "_price", "_multibuyMinimumPopulation", "_offerOnPopulation", "_offerOnPrice", "_costTable")
+
+    # Group sizes tabulated at first use and the most ever tabulated
+    costTableSize = 64
+    maxCostTableSize = 4096
+
     # Class-wide definition of the relationship between item code and item name
     dictItemNamePerCode = {"A": "Apple",
                            "B": "Banana",
@@ -74,7 +110,9 @@ class Item():
         item charged at full price).
 
         Parameters:
-            code (str): Alphabet letter used as identification code.
+            code (str): Identification code. It must be a key of
+                dictItemNamePerCode. Items of other codes are built by
+                a Catalogue or with Item.trusted.
 
             price (int): Cost of single item in pence.
 
@@ -104,8 +142,58 @@ class Item():
             raise TypeError
         if (not code in Item.dictItemNamePerCode.keys()):
            raise ValueError
+        self._validatePrice(price)
+        self._validateOffer(multibuyMinimumPopulation, offerOnPopulation, offerOnPrice)
+
+        # initialise if no exceptions were raised
+        self._code = code
+        self._name = Item.dictItemNamePerCode[code]
+        self._imagePath = Item.dictItemImagePath.get(code, "")
+        self._price = price
+        self._multibuyMinimumPopulation = multibuyMinimumPopulation
+        self._offerOnPopulation = offerOnPopulation
+        self._offerOnPrice = offerOnPrice
+        self._costTable = None
+
+    @classmethod
+    def trusted(cls, code, price, multibuyMinimumPopulation, offerOnPopulation, offerOnPrice, name=None, imagePath=None):
+        """Return an item built without checking its details, for
+        callers that validated them already, e.g. a Catalogue. The
+        details must follow the rules of __init__. The name and image
+        path default to those of the code in dictItemNamePerCode and
+        dictItemImagePath.
+        """
+
+        newItem = cls.__new__(cls)
+        newItem._code = code
+        newItem._name = Item.dictItemNamePerCode[code] if name is None else name
+        newItem._imagePath = Item.dictItemImagePath.get(code, "") if imagePath is None else imagePath
+        newItem._price = price
+        newItem._multibuyMinimumPopulation = multibuyMinimumPopulation
+        newItem._offerOnPopulation = offerOnPopulation
+        newItem._offerOnPrice = offerOnPrice
+        newItem._costTable = None
+        return newItem
+
+    def _validatePrice(self, price):
+        """Raise TypeError or ValueError if price is not a valid price"""
+
+        if (not isinstance(price, int)):
+            raise TypeError
         if (price <= 0 ):
             raise ValueError
+
+    def _validateOffer(self, multibuyMinimumPopulation, offerOnPopulation, offerOnPrice):
+        """Raise TypeError or ValueError if the multi-buy details are not
+        a valid offer
+        """
+
+        if (not isinstance(multibuyMinimumPopulation, int)):
+            raise TypeError
+        if (not isinstance(offerOnPopulation, int)):
+            raise TypeError
+        if (not isinstance(offerOnPrice, int)):
+            raise TypeError
         if (multibuyMinimumPopulation <= 0):
             raise ValueError
         if (offerOnPopulation < 0):
@@ -115,23 +203,21 @@ class Item():
         if (offerOnPopulation != 0 and offerOnPrice != 0):
             raise ValueError
 
-        # initialise if no exceptions were raised
-        self._code = code
-        self._price = price
-        self._multibuyMinimumPopulation = multibuyMinimumPopulation
-        self._offerOnPopulation = offerOnPopulation
-        self._offerOnPrice = offerOnPrice
-
     def getName(self):
         """Return the name of the item as a string."""
 
-        return Item.dictItemNamePerCode[self.getCode()]
+        return self._name
 
-    def getCode(self):
-        """Return the 1-character alphabetic code of the item as a
-        string.
+    def getImagePath(self):
+        """Return the path to the picture of the item, or an empty
+        string if the item has no picture.
         """
 
+        return self._imagePath
+
+    def getCode(self):
+        """Return the code of the item as a string."""
+
         return self._code
 
     def getPrice(self):
@@ -139,10 +225,52 @@ class Item():
 
         return self._price
 
-    def getImage(self):
-        """Return the photograph of the item as a tkinter PhotoImage."""
+    def getMultibuyMinimumPopulation(self):
+        """Return the size of the group of items on which the multi-buy
+        offer applies as an int.
+        """
+
+        return self._multibuyMinimumPopulation
+
+    def getOfferOnPopulation(self):
+        """Return how many items of an offer-worthy group are charged
+        as an int.
+        """
+
+        return self._offerOnPopulation
+
+    def getOfferOnPrice(self):
+        """Return the price in pence of an offer-worthy group of items
+        as an int.
+        """
+
+        return self._offerOnPrice
+
+    def setPrice(self, price):
+        """Change the price in pence of the item"""
+
+        self._validatePrice(price)
+        self._price = price
+        self._costTable = None
+
+    def setOffer(self, multibuyMinimumPopulation, offerOnPopulation, offerOnPrice):
+        """Change the multi-buy offer of the item"""
+
+        self._validateOffer(multibuyMinimumPopulation, offerOnPopulation, offerOnPrice)
+        self._multibuyMinimumPopulation = multibuyMinimumPopulation
+        self._offerOnPopulation = offerOnPopulation
+        self._offerOnPrice = offerOnPrice
+        self._costTable = None
+
+    def getImage(self, subsample=1):
+        """Return the photograph of the item scaled down by subsample as
+        a tkinter PhotoImage. Images come from the shared image cache,
+        so they are decoded from disk only once.
+        """
 
-        return tk.PhotoImage(file = Item.dictItemImagePath[self._code])
+        # Imported here so that pricing does not need tkinter
+        import imagecache
+        return imagecache.getSharedCache().getImage(self._imagePath, subsample)
 
     def printOffer(self):
         """Return a string describing the multibuy offer of the item."""
@@ -157,6 +285,10 @@ class Item():
         """Return (total cost, multi-buy offer savings) in pence of
         an item group of size groupSize as an (int, int) tuple.
 
+        Costs are read from a table of the item, which is built on
+        first use for Item.costTableSize group sizes and doubled when a
+        larger group is priced, up to Item.maxCostTableSize group sizes.
+
         Parameters:
             groupSize (int): the number of items for which to calculate
             total cost and an relevant multi-buy offer savings.
@@ -168,7 +300,30 @@ class Item():
         if (groupSize<0):
            raise ValueError
 
-        # Calculate if no exceptions were raised
+        costTable = self._costTable
+        if (costTable is not None and groupSize < len(costTable)):
+            return costTable[groupSize]
+        if (groupSize < self.maxCostTableSize):
+            return self._growCostTable(groupSize)[groupSize]
+        return self._calculateMultibuyCost(groupSize)
+
+    def _growCostTable(self, groupSize):
+        """Return the cost table of the item after making it hold
+        groupSize
+        """
+
+        size = self.costTableSize if self._costTable is None else len(self._costTable)
+        while (size <= groupSize):
+            size *= 2
+        size = max(1, min(size, self.maxCostTableSize))
+        self._costTable = [self._calculateMultibuyCost(n) for n in range(size)]
+        return self._costTable
+
+    def _calculateMultibuyCost(self, groupSize):
+        """Return (total cost, savings) of groupSize items with the
+        multi-buy formula
+        """
+
         if (self._multibuyMinimumPopulation>1):
             numberOfItemGroupsOnOffer = groupSize // self._multibuyMinimumPopulation
             numberOfItemsOutsideOffer = groupSize % self._multibuyMinimumPopulation
@@ -181,4 +336,4 @@ class Item():
         # calculate total cost and total savings for bulk purchase of the item
         totalCost = costFromOffer + costOutsideOffer
         savings = groupSize*self._price - totalCost
-        return totalCost, savings
\ No newline at end of file
+        return totalCost, savings
@@ -11,6 +11,12 @@ class ItemInfoCard(tk.Frame):
     One widget per item category that shows item name, picture, price
     per unit, number of such items in the basket, total cost of items
     and total savings of due to multi-buy offers if relevant.
+
+    Cards of a "basketView" host page are placed by their BasketView,
+    which keeps the index of its rows and recycles the cards for other
+    items with setItem. Cards of the other pages show and hide
+    themselves alone in their own parent frame, e.g. the card of a
+    StaffPageControls row.
     """
 
     def __init__(self, parent, item, hostPage):
@@ -22,12 +28,15 @@ class ItemInfoCard(tk.Frame):
         self._parent = parent
         self._item = item
         self._hostPage = hostPage
+        # Whether the card placed itself in its parent, kept here rather
+        # than asked of tkinter
+        self._shown = False
 
         if (not isinstance(item, Item)):
             raise TypeError
         if (not isinstance(hostPage, str)):
             raise TypeError
-        if (not (hostPage == "customerPage" or hostPage == "storePage")):
+        if (not hostPage in ["customerPage", "storePage", "basketView"]):
             raise ValueError
 
         # Configure the top row of the card
@@ -59,9 +68,10 @@ class ItemInfoCard(tk.Frame):
         self.itemTotalValue = tk.Label(self.topRow, bg="white", anchor="se")
         self.itemTotalValue.grid(row=0, column=2, sticky="news", padx=0, pady=0)
 
-        # Add item image on the left of the bottom row
-        self.itemImage = item.getImage().subsample(10,10)
-        self.itemImageLabel = tk.Label(self.bottomRow, image = self.itemImage, bg="white", anchor="w")
+        # Add item image on the left of the bottom row. The image is
+        # decoded the first time the card is shown
+        self.itemImage = None
+        self.itemImageLabel = tk.Label(self.bottomRow, bg="white", anchor="w")
         self.itemImageLabel.grid(row=0, column=0, sticky="w", padx=0, pady=0)
  
         # Add item population in the middle of the bottom row
@@ -72,7 +82,7 @@ class ItemInfoCard(tk.Frame):
         self.savingsLabel = tk.Label(self.bottomRow, anchor="e")
         self.savingsLabel.grid(row=0, column=3, sticky="news", padx=0, pady=0)
 
-    def slot(self, checkout, signalStrength="strong"):
+    def slot(self, checkout, signalStrength="strong", changedItems=None):
         """Method triggered by the signal of the checkout class"""
 
         if (not isinstance(checkout, Checkout)):
@@ -82,10 +92,15 @@ class ItemInfoCard(tk.Frame):
         if (not (signalStrength == "strong" or signalStrength == "weak")):
             raise ValueError
 
+        # Nothing to do if the signal is about other item categories
+        if (changedItems is not None and not self.getItemCode() in changedItems):
+            return
+
         self.itemPopulation = checkout.getNumberOfItems(self.getItemCode())
+        self.itemTotals = checkout.total(self.getItemCode())
         # We want cards on the customer page to disappear if item count==0
         # Those in the store login page must follow the rules of the signals
-        if (self._hostPage == "customerPage"):
+        if (self._hostPage != "storePage"):
             self._update()
         else:
             self._update(signalStrength=="strong")
@@ -98,6 +113,31 @@ class ItemInfoCard(tk.Frame):
         """Return the item's code"""
         return self._item.getCode()
 
+    def setItem(self, item):
+        """Show another item on the card, e.g. when a BasketView recycles
+        the card for another row of the basket
+        """
+
+        if (not isinstance(item, Item)):
+            raise TypeError
+        if (item is self._item):
+            return
+
+        self._item = item
+        self.itemNameLabel.config(text=item.getName())
+        self.valuePerItemLabel.config(text="{}p each".format(item.getPrice()))
+        # The image of the new item is loaded by the next update
+        self.itemImage = None
+        self.itemImageLabel.config(image="")
+
+    def _loadImage(self):
+        """Show the item image, loading it from the shared image cache"""
+
+        # Items loaded from a catalogue may have no image
+        if (self.itemImage is None and self._item.getImagePath()):
+            self.itemImage = self._item.getImage(10)
+            self.itemImageLabel.config(image = self.itemImage)
+
     def _update(self, removeWhenEmpty = True):
         """Update the widget's position, visibility and data"""
 
@@ -106,25 +146,27 @@ class ItemInfoCard(tk.Frame):
 
         # Widget placement/removal in the GUI
         #------------------------------------
+        # Cards of a basket view are placed by the view
+        if (self._hostPage == "basketView"):
+            self._loadImage()
         # if the widget is mapped but number of items is zero, remove it unless forced to keep it
-        if (self.winfo_ismapped() and self.itemPopulation==0 and removeWhenEmpty):
+        elif (self._shown and self.itemPopulation==0 and removeWhenEmpty):
             self.grid_forget()
+            self._shown = False
             return
-        # if the widget is not mapped and number of items is not zero find the
-        # first empty row in the parent frame starting from 0 and add it there
-        elif (not self.winfo_ismapped() and self.itemPopulation>0):
-            ncols, nrows = self._parent.grid_size()
-            if (ncols>1):
-                raise Exception("GUI is not configured correctly"+str(ncols))
-            for irow in range(nrows):
-                if (len(self._parent.grid_slaves(irow,0))==0):
-                  self.grid(row=irow, column=0, sticky="news", padx=5, pady=5)
-                  break # if this break is commented, newest category is added on the top
+        # if the widget is not mapped and number of items is not zero show it
+        # in its parent frame, which holds no other card
+        elif (not self._shown and self.itemPopulation>0):
+            self._loadImage()
+            self.grid(row=0, column=0, sticky="news", padx=5, pady=5)
+            self._shown = True
 
         # Widget data updates
         #--------------------
+        # The price may have been changed by a catalogue update
+        self.valuePerItemLabel.config(text="{}p each".format(self._item.getPrice()))
         self.itemPopulationLabel.config(text="x{}".format(self.itemPopulation), font = "Calibri 20 bold", anchor="w")
-        itemMultibuyCost, itemMultibuySavings = self._item.getMultibuyCost(self.itemPopulation)
+        itemMultibuyCost, itemMultibuySavings = self.itemTotals
         self.itemTotalValue.config(text="{:5d}p".format(itemMultibuyCost), font = "Calibry 10 bold")
         if (itemMultibuySavings>0.):
             self.savingsLabel.config(text="{}{:15d}p".format(self._item.printOffer(),-itemMultibuySavings),bg="#C5E0B4")
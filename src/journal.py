@@ -0,0 +1,340 @@
+import os
+import struct
+import time
+import zlib
+
+class TransactionJournal():
+    """Append-only binary journal of basket changes for crash recovery.
+
+    The journal is registered as a listener of one or more checkouts
+    (one per lane) and writes a record with the new count of every
+    item category named by a signal. Checkouts and cleared baskets are
+    recorded too. Records are buffered in memory and written to disk
+    in groups: the buffer is written and fsync'ed once it holds
+    groupSize records, once commitInterval seconds have passed since
+    the last commit, or when a transaction is checked out.
+
+    A snapshot rewrites the journal as one record per in-flight basket,
+    so that recovery replays the last snapshot and the records written
+    after it. A snapshot is taken by the first commit after
+    snapshotSize bytes were written since the last one, so the journal
+    does not grow forever. Recovery stops at the first torn or corrupted record,
+    which is what a crash in the middle of a write leaves behind.
+
+    Every record is a header of CRC32, payload length and record type
+    followed by the payload: the lane name, then an item code and a
+    count (SET), the total cost and savings (CHECKOUT), nothing (CLEAR)
+    or a list of item codes and counts (SNAPSHOT).
+
+    Attributes:
+        _path (str): Path of the journal file.
+        _file (file): The journal file, opened for appending.
+        _buffer (bytearray): Records not yet written to the file.
+        _bufferedRecords (int): Number of records in the buffer.
+        _lastCommit (float): Time of the last commit.
+        _size (int): Length of the journal file.
+        _snapshotLength (int): Length of the journal file after the
+            last snapshot.
+        _baskets (dict): Lane names as keys and dictionaries of item
+            codes and counts of the in-flight baskets as values.
+        _lanes (dict): Checkouts as keys and lane names as values.
+        groupSize (int): Records per group commit.
+        commitInterval (float): Seconds between group commits.
+        snapshotSize (None or int): Bytes written since the last
+            snapshot that trigger a snapshot, None for no automatic
+            snapshots.
+
+    Methods:
+        recover(cls, path)
+
+        attach(self, checkout, lane)
+
+        getBaskets(self)
+
+        slot(self, checkout, signalStrength="strong", changedItems=None)
+
+        recordClear(self, checkout)
+
+        recordCheckout(self, checkout)
+
+        commit(self)
+
+        snapshot(self)
+
+        close(self)
+    """
+
+    SET = 1
+    CLEAR = 2
+    CHECKOUT = 3
+    SNAPSHOT = 4
+
+    # CRC32 of the payload, payload length, record type
+    _header = struct.Struct("<IIB")
+    _length = struct.Struct("<H")
+    _count = struct.Struct("<I")
+    _amounts = struct.Struct("<qq")
+
+    def __init__(self, path, groupSize=256, commitInterval=0.05, snapshotSize=1 << 20):
+        """Open the journal at path, recovering the in-flight baskets
+        of an existing journal.
+
+        Parameters:
+            path (str): Path of the journal file.
+
+            groupSize (int): Number of buffered records that triggers a
+                commit.
+
+            commitInterval (float): Seconds after which buffered
+                records are committed by the next record.
+
+            snapshotSize (None or int): Number of bytes written since
+                the last snapshot after which a commit takes a
+                snapshot, or None to only take snapshots explicitly.
+        """
+
+        if (not isinstance(path, str)):
+            raise TypeError
+        if (not isinstance(groupSize, int)):
+            raise TypeError
+        if (not isinstance(commitInterval, (int, float))):
+            raise TypeError
+        if (snapshotSize is not None and not isinstance(snapshotSize, int)):
+            raise TypeError
+        if (groupSize <= 0 or commitInterval < 0):
+            raise ValueError
+        if (snapshotSize is not None and snapshotSize <= 0):
+            raise ValueError
+
+        self._path = path
+        self.groupSize = groupSize
+        self.commitInterval = commitInterval
+        self.snapshotSize = snapshotSize
+        self._baskets, validLength = self._replay(path)
+        # Cut off a torn record left by a crash before appending to it
+        if (os.path.exists(path) and os.path.getsize(path) != validLength):
+            with open(path, "r+b") as file:
+                file.truncate(validLength)
+        self._file = open(path, "ab")
+        self._buffer = bytearray()
+        self._bufferedRecords = 0
+        self._lastCommit = time.monotonic()
+        self._size = validLength
+        # A journal left long by an earlier session is snapshotted by
+        # the first commit
+        self._snapshotLength = 0
+        self._lanes = {}
+
+    @classmethod
+    def recover(cls, path):
+        """Return a dictionary with lane names as keys and dictionaries
+        of item codes and counts as values, with the baskets that were
+        in flight when the journal at path was last written
+        """
+
+        baskets, _ = cls._replay(path)
+        return baskets
+
+    @classmethod
+    def _replay(cls, path):
+        """Return (in-flight baskets, length of the valid part of the
+        journal) after replaying the journal at path
+        """
+
+        baskets = {}
+        if (not os.path.exists(path)):
+            return baskets, 0
+        with open(path, "rb") as file:
+            data = file.read()
+
+        offset = 0
+        while (offset + cls._header.size <= len(data)):
+            crc, length, recordType = cls._header.unpack_from(data, offset)
+            start = offset + cls._header.size
+            payload = data[start:start+length]
+            if (len(payload) != length or zlib.crc32(payload) != crc):
+                break
+            cls._applyRecord(baskets, recordType, payload)
+            offset = start + length
+        return baskets, offset
+
+    @classmethod
+    def _readString(cls, payload, offset):
+        """Return (string, offset after it) of a length-prefixed string"""
+
+        length, = cls._length.unpack_from(payload, offset)
+        offset += cls._length.size
+        return payload[offset:offset+length].decode("utf-8"), offset + length
+
+    @classmethod
+    def _applyRecord(cls, baskets, recordType, payload):
+        """Apply one journal record to the in-flight baskets"""
+
+        lane, offset = cls._readString(payload, 0)
+        if (recordType == cls.SET):
+            itemCode, offset = cls._readString(payload, offset)
+            count, = cls._count.unpack_from(payload, offset)
+            basket = baskets.setdefault(lane, {})
+            if (count > 0):
+                basket[itemCode] = count
+            else:
+                basket.pop(itemCode, None)
+        elif (recordType in [cls.CLEAR, cls.CHECKOUT]):
+            baskets.pop(lane, None)
+        elif (recordType == cls.SNAPSHOT):
+            numberOfItems, = cls._count.unpack_from(payload, offset)
+            offset += cls._count.size
+            basket = {}
+            for index in range(numberOfItems):
+                itemCode, offset = cls._readString(payload, offset)
+                basket[itemCode], = cls._count.unpack_from(payload, offset)
+                offset += cls._count.size
+            baskets[lane] = basket
+
+    def _encodeString(self, string):
+        """Return a length-prefixed UTF-8 string"""
+
+        data = string.encode("utf-8")
+        return self._length.pack(len(data)) + data
+
+    def _append(self, recordType, payload):
+        """Buffer one record and commit the buffer if it is due"""
+
+        self._buffer += self._header.pack(zlib.crc32(payload), len(payload), recordType)
+        self._buffer += payload
+        self._bufferedRecords += 1
+        if (self._bufferedRecords >= self.groupSize or time.monotonic() - self._lastCommit >= self.commitInterval):
+            self.commit()
+
+    def attach(self, checkout, lane):
+        """Restore the recovered basket of the lane into checkout, if
+        any, and register the journal as a listener of checkout,
+        recording its changes under the lane name. The basket of
+        checkout must be empty.
+
+        Items whose code is not in the catalogue of checkout, e.g.
+        after the catalogue changed, are dropped from the recovered
+        basket. Return a dictionary with the codes of the dropped
+        items as keys and their counts as values.
+        """
+
+        if (not isinstance(lane, str)):
+            raise TypeError
+        if (checkout.getNumberOfItems() != 0):
+            raise ValueError
+
+        droppedItems = {}
+        basket = self._baskets.get(lane)
+        if (basket):
+            itemsCatalogue = checkout.getItemsCatalogue()
+            for itemCode in list(basket):
+                if (not itemCode in itemsCatalogue):
+                    droppedItems[itemCode] = basket.pop(itemCode)
+            checkout.apply(basket)
+        self._lanes[checkout] = lane
+        checkout.register(self)
+
+        # Record the drop so that the items are not recovered again
+        encodedLane = self._encodeString(lane)
+        for itemCode in droppedItems:
+            self._append(self.SET, encodedLane + self._encodeString(itemCode) + self._count.pack(0))
+        return droppedItems
+
+    def getBaskets(self):
+        """Return the in-flight baskets recovered when the journal was
+        opened, keyed by lane name
+        """
+
+        return self._baskets
+
+    def slot(self, checkout, signalStrength="strong", changedItems=None):
+        """Method triggered by the signal of the checkout class"""
+
+        lane = self._lanes[checkout]
+        basket = self._baskets.setdefault(lane, {})
+        encodedLane = self._encodeString(lane)
+        itemCodes = changedItems if changedItems is not None else set(basket) | set(checkout.getItemCategoriesInBasket())
+        for itemCode in itemCodes:
+            count = checkout.getNumberOfItems(itemCode)
+            if (basket.get(itemCode, 0) == count):
+                continue
+            if (count > 0):
+                basket[itemCode] = count
+            else:
+                basket.pop(itemCode, None)
+            self._append(self.SET, encodedLane + self._encodeString(itemCode) + self._count.pack(count))
+
+    def recordClear(self, checkout):
+        """Record that the basket of checkout was abandoned"""
+
+        lane = self._lanes[checkout]
+        self._baskets.pop(lane, None)
+        self._append(self.CLEAR, self._encodeString(lane))
+
+    def recordCheckout(self, checkout):
+        """Record that the basket of checkout was paid for and commit
+        the journal. Call before clearing the basket.
+        """
+
+        lane = self._lanes[checkout]
+        totalCost, savings = checkout.total()
+        self._baskets.pop(lane, None)
+        self._append(self.CHECKOUT, self._encodeString(lane) + self._amounts.pack(totalCost, savings))
+        self.commit()
+
+    def commit(self):
+        """Write the buffered records to disk and fsync the journal,
+        then take a snapshot if snapshotSize bytes were written since
+        the last one
+        """
+
+        self._write()
+        if (self.snapshotSize is not None and self._size - self._snapshotLength >= self.snapshotSize):
+            self.snapshot()
+
+    def _write(self):
+        """Write the buffered records to disk and fsync the journal"""
+
+        if (self._buffer):
+            self._file.write(self._buffer)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._size += len(self._buffer)
+            self._buffer = bytearray()
+            self._bufferedRecords = 0
+        self._lastCommit = time.monotonic()
+
+    def snapshot(self):
+        """Rewrite the journal as one record per in-flight basket, so
+        that it stops growing and recovery has less to replay
+        """
+
+        self._write()
+        data = bytearray()
+        for lane, basket in self._baskets.items():
+            parts = [self._encodeString(lane), self._count.pack(len(basket))]
+            for itemCode, count in basket.items():
+                parts.append(self._encodeString(itemCode))
+                parts.append(self._count.pack(count))
+            payload = b"".join(parts)
+            data += self._header.pack(zlib.crc32(payload), len(payload), self.SNAPSHOT)
+            data += payload
+
+        # Replace the journal atomically so that a crash leaves either
+        # the old journal or the snapshot
+        temporaryPath = self._path + ".snapshot"
+        with open(temporaryPath, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        self._file.close()
+        os.replace(temporaryPath, self._path)
+        self._file = open(self._path, "ab")
+        self._size = len(data)
+        self._snapshotLength = len(data)
+
+    def close(self):
+        """Commit the buffered records and close the journal"""
+
+        self.commit()
+        self._file.close()
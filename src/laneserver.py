@@ -0,0 +1,427 @@
+"""Back-office server running the checkouts of many lanes in one process.
+
+Lanes talk to the server over a local socket (a Unix domain socket, or
+TCP on the loopback interface) with one JSON object per line. Every
+request names a lane and an operation:
+
+    {"lane": "7", "op": "scan", "item": "A", "count": 2}
+    {"lane": "7", "op": "unscan", "item": "A"}
+    {"lane": "7", "op": "clear", "item": "A"}     (all items if no item)
+    {"lane": "7", "op": "total"}
+    {"lane": "7", "op": "checkout"}
+    {"lane": "7", "op": "close"}
+    {"op": "update", "items": {"A": {"price": 30}}}
+
+and is answered by one JSON object per line, in order:
+
+    {"ok": true, "items": 2, "total": 50, "savings": 0}
+    {"ok": false, "error": "ValueError"}
+
+The response to checkout holds the totals of the basket that was paid
+for, after which the basket of the lane is empty. An update changes the
+prices and offers of the shared catalogue (see Catalogue.applyUpdates)
+and reprices the open baskets of all lanes; its response lists the
+changed item codes and the new catalogue version.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import catalogue
+import checkout
+
+class SessionManager():
+    """The checkouts of many lanes sharing one items catalogue.
+
+    A checkout is created the first time a lane is used, as a copy of a
+    template checkout so that all sessions share the Item instances of
+    the catalogue and only own their basket. Sessions are kept in least
+    recently used order: sessions idle for longer than idleTimeout are
+    dropped by evictIdle, and the least recently used idle session is
+    dropped when a new lane would exceed maxSessions. The basket of an
+    evicted session is abandoned. Sessions in use are never evicted.
+
+    The manager is not thread safe: sessions are acquired and released
+    on one thread (the event loop of the LaneServer), while the
+    checkout of an acquired session may be used on another.
+
+    Attributes:
+        _catalogue (Catalogue instance): The catalogue of all lanes.
+        _template (Checkout instance): Empty checkout that new sessions
+            are copied from.
+        _sessions (OrderedDict): Lane ids as keys and _LaneSession
+            instances as values, least recently used first.
+        _clock (function): Returns the current time in seconds.
+        maxSessions (int): Maximum number of sessions kept.
+        idleTimeout (float): Seconds after which an unused session is
+            evicted.
+
+    Methods:
+        getCatalogue(self)
+
+        acquire(self, laneId)
+
+        release(self, session)
+
+        closeSession(self, laneId)
+
+        evictIdle(self, now=None)
+    """
+
+    def __init__(self, itemsAndPrices=None, maxSessions=1000, idleTimeout=600., compactBasket=True, clock=time.monotonic):
+        """Initialise the manager.
+
+        Parameters:
+            itemsAndPrices (None, dict or Catalogue instance): The items
+                catalogue of every lane, as accepted by Checkout. The
+                default catalogue of Checkout if None. Dictionaries
+                are turned into a Catalogue so that prices can be
+                updated.
+
+            maxSessions (int): Maximum number of sessions kept.
+
+            idleTimeout (float): Seconds after which an unused session
+                is evicted.
+
+            compactBasket (bool): Keep the baskets in CompactBasket
+                instances to save memory with many lanes.
+
+            clock (function): Returns the current time in seconds.
+        """
+
+        if (not isinstance(maxSessions, int)):
+            raise TypeError
+        if (not isinstance(idleTimeout, (int, float))):
+            raise TypeError
+        if (maxSessions <= 0 or idleTimeout <= 0):
+            raise ValueError
+
+        if (itemsAndPrices is None):
+            itemsAndPrices = checkout.Checkout.defaultItemsAndPrices
+        if (not isinstance(itemsAndPrices, catalogue.Catalogue)):
+            itemsAndPrices = catalogue.Catalogue.fromItemsAndPrices(itemsAndPrices)
+        self._catalogue = itemsAndPrices
+        self._template = checkout.Checkout(None, itemsAndPrices, compactBasket)
+        self._sessions = OrderedDict()
+        self._clock = clock
+        self.maxSessions = maxSessions
+        self.idleTimeout = idleTimeout
+
+    def __len__(self):
+        """Return the number of sessions"""
+
+        return len(self._sessions)
+
+    def __contains__(self, laneId):
+        """Return True if the lane has a session"""
+
+        return laneId in self._sessions
+
+    def getCatalogue(self):
+        """Return the catalogue shared by all lanes"""
+
+        return self._catalogue
+
+    def acquire(self, laneId):
+        """Return the session of the lane, creating it if needed, and
+        mark it as in use until it is released
+        """
+
+        if (not isinstance(laneId, str)):
+            raise TypeError
+
+        session = self._sessions.get(laneId)
+        if (session is None):
+            if (len(self._sessions) >= self.maxSessions):
+                self._evictLeastRecentlyUsed()
+            session = _LaneSession(laneId, checkout.Checkout(self._template))
+            self._sessions[laneId] = session
+        else:
+            self._sessions.move_to_end(laneId)
+        session.users += 1
+        session.lastUsed = self._clock()
+        return session
+
+    def release(self, session):
+        """Mark a session returned by acquire as no longer in use"""
+
+        session.users -= 1
+        session.lastUsed = self._clock()
+        if (self._sessions.get(session.laneId) is session):
+            self._sessions.move_to_end(session.laneId)
+
+    def _evictLeastRecentlyUsed(self):
+        """Drop the least recently used session that is not in use.
+        Raise RuntimeError if every session is in use.
+        """
+
+        for laneId, session in self._sessions.items():
+            if (session.users == 0):
+                del self._sessions[laneId]
+                return
+        raise RuntimeError("all {} sessions are in use".format(len(self._sessions)))
+
+    def closeSession(self, laneId):
+        """Drop the session of the lane, if it is not in use. Return
+        True if a session was dropped.
+        """
+
+        session = self._sessions.get(laneId)
+        if (session is None or session.users > 0):
+            return False
+        del self._sessions[laneId]
+        return True
+
+    def evictIdle(self, now=None):
+        """Drop the sessions unused for longer than idleTimeout and
+        return the list of their lane ids
+        """
+
+        if (now is None):
+            now = self._clock()
+        evicted = []
+        # Sessions are in least recently used order, so the scan stops
+        # at the first session that was used recently
+        for laneId, session in self._sessions.items():
+            if (now - session.lastUsed <= self.idleTimeout):
+                break
+            if (session.users == 0):
+                evicted.append(laneId)
+        for laneId in evicted:
+            del self._sessions[laneId]
+        return evicted
+
+
+class _LaneSession():
+    """The checkout of one lane and its bookkeeping"""
+
+    __slots__ = ("laneId", "checkout", "lock", "users", "lastUsed")
+
+    def __init__(self, laneId, checkout_):
+        self.laneId = laneId
+        self.checkout = checkout_
+        # Created by the server on first use, on its event loop
+        self.lock = None
+        self.users = 0
+        self.lastUsed = 0.
+
+
+class LaneServer():
+    """Serves the operations of many lanes over a local socket.
+
+    Connections are handled concurrently by an asyncio event loop.
+    Requests of the same lane are run one at a time and in order, while
+    the checkout operations of different lanes run in parallel on a
+    thread pool, so that one slow lane does not hold up the others.
+    Catalogue updates wait for the running operations to finish and
+    hold back new ones until the baskets are repriced.
+
+    Attributes:
+        _manager (SessionManager instance): The sessions of the lanes.
+        _executor (concurrent.futures.Executor): Runs the checkout
+            operations.
+        _server (None or asyncio.Server): The listening server.
+        _evictionTask (None or asyncio.Task): Evicts idle sessions
+            periodically.
+        _condition (None or asyncio.Condition): Guards the two
+            attributes below, created on first use.
+        _runningOperations (int): Lane operations being run.
+        _updating (bool): True while the catalogue is being updated.
+        numberOfRequests (int): Requests handled so far.
+
+    Methods:
+        handleRequest(self, request)
+
+        start(self, socketPath=None, host="127.0.0.1", port=0)
+
+        close(self)
+    """
+
+    operations = ("scan", "unscan", "clear", "total", "checkout", "close", "update")
+
+    def __init__(self, manager, executor=None):
+        """Initialise the server.
+
+        Parameters:
+            manager (SessionManager instance): The sessions of the
+                lanes.
+
+            executor (None or concurrent.futures.Executor): Runs the
+                checkout operations. A thread pool if None.
+        """
+
+        if (not isinstance(manager, SessionManager)):
+            raise TypeError
+
+        self._manager = manager
+        self._executor = executor if executor is not None else ThreadPoolExecutor()
+        self._server = None
+        self._evictionTask = None
+        self._condition = None
+        self._runningOperations = 0
+        self._updating = False
+        self.numberOfRequests = 0
+
+    def _getCondition(self):
+        """Return the condition guarding updates, on the running loop"""
+
+        if (self._condition is None):
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def handleRequest(self, request):
+        """Run one request, a dictionary decoded from a JSON line, and
+        return the response dictionary
+        """
+
+        self.numberOfRequests += 1
+        try:
+            if (not isinstance(request, dict)):
+                raise TypeError
+            laneId = request.get("lane")
+            operation = request.get("op")
+            if (not operation in self.operations):
+                raise ValueError
+            if (operation == "close"):
+                return {"ok": self._manager.closeSession(laneId)}
+            if (operation == "update"):
+                return await self._update(request.get("items"))
+
+            condition = self._getCondition()
+            async with condition:
+                await condition.wait_for(lambda: not self._updating)
+                self._runningOperations += 1
+            try:
+                session = self._manager.acquire(laneId)
+                try:
+                    if (session.lock is None):
+                        session.lock = asyncio.Lock()
+                    async with session.lock:
+                        loop = asyncio.get_running_loop()
+                        return await loop.run_in_executor(self._executor, self._run, session.checkout, operation,
+                                                          request.get("item"), request.get("count", 1))
+                finally:
+                    self._manager.release(session)
+            finally:
+                async with condition:
+                    self._runningOperations -= 1
+                    condition.notify_all()
+        except (TypeError, ValueError, RuntimeError) as error:
+            return {"ok": False, "error": type(error).__name__}
+
+    async def _update(self, updates):
+        """Apply catalogue updates once no lane operation is running and
+        return the response dictionary
+        """
+
+        condition = self._getCondition()
+        async with condition:
+            await condition.wait_for(lambda: not self._updating)
+            self._updating = True
+            await condition.wait_for(lambda: self._runningOperations == 0)
+        try:
+            catalogue_ = self._manager.getCatalogue()
+            changedItems = catalogue_.applyUpdates(updates)
+            return {"ok": True, "changed": sorted(changedItems), "version": catalogue_.getVersion()}
+        finally:
+            async with condition:
+                self._updating = False
+                condition.notify_all()
+
+    def _run(self, checkout_, operation, itemCode, count):
+        """Apply one operation to the checkout of a lane and return the
+        response dictionary. Runs on the executor.
+        """
+
+        if (operation in ["scan", "unscan"]):
+            if (not isinstance(count, int) or isinstance(count, bool)):
+                raise TypeError
+            if (count <= 0):
+                raise ValueError
+            if (not isinstance(itemCode, str)):
+                raise TypeError
+            checkout_.apply({itemCode: count if operation == "scan" else -count}, "weak")
+        elif (operation == "clear"):
+            checkout_.clearBasket("all" if itemCode is None else itemCode, "weak")
+
+        totalCost, savings = checkout_.total()
+        response = {"ok": True, "items": checkout_.getNumberOfItems(), "total": totalCost, "savings": savings}
+        if (operation == "checkout"):
+            checkout_.clearBasket(signalStrength="weak")
+        return response
+
+    async def _serveConnection(self, reader, writer):
+        """Answer the requests of one connection in order"""
+
+        try:
+            while (True):
+                line = await reader.readline()
+                if (not line):
+                    break
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {"ok": False, "error": "ValueError"}
+                else:
+                    response = await self.handleRequest(request)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _evictPeriodically(self):
+        """Evict idle sessions every half idle timeout"""
+
+        while (True):
+            await asyncio.sleep(self._manager.idleTimeout / 2)
+            self._manager.evictIdle()
+
+    async def start(self, socketPath=None, host="127.0.0.1", port=0):
+        """Start listening on the Unix domain socket at socketPath, or
+        on host and port if socketPath is None, and return the
+        asyncio.Server. Port 0 picks a free port.
+        """
+
+        if (socketPath is not None):
+            self._server = await asyncio.start_unix_server(self._serveConnection, socketPath)
+        else:
+            self._server = await asyncio.start_server(self._serveConnection, host, port)
+        self._evictionTask = asyncio.get_running_loop().create_task(self._evictPeriodically())
+        return self._server
+
+    async def close(self):
+        """Stop listening and stop evicting sessions"""
+
+        if (self._evictionTask is not None):
+            self._evictionTask.cancel()
+            self._evictionTask = None
+        if (self._server is not None):
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+def main(socketPath=None, port=8765, cataloguePath=None):
+    """Run the lane server until interrupted"""
+
+    itemsAndPrices = None
+    if (cataloguePath is not None):
+        itemsAndPrices = catalogue.Catalogue.load(cataloguePath)
+    server = LaneServer(SessionManager(itemsAndPrices))
+
+    async def serve():
+        listening = await server.start(socketPath, port=port)
+        try:
+            await listening.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
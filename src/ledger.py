@@ -0,0 +1,263 @@
+import sqlite3
+import time
+from datetime import date, datetime
+
+class SalesLedger():
+    """Persistent record of the completed transactions, for reporting.
+
+    Transactions are kept in an SQLite database in write-ahead logging
+    mode. They are buffered in memory and inserted in batches of
+    batchSize transactions, each batch in a single database transaction
+    with executemany. Every item category of a transaction becomes one
+    sales line, indexed by timestamp and by item code.
+
+    Two aggregate tables are updated in the same database transaction
+    as the lines they summarise: the units, revenue and savings per day
+    and item code, and the number of transactions, revenue and savings
+    per hour. Reports read the aggregate tables, so their cost depends
+    on the length of the date range rather than on the number of
+    transactions recorded. Days and hours are in local time.
+
+    Attributes:
+        _connection (sqlite3.Connection): Connection to the database.
+        _transactions (list): Buffered (timestamp, lane, number of
+            items, total cost, savings) tuples.
+        _lines (list): Buffered sales lines of the buffered
+            transactions as lists of (item code, units, revenue,
+            savings) tuples, one list per transaction.
+        batchSize (int): Buffered transactions that trigger a flush.
+
+    Methods:
+        recordTransaction(self, checkout, lane="", timestamp=None)
+
+        flush(self)
+
+        close(self)
+
+        revenueBySku(self, startDate, endDate)
+
+        revenueByDay(self, startDate, endDate)
+
+        revenueByHour(self, start, end)
+
+        itemSales(self, itemCode, start, end)
+    """
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY,
+            timestamp REAL NOT NULL,
+            lane TEXT NOT NULL,
+            items INTEGER NOT NULL,
+            revenue INTEGER NOT NULL,
+            savings INTEGER NOT NULL);
+        CREATE INDEX IF NOT EXISTS transactionsByTime ON transactions (timestamp);
+
+        CREATE TABLE IF NOT EXISTS sales (
+            transactionId INTEGER NOT NULL REFERENCES transactions (id),
+            timestamp REAL NOT NULL,
+            itemCode TEXT NOT NULL,
+            units INTEGER NOT NULL,
+            revenue INTEGER NOT NULL,
+            savings INTEGER NOT NULL);
+        CREATE INDEX IF NOT EXISTS salesByTime ON sales (timestamp);
+        CREATE INDEX IF NOT EXISTS salesByItem ON sales (itemCode, timestamp);
+
+        CREATE TABLE IF NOT EXISTS dailySales (
+            day TEXT NOT NULL,
+            itemCode TEXT NOT NULL,
+            units INTEGER NOT NULL,
+            revenue INTEGER NOT NULL,
+            savings INTEGER NOT NULL,
+            PRIMARY KEY (day, itemCode)) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS hourlySales (
+            hour TEXT PRIMARY KEY,
+            transactions INTEGER NOT NULL,
+            revenue INTEGER NOT NULL,
+            savings INTEGER NOT NULL) WITHOUT ROWID;
+    """
+
+    def __init__(self, path, batchSize=100):
+        """Open the ledger, creating the database if needed.
+
+        Parameters:
+            path (str): Path of the SQLite database, or ":memory:".
+
+            batchSize (int): Number of buffered transactions that are
+                written to the database at once.
+        """
+
+        if (not isinstance(path, str)):
+            raise TypeError
+        if (not isinstance(batchSize, int)):
+            raise TypeError
+        if (batchSize <= 0):
+            raise ValueError
+
+        self.batchSize = batchSize
+        self._transactions = []
+        self._lines = []
+        # Transactions are managed explicitly, one per batch
+        self._connection = sqlite3.connect(path, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        # Safe against corruption in WAL mode, only the last batches
+        # can be lost on a power failure
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(self._schema)
+
+    def recordTransaction(self, checkout, lane="", timestamp=None):
+        """Record the basket of checkout as a completed transaction.
+        Call before clearing the basket.
+
+        Parameters:
+            checkout (Checkout instance): The checkout being paid for.
+
+            lane (str): Name of the lane of the checkout.
+
+            timestamp (None or float): Seconds since the epoch at which
+                the transaction was completed. Now if None.
+        """
+
+        if (not isinstance(lane, str)):
+            raise TypeError
+        if (timestamp is None):
+            timestamp = time.time()
+        elif (not isinstance(timestamp, (int, float))):
+            raise TypeError
+
+        lines = []
+        for itemCode in checkout.getItemCategoriesInBasket():
+            revenue, savings = checkout.total(itemCode)
+            lines.append((itemCode, checkout.getNumberOfItems(itemCode), revenue, savings))
+        totalCost, totalSavings = checkout.total()
+        self._transactions.append((timestamp, lane, checkout.getNumberOfItems(), totalCost, totalSavings))
+        self._lines.append(lines)
+        if (len(self._transactions) >= self.batchSize):
+            self.flush()
+
+    def flush(self):
+        """Write the buffered transactions and update the aggregate
+        tables in one database transaction
+        """
+
+        if (not self._transactions):
+            return
+
+        # Aggregate the batch first so that every day, item code and
+        # hour costs one upsert per batch
+        daily = {}
+        hourly = {}
+        for (timestamp, lane, items, revenue, savings), lines in zip(self._transactions, self._lines):
+            moment = datetime.fromtimestamp(timestamp)
+            day = moment.strftime("%Y-%m-%d")
+            hour = moment.strftime("%Y-%m-%d %H")
+            hourTotals = hourly.setdefault(hour, [0, 0, 0])
+            hourTotals[0] += 1
+            hourTotals[1] += revenue
+            hourTotals[2] += savings
+            for itemCode, units, itemRevenue, itemSavings in lines:
+                dayTotals = daily.setdefault((day, itemCode), [0, 0, 0])
+                dayTotals[0] += units
+                dayTotals[1] += itemRevenue
+                dayTotals[2] += itemSavings
+
+        cursor = self._connection.cursor()
+        cursor.execute("BEGIN")
+        try:
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM transactions")
+            firstId = cursor.fetchone()[0] + 1
+            cursor.executemany("INSERT INTO transactions (id, timestamp, lane, items, revenue, savings) VALUES (?, ?, ?, ?, ?, ?)",
+                               [(firstId + index,) + transaction for index, transaction in enumerate(self._transactions)])
+            cursor.executemany("INSERT INTO sales VALUES (?, ?, ?, ?, ?, ?)",
+                               [(firstId + index, self._transactions[index][0]) + line
+                                for index, lines in enumerate(self._lines) for line in lines])
+            cursor.executemany("INSERT INTO dailySales VALUES (?, ?, ?, ?, ?) "
+                               "ON CONFLICT (day, itemCode) DO UPDATE SET units = units + excluded.units, "
+                               "revenue = revenue + excluded.revenue, savings = savings + excluded.savings",
+                               [key + tuple(totals) for key, totals in daily.items()])
+            cursor.executemany("INSERT INTO hourlySales VALUES (?, ?, ?, ?) "
+                               "ON CONFLICT (hour) DO UPDATE SET transactions = transactions + excluded.transactions, "
+                               "revenue = revenue + excluded.revenue, savings = savings + excluded.savings",
+                               [(hour,) + tuple(totals) for hour, totals in hourly.items()])
+            cursor.execute("COMMIT")
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        self._transactions = []
+        self._lines = []
+
+    def close(self):
+        """Write the buffered transactions and close the database"""
+
+        self.flush()
+        self._connection.close()
+
+    def _dayRange(self, startDate, endDate):
+        """Return the ISO strings of two dates after validating them"""
+
+        if (not isinstance(startDate, date) or not isinstance(endDate, date)):
+            raise TypeError
+        if (startDate > endDate):
+            raise ValueError
+        return startDate.strftime("%Y-%m-%d"), endDate.strftime("%Y-%m-%d")
+
+    def revenueBySku(self, startDate, endDate):
+        """Return a dictionary with item codes as keys and (units,
+        revenue, savings) tuples as values for the transactions from
+        startDate to endDate, both included. Buffered transactions are
+        written first.
+        """
+
+        start, end = self._dayRange(startDate, endDate)
+        self.flush()
+        rows = self._connection.execute(
+            "SELECT itemCode, SUM(units), SUM(revenue), SUM(savings) FROM dailySales "
+            "WHERE day BETWEEN ? AND ? GROUP BY itemCode ORDER BY itemCode", (start, end))
+        return {itemCode: (units, revenue, savings) for itemCode, units, revenue, savings in rows}
+
+    def revenueByDay(self, startDate, endDate):
+        """Return a list of (date, units, revenue, savings) tuples, one
+        per day with sales from startDate to endDate, both included
+        """
+
+        start, end = self._dayRange(startDate, endDate)
+        self.flush()
+        rows = self._connection.execute(
+            "SELECT day, SUM(units), SUM(revenue), SUM(savings) FROM dailySales "
+            "WHERE day BETWEEN ? AND ? GROUP BY day ORDER BY day", (start, end))
+        return [(date.fromisoformat(day), units, revenue, savings) for day, units, revenue, savings in rows]
+
+    def revenueByHour(self, start, end):
+        """Return a list of (datetime of the start of the hour, number
+        of transactions, revenue, savings) tuples, one per hour with
+        sales from the hour of start to the hour of end, both included
+        """
+
+        if (not isinstance(start, datetime) or not isinstance(end, datetime)):
+            raise TypeError
+        if (start > end):
+            raise ValueError
+        self.flush()
+        rows = self._connection.execute(
+            "SELECT hour, transactions, revenue, savings FROM hourlySales "
+            "WHERE hour BETWEEN ? AND ? ORDER BY hour", (start.strftime("%Y-%m-%d %H"), end.strftime("%Y-%m-%d %H")))
+        return [(datetime.strptime(hour, "%Y-%m-%d %H"), transactions, revenue, savings)
+                for hour, transactions, revenue, savings in rows]
+
+    def itemSales(self, itemCode, start, end):
+        """Return the (units, revenue, savings) of one item code sold
+        from start to end, both datetimes, read from the sales lines
+        """
+
+        if (not isinstance(itemCode, str)):
+            raise TypeError
+        if (not isinstance(start, datetime) or not isinstance(end, datetime)):
+            raise TypeError
+        if (start > end):
+            raise ValueError
+        self.flush()
+        row = self._connection.execute(
+            "SELECT COALESCE(SUM(units), 0), COALESCE(SUM(revenue), 0), COALESCE(SUM(savings), 0) FROM sales "
+            "WHERE itemCode = ? AND timestamp BETWEEN ? AND ?", (itemCode, start.timestamp(), end.timestamp())).fetchone()
+        return tuple(row)
@@ -0,0 +1,145 @@
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class PricingEngine():
+    """Vectorised pricing of many baskets at once.
+
+    The engine compiles the items catalogue into one NumPy array per
+    pricing parameter (price, multibuyMinimumPopulation,
+    offerOnPopulation and offerOnPrice) and applies the rules of
+    Item.getMultibuyCost to a whole (baskets x items) matrix of item
+    counts in one go. All the arithmetic is done on 64-bit integers, so
+    the results are identical to those of the scalar path.
+
+    NumPy is an optional dependency of the application and is only
+    needed by this class.
+
+    Attributes:
+        _itemCodes (list): Item codes in the order of the columns of
+            the count matrices.
+        _columnPerCode (dict): Item codes as keys and column indices
+            as values.
+        _price, _multibuyMinimumPopulation, _offerOnPopulation,
+        _offerOnPrice (numpy arrays): Pricing parameters per column.
+        _groupPrice (numpy array): Price of an offer-worthy group of
+            items per column.
+        _hasOffer (numpy array): True for the columns of items with a
+            multi-buy offer.
+
+    Methods:
+        getItemCodes(self)
+
+        countMatrix(self, baskets)
+
+        price(self, counts)
+
+        priceChunks(self, chunks)
+
+        priceFile(self, path, chunkSize=100000)
+    """
+
+    def __init__(self, itemsCatalogue):
+        """Compile the items catalogue into parameter arrays.
+
+        Parameters:
+            itemsCatalogue (dict): Item codes as keys and Item
+                instances as values, as returned by
+                Checkout.getItemsCatalogue().
+        """
+
+        if (np is None):
+            raise ImportError("numpy is required by the pricing engine")
+        if (not isinstance(itemsCatalogue, dict)):
+            raise TypeError
+        if (not bool(itemsCatalogue)):
+            raise ValueError
+
+        self._itemCodes = list(itemsCatalogue)
+        self._columnPerCode = {itemCode: column for column, itemCode in enumerate(self._itemCodes)}
+        items = [itemsCatalogue[itemCode] for itemCode in self._itemCodes]
+        self._price = np.array([item.getPrice() for item in items], dtype=np.int64)
+        self._multibuyMinimumPopulation = np.array([item.getMultibuyMinimumPopulation() for item in items], dtype=np.int64)
+        self._offerOnPopulation = np.array([item.getOfferOnPopulation() for item in items], dtype=np.int64)
+        self._offerOnPrice = np.array([item.getOfferOnPrice() for item in items], dtype=np.int64)
+        self._groupPrice = self._offerOnPrice + self._price * self._offerOnPopulation
+        self._hasOffer = self._multibuyMinimumPopulation > 1
+
+    def getItemCodes(self):
+        """Return the item codes in the order of the matrix columns"""
+
+        return self._itemCodes
+
+    def countMatrix(self, baskets):
+        """Return a (baskets x items) matrix of item counts.
+
+        Parameters:
+            baskets (list): List of mappings with item codes as keys
+                and number of items as values.
+        """
+
+        if (not isinstance(baskets, list)):
+            raise TypeError
+
+        counts = np.zeros((len(baskets), len(self._itemCodes)), dtype=np.int64)
+        for row, basket in enumerate(baskets):
+            for itemCode in basket:
+                if (not itemCode in self._columnPerCode):
+                    raise ValueError
+                counts[row, self._columnPerCode[itemCode]] = basket[itemCode]
+        return counts
+
+    def price(self, counts):
+        """Return (total cost, savings) in pence of every basket as a
+        tuple of two 1-D int64 arrays.
+
+        Parameters:
+            counts (numpy array): (baskets x items) matrix of
+                non-negative integer item counts with columns in the
+                order of getItemCodes().
+        """
+
+        counts = np.asarray(counts)
+        if (counts.dtype.kind not in "iu"):
+            raise TypeError
+        if (counts.ndim != 2 or counts.shape[1] != len(self._itemCodes)):
+            raise ValueError
+        counts = counts.astype(np.int64, copy=False)
+        if (counts.size and counts.min() < 0):
+            raise ValueError
+
+        # Same calculation as Item.getMultibuyCost, one column per item
+        fullPrice = counts * self._price
+        groupsOnOffer, itemsOutsideOffer = np.divmod(counts, self._multibuyMinimumPopulation)
+        costWithOffer = self._groupPrice * groupsOnOffer + itemsOutsideOffer * self._price
+        cost = np.where(self._hasOffer, costWithOffer, fullPrice)
+
+        totalCost = cost.sum(axis=1)
+        savings = fullPrice.sum(axis=1) - totalCost
+        return totalCost, savings
+
+    def priceChunks(self, chunks):
+        """Price an iterable of count matrices one chunk at a time and
+        yield a (total cost, savings) tuple of arrays per chunk.
+        """
+
+        for chunk in chunks:
+            yield self.price(chunk)
+
+    def priceFile(self, path, chunkSize=100000):
+        """Price the count matrix stored in a .npy file without loading
+        it in memory and yield a (total cost, savings) tuple of arrays
+        per chunk of chunkSize baskets.
+        """
+
+        if (not isinstance(chunkSize, int)):
+            raise TypeError
+        if (chunkSize <= 0):
+            raise ValueError
+
+        counts = np.load(path, mmap_mode="r")
+        if (counts.ndim != 2):
+            raise ValueError
+        for start in range(0, counts.shape[0], chunkSize):
+            yield self.price(counts[start:start+chunkSize])
@@ -0,0 +1,263 @@
+from collections.abc import Mapping
+
+class MultibuyRule():
+    """Offer on a group of items of one category, e.g. 3 for 100 pence.
+
+    An item may have several multi-buy rules, e.g. tiered offers such as
+    2 for 45 pence and 5 for 100 pence, in which case the rule engine
+    picks the cheapest combination of them.
+
+    Attributes:
+        itemCode (str): Code of the item the offer applies to.
+        groupSize (int): Number of items in an offer-worthy group.
+        groupPrice (int): Price in pence of an offer-worthy group.
+    """
+
+    __slots__ = ("itemCode", "groupSize", "groupPrice")
+
+    def __init__(self, itemCode, groupSize, groupPrice):
+        if (not isinstance(itemCode, str)):
+            raise TypeError
+        if (not isinstance(groupSize, int) or not isinstance(groupPrice, int)):
+            raise TypeError
+        if (groupSize <= 0 or groupPrice < 0):
+            raise ValueError
+
+        self.itemCode = itemCode
+        self.groupSize = groupSize
+        self.groupPrice = groupPrice
+
+
+class BundleRule():
+    """Offer on a combination of items of several categories, e.g. a
+    meal deal of one apple, one banana and one pear for 80 pence.
+
+    Attributes:
+        items (dict): Item codes as keys and the number of items of
+            that category in the bundle as values.
+        price (int): Price in pence of the bundle.
+    """
+
+    __slots__ = ("items", "price")
+
+    def __init__(self, items, price):
+        if (not isinstance(items, Mapping) or not isinstance(price, int)):
+            raise TypeError
+        if (not bool(items) or price < 0):
+            raise ValueError
+        for itemCode in items:
+            if (not isinstance(itemCode, str) or not isinstance(items[itemCode], int)):
+                raise TypeError
+            if (items[itemCode] <= 0):
+                raise ValueError
+
+        self.items = dict(items)
+        self.price = price
+
+
+class PricingRules():
+    """Finds the cheapest price of a basket under a set of offers.
+
+    Items are charged at their unit price unless they take part in an
+    offer. Each item may have any number of multi-buy rules and baskets
+    may be discounted by bundle rules spanning several categories. When
+    rules compete for the same items, the cheapest valid combination is
+    chosen by dynamic programming over the item counts.
+
+    The cheapest cost of n items of one category under its multi-buy
+    rules is kept in a cost table per item, which is grown on demand and
+    reused by every later basket, so that pricing a category that was
+    priced before is O(1). Bundles are priced by a search over the
+    number of times each bundle is used, memoised on the counts left
+    for the remaining bundles.
+
+    For items with a single offer that is not dearer than its unit
+    price, the results are the same as those of Item.getMultibuyCost.
+
+    Attributes:
+        _unitPrices (dict): Item codes as keys and prices in pence of
+            one item as values.
+        _multibuyRules (dict): Item codes as keys and lists of
+            (groupSize, groupPrice) tuples as values.
+        _bundles (list): BundleRule instances.
+        _bundleItemCodes (tuple): Codes of the items of any bundle.
+        _bundlePositions (list): Per bundle, a list of (position in
+            _bundleItemCodes, number of items needed) tuples.
+        _costTables (dict): Item codes as keys and lists with the
+            cheapest cost of 0, 1, 2... items of that category as
+            values.
+        _bundleMemo (dict): (bundle index, counts of the bundle items)
+            as keys and the cheapest cost of those items using the
+            bundles from that index on as values.
+        maxMemoSize (int): Number of memoised bundle results above
+            which the memo is cleared.
+
+    Methods:
+        fromItemsCatalogue(cls, itemsCatalogue, rules=())
+
+        itemCost(self, itemCode, count)
+
+        cost(self, counts)
+    """
+
+    def __init__(self, unitPrices, rules=(), maxMemoSize=100000):
+        """Initialise the rule set.
+
+        Parameters:
+            unitPrices (dict): Item codes as keys and the price in
+                pence of one item as values.
+
+            rules (iterable): MultibuyRule and BundleRule instances.
+
+            maxMemoSize (int): Number of memoised bundle results above
+                which the memo is cleared.
+        """
+
+        if (not isinstance(unitPrices, dict)):
+            raise TypeError
+        if (not isinstance(maxMemoSize, int)):
+            raise TypeError
+        if (not bool(unitPrices) or maxMemoSize <= 0):
+            raise ValueError
+        for itemCode in unitPrices:
+            if (not isinstance(itemCode, str) or not isinstance(unitPrices[itemCode], int)):
+                raise TypeError
+            if (unitPrices[itemCode] <= 0):
+                raise ValueError
+
+        self._unitPrices = dict(unitPrices)
+        self._multibuyRules = {itemCode: [] for itemCode in unitPrices}
+        self._bundles = []
+        for rule in rules:
+            if (isinstance(rule, MultibuyRule)):
+                if (not rule.itemCode in unitPrices):
+                    raise ValueError
+                self._multibuyRules[rule.itemCode].append((rule.groupSize, rule.groupPrice))
+            elif (isinstance(rule, BundleRule)):
+                for itemCode in rule.items:
+                    if (not itemCode in unitPrices):
+                        raise ValueError
+                self._bundles.append(rule)
+            else:
+                raise TypeError
+
+        bundleItemCodes = []
+        for bundle in self._bundles:
+            for itemCode in bundle.items:
+                if (not itemCode in bundleItemCodes):
+                    bundleItemCodes.append(itemCode)
+        self._bundleItemCodes = tuple(bundleItemCodes)
+        self._bundlePositions = [[(bundleItemCodes.index(itemCode), bundle.items[itemCode]) for itemCode in bundle.items]
+                                 for bundle in self._bundles]
+        self._costTables = {itemCode: [0] for itemCode in unitPrices}
+        self._bundleMemo = {}
+        self.maxMemoSize = maxMemoSize
+
+    @classmethod
+    def fromItemsCatalogue(cls, itemsCatalogue, rules=()):
+        """Return the rule set of the offers of the items of a
+        catalogue, with Item instances as values, plus any extra rules
+        """
+
+        if (not isinstance(itemsCatalogue, Mapping)):
+            raise TypeError
+
+        unitPrices = {}
+        catalogueRules = []
+        for itemCode, item in itemsCatalogue.items():
+            unitPrices[itemCode] = item.getPrice()
+            if (item.getMultibuyMinimumPopulation() > 1):
+                # Same group price as Item.getMultibuyCost
+                groupPrice = item.getOfferOnPrice() + item.getPrice() * item.getOfferOnPopulation()
+                catalogueRules.append(MultibuyRule(itemCode, item.getMultibuyMinimumPopulation(), groupPrice))
+        return cls(unitPrices, catalogueRules + list(rules))
+
+    def _tableCost(self, itemCode, count):
+        """Return the cheapest cost of count items of one category
+        under its multi-buy rules, growing its cost table if needed
+        """
+
+        table = self._costTables[itemCode]
+        if (count >= len(table)):
+            price = self._unitPrices[itemCode]
+            rules = self._multibuyRules[itemCode]
+            for n in range(len(table), count + 1):
+                best = table[n-1] + price
+                for groupSize, groupPrice in rules:
+                    if (groupSize <= n and table[n-groupSize] + groupPrice < best):
+                        best = table[n-groupSize] + groupPrice
+                table.append(best)
+        return table[count]
+
+    def itemCost(self, itemCode, count):
+        """Return (total cost, savings) in pence of count items of one
+        category under its multi-buy rules, ignoring bundles
+        """
+
+        if (not isinstance(itemCode, str) or not isinstance(count, int)):
+            raise TypeError
+        if (not itemCode in self._unitPrices or count < 0):
+            raise ValueError
+
+        totalCost = self._tableCost(itemCode, count)
+        return totalCost, count * self._unitPrices[itemCode] - totalCost
+
+    def _bundleCost(self, index, remaining):
+        """Return the cheapest cost of the bundle items, with counts
+        remaining in the order of _bundleItemCodes, using the bundles
+        from index on
+        """
+
+        key = (index, remaining)
+        if (key in self._bundleMemo):
+            return self._bundleMemo[key]
+
+        if (index == len(self._bundles)):
+            best = 0
+            for itemCode, count in zip(self._bundleItemCodes, remaining):
+                best += self._tableCost(itemCode, count)
+        else:
+            bundle = self._bundles[index]
+            positions = self._bundlePositions[index]
+            maxUses = min(remaining[position] // needed for position, needed in positions)
+            best = None
+            counts = list(remaining)
+            for uses in range(maxUses + 1):
+                cost = uses * bundle.price + self._bundleCost(index + 1, tuple(counts))
+                if (best is None or cost < best):
+                    best = cost
+                for position, needed in positions:
+                    counts[position] -= needed
+
+        if (len(self._bundleMemo) >= self.maxMemoSize):
+            self._bundleMemo.clear()
+        self._bundleMemo[key] = best
+        return best
+
+    def cost(self, counts):
+        """Return (total cost, savings) in pence of the cheapest valid
+        combination of offers for a basket.
+
+        Parameters:
+            counts (mapping): Item codes as keys and number of items
+                as values, e.g. the basket of a checkout.
+        """
+
+        if (not isinstance(counts, Mapping)):
+            raise TypeError
+        for itemCode in counts:
+            if (not isinstance(itemCode, str) or not isinstance(counts[itemCode], int)):
+                raise TypeError
+            if (not itemCode in self._unitPrices or counts[itemCode] < 0):
+                raise ValueError
+
+        totalCost = 0
+        fullPrice = 0
+        for itemCode in counts:
+            count = counts[itemCode]
+            fullPrice += count * self._unitPrices[itemCode]
+            if (count > 0 and not itemCode in self._bundleItemCodes):
+                totalCost += self._tableCost(itemCode, count)
+        if (self._bundles):
+            totalCost += self._bundleCost(0, tuple(counts.get(itemCode, 0) for itemCode in self._bundleItemCodes))
+        return totalCost, fullPrice - totalCost
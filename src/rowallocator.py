@@ -0,0 +1,229 @@
+import heapq
+
+class RowAllocator():
+    """Ordered rows of a list of keys, e.g. the item codes of the rows
+    of a BasketView, with logarithmic updates and lookups.
+
+    Every key is given a slot when it is added. The rows are the taken
+    slots in increasing order, so the row of a key is the number of
+    taken slots before its own. The taken slots are counted by a
+    Fenwick tree, which finds the key of a row and the row of a key in
+    O(log n) without any scan of the list.
+
+    The order of the rows follows one of three policies:
+        "firstFree": a new key takes the first free row, i.e. the
+            lowest slot freed by a removal (kept in a heap) or else a
+            new slot at the end.
+        "insertion": a new key is added at the end of the list.
+        "recentFirst": a new key is added at the top of the list.
+    With the last two policies, touch moves a key to the end or to the
+    top of the list, as if it was added again. Slots freed by removals
+    are reclaimed when the slots run out, by renumbering the taken
+    slots in order.
+
+    Attributes:
+        _policy (str): "firstFree", "insertion" or "recentFirst".
+        _capacity (int): Number of slots.
+        _tree (list): Fenwick tree of the number of taken slots, with
+            _capacity + 1 entries.
+        _slotKeys (list): Key of every slot, None for free slots.
+        _keySlots (dict): Keys as keys and their slots as values.
+        _freeSlots (list): Heap of the free slots below _nextSlot,
+            used by the "firstFree" policy only.
+        _nextSlot (int): Lowest slot never taken since the last
+            renumbering.
+
+    Methods:
+        add(self, key)
+
+        remove(self, key)
+
+        touch(self, key)
+
+        keyAt(self, row)
+
+        rowOf(self, key)
+
+        keys(self)
+
+        clear(self)
+    """
+
+    policies = ("firstFree", "insertion", "recentFirst")
+
+    def __init__(self, policy="insertion", capacity=64):
+        """Initialise an empty list.
+
+        Parameters:
+            policy (str): "firstFree", "insertion" or "recentFirst".
+
+            capacity (int): Number of slots to start with. Slots are
+                doubled when they run out.
+        """
+
+        if (not isinstance(policy, str) or not isinstance(capacity, int)):
+            raise TypeError
+        if (not policy in self.policies or capacity <= 0):
+            raise ValueError
+
+        self._policy = policy
+        self._capacity = capacity
+        self.clear()
+
+    def clear(self):
+        """Remove all the keys"""
+
+        self._tree = [0] * (self._capacity + 1)
+        self._slotKeys = [None] * self._capacity
+        self._keySlots = {}
+        self._freeSlots = []
+        self._nextSlot = 0
+
+    def __len__(self):
+        return len(self._keySlots)
+
+    def __contains__(self, key):
+        return key in self._keySlots
+
+    def _addToTree(self, slot, delta):
+        """Add delta to the count of slot in the Fenwick tree"""
+
+        index = slot + 1
+        tree = self._tree
+        while (index <= self._capacity):
+            tree[index] += delta
+            index += index & -index
+
+    def _countBefore(self, slot):
+        """Return the number of taken slots below slot"""
+
+        index = slot
+        count = 0
+        tree = self._tree
+        while (index > 0):
+            count += tree[index]
+            index -= index & -index
+        return count
+
+    def _findSlot(self, rank):
+        """Return the slot taken by the key with rank keys in lower
+        slots
+        """
+
+        index = 0
+        step = 1 << self._capacity.bit_length()
+        tree = self._tree
+        while (step):
+            if (index + step <= self._capacity and tree[index + step] <= rank):
+                index += step
+                rank -= tree[index]
+            step >>= 1
+        return index
+
+    def _renumber(self):
+        """Make room for a new slot: renumber the taken slots from 0
+        in order if at most half of the slots are taken, otherwise
+        double the slots
+        """
+
+        # With the "firstFree" policy, free slots are reused before any
+        # new slot is taken, so all the slots are taken here
+        keys = [key for key in self._slotKeys[:self._nextSlot] if key is not None]
+        if (len(keys) > self._capacity // 2):
+            self._capacity *= 2
+        self._slotKeys = keys + [None] * (self._capacity - len(keys))
+        self._keySlots = {key: slot for slot, key in enumerate(keys)}
+        self._nextSlot = len(keys)
+
+        # Build the Fenwick tree in O(n)
+        tree = [0] * (self._capacity + 1)
+        for slot, key in enumerate(self._slotKeys):
+            if (key is not None):
+                tree[slot + 1] += 1
+        for index in range(1, self._capacity + 1):
+            parent = index + (index & -index)
+            if (parent <= self._capacity):
+                tree[parent] += tree[index]
+        self._tree = tree
+
+    def _takeSlot(self, key):
+        """Give key a slot according to the policy"""
+
+        if (self._policy == "firstFree" and self._freeSlots):
+            slot = heapq.heappop(self._freeSlots)
+        else:
+            if (self._nextSlot == self._capacity):
+                self._renumber()
+            slot = self._nextSlot
+            self._nextSlot += 1
+        self._slotKeys[slot] = key
+        self._keySlots[key] = slot
+        self._addToTree(slot, 1)
+
+    def _freeSlot(self, key):
+        """Take the slot of key back"""
+
+        slot = self._keySlots.pop(key)
+        self._slotKeys[slot] = None
+        self._addToTree(slot, -1)
+        if (self._policy == "firstFree"):
+            heapq.heappush(self._freeSlots, slot)
+
+    def add(self, key):
+        """Add a new key and return its row"""
+
+        if (key is None):
+            raise TypeError
+        if (key in self._keySlots):
+            raise ValueError
+        self._takeSlot(key)
+        return self.rowOf(key)
+
+    def remove(self, key):
+        """Remove a key, moving the keys of the next rows up by one"""
+
+        if (not key in self._keySlots):
+            raise ValueError
+        self._freeSlot(key)
+
+    def touch(self, key):
+        """Move a key to the end of the list, or to its top with the
+        "recentFirst" policy, and return its row. Keys keep their row
+        with the "firstFree" policy.
+        """
+
+        if (not key in self._keySlots):
+            raise ValueError
+        if (self._policy != "firstFree"):
+            self._freeSlot(key)
+            self._takeSlot(key)
+        return self.rowOf(key)
+
+    def keyAt(self, row):
+        """Return the key of a row"""
+
+        if (not isinstance(row, int)):
+            raise TypeError
+        if (row < 0 or row >= len(self._keySlots)):
+            raise IndexError
+        if (self._policy == "recentFirst"):
+            row = len(self._keySlots) - 1 - row
+        return self._slotKeys[self._findSlot(row)]
+
+    def rowOf(self, key):
+        """Return the row of a key"""
+
+        if (not key in self._keySlots):
+            raise ValueError
+        row = self._countBefore(self._keySlots[key])
+        if (self._policy == "recentFirst"):
+            row = len(self._keySlots) - 1 - row
+        return row
+
+    def keys(self):
+        """Return the list of the keys in the order of the rows"""
+
+        keys = [key for key in self._slotKeys[:self._nextSlot] if key is not None]
+        if (self._policy == "recentFirst"):
+            keys.reverse()
+        return keys
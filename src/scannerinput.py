@@ -0,0 +1,260 @@
+import asyncio
+import os
+import queue
+import stat
+import threading
+from collections import Counter
+
+class ScannerInput():
+    """Feeds a checkout with the item codes read from a barcode scanner.
+
+    The scanner is read by an asyncio event loop on a background thread.
+    The source is a named pipe (FIFO), a serial or other character
+    device already configured for reading, a Unix domain socket or a
+    TCP socket. Scanners send one item code per line, terminated by a
+    carriage return, a line feed or both. Every chunk read from the
+    source is decoded into a batch of item codes, which is put on a
+    thread-safe queue.
+
+    The tkinter thread drains the queue every interval milliseconds
+    with root.after and applies all the waiting scans to the checkout
+    with a single scanMany call, i.e. a single signal. A burst of
+    thousands of scans therefore costs one update of the basket and of
+    the widgets, and no scan is dropped since the queue is unbounded.
+    Item codes missing from the catalogue of the checkout are passed
+    to the error callback instead.
+
+    Attributes:
+        _root (tkinter widget): Widget whose after method schedules
+            the draining of the queue.
+        _checkout (Checkout instance): The checkout fed with the scans.
+        _onError (None or function): Called with every unknown item
+            code.
+        _interval (int): Milliseconds between two drains of the queue.
+        _queue (queue.SimpleQueue): Batches of item codes read from
+            the scanner.
+        _thread (None or threading.Thread): Thread of the event loop.
+        _loop (None or asyncio loop): Event loop reading the scanner.
+        _task (None or asyncio.Task): Task reading the scanner.
+        _startError (None or Exception): Error raised when opening the
+            source, handed from the thread of the event loop to start.
+        _afterId (None or str): Identifier of the next drain.
+        paused (bool): Scans are kept in the queue while True, e.g.
+            while the basket is edited on the staff page.
+        numberOfScans (int): Scans applied to the checkout so far.
+        numberOfErrors (int): Unknown item codes read so far.
+
+    Methods:
+        start(self, source)
+
+        stop(self)
+
+        drain(self)
+    """
+
+    def __init__(self, root, checkout, onError=None, interval=20):
+        """Initialise the scanner input.
+
+        Parameters:
+            root (tkinter widget): Widget whose after method schedules
+                the draining of the queue, e.g. the root window.
+
+            checkout (Checkout instance): The checkout to feed.
+
+            onError (None or function): Called with every item code
+                that is not in the catalogue of the checkout.
+
+            interval (int): Milliseconds between two drains.
+        """
+
+        if (root is None or checkout is None):
+            raise TypeError
+        if (not isinstance(interval, int)):
+            raise TypeError
+        if (interval <= 0):
+            raise ValueError
+
+        self._root = root
+        self._checkout = checkout
+        self._onError = onError
+        self._interval = interval
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._loop = None
+        self._task = None
+        self._startError = None
+        self._afterId = None
+        self.paused = False
+        self.numberOfScans = 0
+        self.numberOfErrors = 0
+
+    def start(self, source):
+        """Start reading the scanner and draining the queue. The source
+        is opened before start returns, and the error raised when it
+        cannot be opened, e.g. FileNotFoundError or
+        ConnectionRefusedError, is raised again by start.
+
+        Parameters:
+            source (str or tuple): Path of a FIFO, character device or
+                Unix domain socket, or (host, port) of a TCP socket.
+        """
+
+        if (not isinstance(source, (str, tuple))):
+            raise TypeError
+        if (self._thread is not None):
+            raise RuntimeError("the scanner input is already started")
+
+        started = threading.Event()
+        self._thread = threading.Thread(target=self._runLoop, args=(source, started),
+                                        name="scanner input", daemon=True)
+        self._thread.start()
+        started.wait()
+        if (self._startError is not None):
+            error = self._startError
+            self._startError = None
+            self._thread.join()
+            self._thread = None
+            raise error
+        self._afterId = self._root.after(self._interval, self._onScheduledDrain)
+
+    def stop(self):
+        """Stop reading the scanner, then apply the scans still in the
+        queue unless paused
+        """
+
+        if (self._thread is None):
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._task.cancel)
+        except RuntimeError:
+            # The source was closed and the loop has already finished
+            pass
+        self._thread.join()
+        self._thread = None
+        if (self._afterId is not None):
+            self._root.after_cancel(self._afterId)
+            self._afterId = None
+        self.drain()
+
+    def _runLoop(self, source, started):
+        """Open the source, then run the event loop reading the scanner
+        until stopped
+        """
+
+        self._loop = asyncio.new_event_loop()
+        try:
+            try:
+                reader, connection = self._loop.run_until_complete(self._open(source))
+            except Exception as error:
+                self._startError = error
+                return
+            finally:
+                started.set()
+            self._task = self._loop.create_task(self._read(reader, connection))
+            self._loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._loop.close()
+
+    async def _open(self, source):
+        """Return a StreamReader reading from source and the transport
+        or stream writer to close when done
+        """
+
+        if (isinstance(source, tuple)):
+            return await asyncio.open_connection(*source)
+        mode = os.stat(source).st_mode
+        if (stat.S_ISSOCK(mode)):
+            return await asyncio.open_unix_connection(source)
+
+        # Opening a FIFO for writing too keeps it open when the writer
+        # goes away and does not block until a writer appears
+        flags = os.O_RDWR if stat.S_ISFIFO(mode) else os.O_RDONLY
+        fileObject = os.fdopen(os.open(source, flags | os.O_NONBLOCK), "rb", buffering=0)
+        reader = asyncio.StreamReader()
+        transport, _ = await asyncio.get_running_loop().connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), fileObject)
+        return reader, transport
+
+    async def _read(self, reader, connection):
+        """Read the scanner and queue one batch of item codes per chunk"""
+
+        decoder = ScanDecoder()
+        try:
+            while (True):
+                chunk = await reader.read(65536)
+                if (not chunk):
+                    break
+                itemCodes = decoder.feed(chunk)
+                if (itemCodes):
+                    self._queue.put(itemCodes)
+            itemCodes = decoder.flush()
+            if (itemCodes):
+                self._queue.put(itemCodes)
+        finally:
+            connection.close()
+
+    def _onScheduledDrain(self):
+        """Drain triggered by the tkinter event loop"""
+
+        self.drain()
+        self._afterId = self._root.after(self._interval, self._onScheduledDrain)
+
+    def drain(self):
+        """Apply every queued scan to the checkout with one signal,
+        unless paused. Must be called on the thread of the checkout.
+        """
+
+        if (self.paused):
+            return
+        counts = Counter()
+        while (True):
+            try:
+                counts.update(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if (not counts):
+            return
+
+        itemsCatalogue = self._checkout.getItemsCatalogue()
+        for itemCode in list(counts):
+            if (not itemCode in itemsCatalogue):
+                for scan in range(counts.pop(itemCode)):
+                    self.numberOfErrors += 1
+                    if (self._onError is not None):
+                        self._onError(itemCode)
+        if (counts):
+            # Every code is in the catalogue and every count positive
+            self._checkout.trusted().scanMany(counts)
+            self.numberOfScans += sum(counts.values())
+
+
+class ScanDecoder():
+    """Splits the bytes sent by a scanner into item codes.
+
+    Lines may be terminated by a carriage return, a line feed or both,
+    and may be split across chunks. Blank lines are ignored.
+
+    Methods:
+        feed(self, chunk)
+
+        flush(self)
+    """
+
+    def __init__(self):
+        self._pending = b""
+
+    def feed(self, chunk):
+        """Return the list of item codes completed by chunk"""
+
+        lines = (self._pending + chunk).replace(b"\r", b"\n").split(b"\n")
+        self._pending = lines.pop()
+        return [line.decode("utf-8", "replace").strip() for line in lines if line.strip()]
+
+    def flush(self):
+        """Return the list with the unterminated last item code, if any"""
+
+        line = self._pending.strip()
+        self._pending = b""
+        return [line.decode("utf-8", "replace")] if line else []
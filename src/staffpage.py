@@ -1,23 +1,33 @@
 import tkinter as tk
 import baskettotalwidget
 import staffpagecontrols
-import checkout
+import checkoutoverlay
 
 class StaffPage(tk.Toplevel):
     """The pop up page for staff access to the basket
 
-    The page creates a copy of the customer's basket which is ammended
-    by staff using controls found also on this page. Controls are
+    The page opens a copy-on-write overlay on the customer's basket
+    which is ammended by staff using controls found also on this page. Controls are
     addition and removal of 1 item of a specific category, the removal
     of all items of a specific category and the removal of all items
     of all categories. Staff can cancel without applying their changes
     to the customer's basket or confirm their changes and do so.
 
+    The controls are rows in a scrollable list. Only the rows of the
+    item categories in the basket are created with the page, so the
+    time to open it depends on the size of the basket and not of the
+    items catalogue. The rows of other items are created when staff
+    search for them by code or name, or scroll to the end of the list
+    with the scrollbar or the mouse wheel.
+
     Attributes:
         customerPage (CustomerPage instance): The customer page
     
         staffUsername (string): Username of logged in user
 
+        dictItemControlsWidgets (dict): Item codes as keys and their
+            StaffPageControls rows as values, for the rows created so far
+
     Methods:
         onBasketUpdated(self,listItemCodeAndaction="all", signalStrength = "strong")
     """
@@ -57,13 +67,14 @@ class StaffPage(tk.Toplevel):
         self.title("Store login")
         self.iconbitmap(r"../resources/staffLogo.ico")
 
-        # copy constructor for the checkout class: copy data from customer page checkout class
-        self._checkout = checkout.Checkout(orig=self.customerPage.getCheckout())
+        # copy-on-write overlay on the customer page checkout class: only the
+        # changes made by staff are recorded
+        self._checkout = checkoutoverlay.CheckoutOverlay(self.customerPage.getCheckout())
 
         # 3 rows, 1 for the header, 1 for the individual item controls and 1 for the whole basket controls
         self.rowconfigure(0,weight=0)
-        self.rowconfigure(1,weight=0)
-        self.rowconfigure(2,weight=1)
+        self.rowconfigure(1,weight=1)
+        self.rowconfigure(2,weight=0)
         self.columnconfigure(0, weight=1)
 
         # The frames for each row
@@ -75,14 +86,14 @@ class StaffPage(tk.Toplevel):
         self.headerFrame.rowconfigure(0,weight=1)
 
         self.itemsControlsFrame = tk.LabelFrame(self, bg="#51990F", bd=0, highlightthickness=0, highlightbackground="#C5E0B4")
-        self.itemsControlsFrame.grid(row=1, column=0, sticky="new")
-        self.itemsControlsFrame.rowconfigure(0,weight=1)
+        self.itemsControlsFrame.grid(row=1, column=0, sticky="news")
+        self.itemsControlsFrame.rowconfigure(0,weight=0)
         self.itemsControlsFrame.rowconfigure(1,weight=1)
-        self.itemsControlsFrame.rowconfigure(2,weight=1)
         self.itemsControlsFrame.columnconfigure(0,weight=1)
+        self.itemsControlsFrame.columnconfigure(1,weight=0)
 
         self.basketControlsFrame = tk.LabelFrame(self, bg="white", bd=0, highlightthickness=0, highlightbackground="#C5E0B4")
-        self.basketControlsFrame.grid(row=2, column=0, sticky = "sew")
+        self.basketControlsFrame.grid(row=2, column=0, sticky = "ew")
         self.basketControlsFrame.columnconfigure(0,weight=0)
         self.basketControlsFrame.columnconfigure(1,weight=1)
         self.basketControlsFrame.columnconfigure(2,weight=1)
@@ -122,28 +133,167 @@ class StaffPage(tk.Toplevel):
         self.btnConfirmChanges.grid(row=0, column=3, sticky="news",padx=5, pady=5)
 
         # The individual item controls
-        itemCategoriesInBasket = self._checkout.getItemCategoriesInBasket()
+        #------------------------------------------------------------------------
+        # the search of an item by code or name
+        self.searchFrame = tk.Frame(self.itemsControlsFrame, bg="#51990F", padx=10, pady=5)
+        self.searchFrame.grid(row=0, column=0, columnspan=2, sticky="ew")
+        self.searchFrame.columnconfigure(1, weight=1)
+        self.labelSearch = tk.Label(self.searchFrame, text="Find item:", font="Calibri 14 bold", bg="#51990F")
+        self.labelSearch.grid(row=0, column=0, sticky="w")
+        self.entrySearch = tk.Entry(self.searchFrame, font="Calibri 14")
+        self.entrySearch.grid(row=0, column=1, sticky="ew", padx=5)
+        self.entrySearch.bind("<Return>", self._onSearch)
+        self.btnSearch = tk.Button(self.searchFrame, text="Find", font="Calibri",
+          bg="#C0DE0C", activebackground="#C5E0B4", command=self._onSearch)
+        self.btnSearch.grid(row=0, column=2, sticky="e")
+
+        # the scrollable list of rows
+        self.rowsCanvas = tk.Canvas(self.itemsControlsFrame, bg="white", bd=0, highlightthickness=0)
+        self.rowsCanvas.grid(row=1, column=0, sticky="news")
+        self.rowsScrollbar = tk.Scrollbar(self.itemsControlsFrame, orient=tk.VERTICAL, command=self._onScroll)
+        self.rowsScrollbar.grid(row=1, column=1, sticky="ns")
+        self.rowsCanvas.configure(yscrollcommand=self.rowsScrollbar.set)
+        self.rowsFrame = tk.Frame(self.rowsCanvas, bg="white", bd=0)
+        self.rowsFrame.columnconfigure(0, weight=1)
+        rowsWindow = self.rowsCanvas.create_window(0, 0, window=self.rowsFrame, anchor="nw")
+        self.rowsFrame.bind("<Configure>",
+          lambda event: self.rowsCanvas.configure(scrollregion=self.rowsCanvas.bbox("all")))
+        self.rowsCanvas.bind("<Configure>",
+          lambda event: self.rowsCanvas.itemconfigure(rowsWindow, width=event.width))
+
+        # the button showing more items of the catalogue
+        self.btnMoreItems = tk.Button(self.rowsFrame, text="Show more items", font="Calibri",
+          bg="#C0DE0C", activebackground="#C5E0B4", command=self._addMoreRows)
+
+        # The rows are created later, so the mouse wheel is bound to a
+        # tag that every row is given
+        self._scrollTag = "StaffPage{}".format(id(self))
+        self.bind_class(self._scrollTag, "<MouseWheel>", self._onMouseWheel)
+        self.bind_class(self._scrollTag, "<Button-4>", lambda event: self._onScroll("scroll", -1, "units"))
+        self.bind_class(self._scrollTag, "<Button-5>", lambda event: self._onScroll("scroll", 1, "units"))
+        self._addScrollTag(self.rowsCanvas)
+
+        # Only the rows of the items in the basket are created now, the
+        # others when they are searched for or scrolled to
         self.dictItemControlsWidgets = {}
-        for index, itemCode in enumerate(itemCategoriesInBasket):
-            itemControl = staffpagecontrols.StaffPageControls(
-                self.itemsControlsFrame,
-                self._checkout.getItemsCatalogue()[itemCode])
+        self._moreItemCodes = None
+        for itemCode in self._checkout.getItemCategoriesInBasket():
+            self._addRow(itemCode, "strong")
+        self._placeMoreItemsButton()
+
+        # Update the widgets one by one rather than signalling everyone
+        self.basketTotalWidget.slot(self._checkout)
+
+        # Hidden keys printing the latency statistics as text or JSON
+        self.bind("<Control-Alt-i>", lambda event: self._dumpInstrumentation("text"))
+        self.bind("<Control-Alt-I>", lambda event: self._dumpInstrumentation("json"))
+
+    def _dumpInstrumentation(self, format):
+        """Print the latency statistics of the application on the
+        standard error, as on SIGUSR1
+        """
+
+        import instrumentation
+        instrumentation.getSharedInstrumentation().dump(None, format)
+
+    def _addRow(self, itemCode, signalStrength="weak"):
+        """Create the controls of an item category at the end of the list,
+        register them with the overlay and show the number of items of
+        the category. Return the new row.
+        """
+
+        itemControl = staffpagecontrols.StaffPageControls(
+            self.rowsFrame,
+            self._checkout.getItemsCatalogue()[itemCode])
+        itemControl.grid(row=len(self.dictItemControlsWidgets), column=0, sticky="news", padx=0, pady=0)
+        self._addScrollTag(itemControl)
+        self.dictItemControlsWidgets[itemCode] = itemControl
+        self._checkout.register(itemControl, [itemCode])
+        itemControl.slot(self._checkout, signalStrength)
+        return itemControl
+
+    def _placeMoreItemsButton(self):
+        """Show the button for more items below the last row, unless all
+        the items of the catalogue have a row
+        """
+
+        if (len(self.dictItemControlsWidgets) < len(self._checkout.getItemsCatalogue())):
+            self.btnMoreItems.grid(row=len(self.dictItemControlsWidgets), column=0, sticky="ew", padx=10, pady=10)
+        else:
+            self.btnMoreItems.grid_forget()
+
+    def _addMoreRows(self, numberOfRows=10):
+        """Create the rows of the next items of the catalogue that have
+        no row yet
+        """
+
+        if (self._moreItemCodes is None):
+            self._moreItemCodes = iter(list(self._checkout.getItemsCatalogue()))
+        for itemCode in self._moreItemCodes:
+            if (not itemCode in self.dictItemControlsWidgets):
+                self._addRow(itemCode)
+                numberOfRows -= 1
+                if (numberOfRows == 0):
+                    break
+        self._placeMoreItemsButton()
+
+    def _onScroll(self, *arguments):
+        """Command of the scrollbar, creating more rows when the end of
+        the list is reached
+        """
+
+        self.rowsCanvas.yview(*arguments)
+        if (self.rowsCanvas.yview()[1] >= 1.):
+            self._addMoreRows()
+
+    def _onMouseWheel(self, event):
+        """Scroll with the mouse wheel on Windows and macOS"""
 
-            self.dictItemControlsWidgets[itemCode]=itemControl
-            self.dictItemControlsWidgets[itemCode].grid(row=index, column=0, sticky="news", padx=0, pady=0)
-            self._checkout.register(self.dictItemControlsWidgets[itemCode])
+        self._onScroll("scroll", -1 if event.delta > 0 else 1, "units")
+
+    def _addScrollTag(self, widget):
+        """Let widget and its children scroll the list"""
+
+        widget.bindtags(widget.bindtags() + (self._scrollTag,))
+        for child in widget.winfo_children():
+            self._addScrollTag(child)
+
+    def _onSearch(self, event=None):
+        """Create the rows of the items whose code or name contains the
+        searched text and scroll to the first of them
+        """
+
+        text = self.entrySearch.get().strip().lower()
+        if (not text):
+            return
 
-        # trigger signal after all widgets have been drawn to update their data
-        self._checkout.signal()
+        foundRows = []
+        for itemCode, item in self._checkout.getItemsCatalogue().items():
+            if (text in itemCode.lower() or text in item.getName().lower()):
+                if (itemCode in self.dictItemControlsWidgets):
+                    foundRows.append(self.dictItemControlsWidgets[itemCode])
+                else:
+                    foundRows.append(self._addRow(itemCode))
+                if (len(foundRows) == 10):
+                    break
+        self._placeMoreItemsButton()
+
+        if (foundRows):
+            # The geometry of the new rows is needed to scroll to them
+            self.update_idletasks()
+            firstRow = min(foundRows, key=lambda row: row.winfo_y())
+            self.rowsCanvas.yview_moveto(firstRow.winfo_y() / max(1, self.rowsFrame.winfo_height()))
 
     def _onCancel(self):
         """Close the staff page and return to the customer page"""
 
+        self._checkout.discard()
         self.destroy()
 
     def _onConfirm(self):
         """Apply the basket changes to the basket in the customer page
-        and close the staff page
+        and close the staff page. Only the changed categories are
+        applied and signalled.
         """
 
         self._checkout.copyTo(self.customerPage.getCheckout())
@@ -161,10 +311,9 @@ class StaffPage(tk.Toplevel):
 
         if (not isinstance(listItemCodeAndaction, str)):
             raise TypeError
-        if (not (len(listItemCodeAndaction) <= 3 and 
-            (listItemCodeAndaction=="all"
-            or listItemCodeAndaction.endswith("-A")
-            or not listItemCodeAndaction in self._checkout.getBasket().keys()))):
+        # Actions are "all" or an item code followed by "-A", "+1", "-1" or " 0"
+        if (not (listItemCodeAndaction=="all"
+            or listItemCodeAndaction[:-2] in self._checkout.getItemsCatalogue())):
             raise ValueError
         if (not isinstance(signalStrength, str)):
             raise TypeError
@@ -177,11 +326,11 @@ class StaffPage(tk.Toplevel):
             return
         # Remove all items that belong to a specific category
         elif (listItemCodeAndaction.endswith("-A")):
-            self._checkout.clearBasket(listItemCodeAndaction[0], "weak")
+            self._checkout.clearBasket(listItemCodeAndaction[:-2], "weak")
         # add or remove 1 item
         else:
-            itemCode = listItemCodeAndaction[0]
-            action=int(listItemCodeAndaction[1:3])
+            itemCode = listItemCodeAndaction[:-2]
+            action=int(listItemCodeAndaction[-2:])
             if (action==-1):
                 self._checkout.unscan(itemCode, signalStrength)
             elif (action==1):
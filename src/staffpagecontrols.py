@@ -1,4 +1,5 @@
 import tkinter as tk
+import imagecache
 import iteminfocard
 from item import Item
 from checkout import Checkout
@@ -17,7 +18,7 @@ class StaffPageControls(tk.Frame):
         population (int): How many of these Items are in the basket.
 
     Methods:
-        slot(self, checkout, signalStrength="strong")
+        slot(self, checkout, signalStrength="strong", changedItems=None)
     """
 
     def __init__(self, parent, item):
@@ -35,11 +36,14 @@ class StaffPageControls(tk.Frame):
         self.parent = parent
         self.item = item
 
-        self.buttonMinus = tk.PhotoImage(file = r"../resources/buttonMinus.png").subsample(3,3)
+        # Button images are shared by all rows through the image cache
+        images = imagecache.getSharedCache()
+
+        self.buttonMinus = images.getImage(r"../resources/buttonMinus.png", 3)
         self.btnDecreaseItemCount = tk.Button(self, image=self.buttonMinus, bg="white", command = lambda: self._updateItemCount(-1, "weak"))
         self.btnDecreaseItemCount.grid(row=0, column=0, sticky="news")
 
-        self.buttonPlus = tk.PhotoImage(file = r"../resources/buttonPlus.png").subsample(3,3)
+        self.buttonPlus = images.getImage(r"../resources/buttonPlus.png", 3)
         self.btnIncreaseItemCount = tk.Button(self, image=self.buttonPlus, bg="white", command = lambda: self._updateItemCount(1, "weak"))
         self.btnIncreaseItemCount.grid(row=0, column=1, sticky="news")
 
@@ -49,12 +53,12 @@ class StaffPageControls(tk.Frame):
         self.itemCardContainer.columnconfigure(0, weight=1)
         self.itemCard = iteminfocard.ItemInfoCard(self.itemCardContainer, self.item, "storePage")
 
-        self.removeAllImage = tk.PhotoImage(file = r"../resources/buttonBin.png")
+        self.removeAllImage = images.getImage(r"../resources/buttonBin.png")
         self.btnRemoveAllItemsOfThisCategory = tk.Button(self, text = "Remove\nall", font = "Calibri 14 bold",
           image=self.removeAllImage, compound=tk.BOTTOM, bg="red", activebackground="orange", command = lambda: self._updateItemCount(-2, signalStrength = "weak"))
         self.btnRemoveAllItemsOfThisCategory.grid(row=0, column=3, sticky="news")
 
-    def slot(self, checkout, signalStrength="strong"):
+    def slot(self, checkout, signalStrength="strong", changedItems=None):
         """Method triggered by the signal of the checkout class"""
         if (not isinstance(checkout, Checkout)):
             raise TypeError
@@ -63,7 +67,7 @@ class StaffPageControls(tk.Frame):
         if (not signalStrength in ["weak", "strong"]):
             raise ValueError
         # Send signal to the ItemInfoCard of this widget to update its display. 
-        self.itemCard.slot(checkout, signalStrength)
+        self.itemCard.slot(checkout, signalStrength, changedItems)
 
     def _updateItemCount(self, mode, signalStrength = "strong"):
         """Change the number of items of this category of products in the basket."""
@@ -85,5 +89,5 @@ class StaffPageControls(tk.Frame):
         else:
             basketUpdateCode="{}+{:1d}".format(self.item.getCode(),mode) if mode>0 else "{}{:2d}".format(self.item.getCode(),mode)
 
-        # update the staff page
-        self.parent.master.onBasketUpdated(basketUpdateCode, signalStrength)
+        # update the staff page, whichever frame the row is placed in
+        self.winfo_toplevel().onBasketUpdated(basketUpdateCode, signalStrength)
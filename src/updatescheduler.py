@@ -0,0 +1,126 @@
+class UpdateScheduler():
+    """Coalesces the signals of a checkout into one update per frame.
+
+    Widgets are registered with a checkout through the scheduler, which
+    hands the checkout a deferred listener in their place. A signal only
+    marks the widget as dirty and makes sure that a flush is scheduled
+    on the tkinter event loop. The flush then calls the slot of every
+    dirty widget once, however many signals it missed, so that a fast
+    barcode scanner does not cause one redraw per scanned item.
+
+    Signals are merged per widget: the merged signal is strong if any
+    of the signals was strong and names the union of the changed item
+    codes (None, i.e. everything, if any signal named no codes).
+
+    Attributes:
+        _widget (tkinter widget): Widget whose event loop runs the
+            flushes.
+        _delay (int): Milliseconds between the first signal and the
+            flush. The flush runs when the event loop is idle if 0.
+        _proxies (dict): Listeners as keys and their deferred
+            listeners as values.
+        _pending (dict): Dirty listeners as keys and [checkout,
+            signalStrength, changedItems] lists as values, in the order
+            in which they were first signalled.
+        _afterId (None or str): Identifier of the scheduled flush.
+
+    Methods:
+        deferred(self, listener)
+
+        flush(self)
+
+        cancel(self)
+    """
+
+    def __init__(self, widget, delay=16):
+        """Initialise the scheduler.
+
+        Parameters:
+            widget (tkinter widget): Widget whose after and after_idle
+                methods schedule the flushes, e.g. the root window.
+
+            delay (int): Milliseconds to wait for more signals before
+                flushing, 16 for about one flush per frame at 60Hz.
+        """
+
+        if (widget is None):
+            raise TypeError
+        if (not isinstance(delay, int)):
+            raise TypeError
+        if (delay < 0):
+            raise ValueError
+
+        self._widget = widget
+        self._delay = delay
+        self._proxies = {}
+        self._pending = {}
+        self._afterId = None
+
+    def deferred(self, listener):
+        """Return the listener to register with a checkout in place of
+        listener so that its updates go through the scheduler
+        """
+
+        if (listener is None):
+            raise TypeError
+        if (not listener in self._proxies):
+            self._proxies[listener] = _DeferredListener(self, listener)
+        return self._proxies[listener]
+
+    def _markDirty(self, listener, checkout, signalStrength, changedItems):
+        """Record a signal for listener and schedule a flush"""
+
+        if (listener in self._pending):
+            pending = self._pending[listener]
+            pending[0] = checkout
+            if (signalStrength == "strong"):
+                pending[1] = "strong"
+            if (pending[2] is not None):
+                pending[2] = None if changedItems is None else pending[2] | changedItems
+        else:
+            self._pending[listener] = [checkout, signalStrength, changedItems]
+
+        if (self._afterId is None):
+            if (self._delay == 0):
+                self._afterId = self._widget.after_idle(self._onScheduledFlush)
+            else:
+                self._afterId = self._widget.after(self._delay, self._onScheduledFlush)
+
+    def _onScheduledFlush(self):
+        """Flush triggered by the event loop"""
+
+        self._afterId = None
+        self.flush()
+
+    def flush(self):
+        """Update every dirty listener once with its merged signal"""
+
+        if (self._afterId is not None):
+            self._widget.after_cancel(self._afterId)
+            self._afterId = None
+        pending = self._pending
+        self._pending = {}
+        for listener in pending:
+            checkout, signalStrength, changedItems = pending[listener]
+            listener.slot(checkout, signalStrength, changedItems)
+
+    def cancel(self):
+        """Drop all pending updates, e.g. before destroying the widgets"""
+
+        if (self._afterId is not None):
+            self._widget.after_cancel(self._afterId)
+            self._afterId = None
+        self._pending = {}
+
+
+class _DeferredListener():
+    """Listener registered with a checkout on behalf of a widget"""
+
+    def __init__(self, scheduler, listener):
+        self._scheduler = scheduler
+        self._listener = listener
+
+    def slot(self, checkout, signalStrength="strong", changedItems=None):
+        """Method triggered by the signal of the checkout class"""
+
+        self._scheduler._markDirty(self._listener, checkout, signalStrength, changedItems)
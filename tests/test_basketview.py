@@ -0,0 +1,137 @@
+import unittest
+import sys
+import tkinter as tk
+from types import SimpleNamespace
+sys.path.insert(0, "../src")
+from basketview import BasketView
+from catalogue import Catalogue
+from checkout import Checkout
+
+def setUpModule():
+    global root
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        raise unittest.SkipTest("no display is available")
+    root.withdraw()
+
+def tearDownModule():
+    root.destroy()
+
+class Test_BasketView(unittest.TestCase):
+    def setUp(self):
+        self.codes = ["SKU-{:03d}".format(index) for index in range(20)]
+        self.catalogue = Catalogue([{"code": itemCode, "name": "Item {}".format(itemCode), "image": "",
+                                     "price": 10, "multibuyMinimumPopulation": 1,
+                                     "offerOnPopulation": 0, "offerOnPrice": 0} for itemCode in self.codes])
+        self.checkout = Checkout(None, self.catalogue)
+        self.view = self._newView()
+
+    def tearDown(self):
+        self._dropView(self.view)
+
+    def _newView(self, order="insertion"):
+        view = BasketView(root, self.checkout, 100, order)
+        self.checkout.register(view)
+        # Room for 3 rows, without waiting for the geometry manager
+        view._onResize(SimpleNamespace(height=250))
+        return view
+
+    def _dropView(self, view):
+        self.checkout.unregister(view)
+        view.destroy()
+
+    def _shownItems(self, view):
+        return [view._pool[position].getItemCode() for position, itemCode in enumerate(view._cardItems)
+                if itemCode is not None]
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            BasketView(root, None)
+        with self.assertRaises(TypeError):
+            BasketView(root, self.checkout, 1.5)
+        with self.assertRaises(ValueError):
+            BasketView(root, self.checkout, 0)
+        with self.assertRaises(ValueError):
+            BasketView(root, self.checkout, 100, "random")
+
+    def test_pool(self):
+        self.assertListEqual(self.view.getRows(), [])
+        self.checkout.scanMany(self.codes[:10])
+        self.assertListEqual(self.view.getRows(), self.codes[:10])
+        # One card per visible row, however many rows
+        self.assertEqual(self.view.getPoolSize(), 3)
+        self.assertListEqual(self._shownItems(self.view), self.codes[:3])
+        self.checkout.scanMany(self.codes[10:])
+        self.assertEqual(self.view.getPoolSize(), 3)
+
+        # The pool follows the height of the view
+        self.view._onResize(SimpleNamespace(height=450))
+        self.assertEqual(self.view.getPoolSize(), 5)
+        self.view._onResize(SimpleNamespace(height=150))
+        self.assertEqual(self.view.getPoolSize(), 5)
+        self.assertEqual(len(self._shownItems(self.view)), 2)
+
+    def test_scroll(self):
+        self.checkout.scanMany(self.codes[:10])
+        pool = list(self.view._pool)
+        self.view.scrollTo(4)
+        self.assertListEqual(self._shownItems(self.view), self.codes[4:7])
+        # The cards are recycled
+        self.assertListEqual(self.view._pool, pool)
+
+        self.view._onScroll("scroll", "-1", "units")
+        self.assertListEqual(self._shownItems(self.view), self.codes[3:6])
+        self.view._onScroll("scroll", "1", "pages")
+        self.assertListEqual(self._shownItems(self.view), self.codes[6:9])
+        self.view._onScroll("moveto", "0.0")
+        self.assertListEqual(self._shownItems(self.view), self.codes[:3])
+
+        # Scrolling stops at both ends of the list
+        self.view._onScroll("moveto", "1.0")
+        self.assertListEqual(self._shownItems(self.view), self.codes[7:10])
+        self.view.scrollTo(100)
+        self.assertListEqual(self._shownItems(self.view), self.codes[7:10])
+        self.view.scrollTo(-5)
+        self.assertListEqual(self._shownItems(self.view), self.codes[:3])
+        with self.assertRaises(TypeError):
+            self.view.scrollTo(1.)
+
+    def test_removal(self):
+        self.checkout.scanMany(self.codes[:5])
+        self.checkout.unscan(self.codes[1])
+        self.assertListEqual(self.view.getRows(), [self.codes[0]] + self.codes[2:5])
+        self.assertListEqual(self._shownItems(self.view), [self.codes[0]] + self.codes[2:4])
+
+        # The list gets shorter than the view
+        self.checkout.clearBasket(self.codes[0])
+        self.checkout.clearBasket(self.codes[2])
+        self.assertListEqual(self._shownItems(self.view), self.codes[3:5])
+        self.checkout.clearBasket()
+        self.assertListEqual(self.view.getRows(), [])
+        self.assertListEqual(self._shownItems(self.view), [])
+
+    def test_recentFirst(self):
+        self._dropView(self.view)
+        self.view = self._newView("recentFirst")
+        for itemCode in self.codes[:5]:
+            self.checkout.scan(itemCode)
+        self.assertListEqual(self.view.getRows(), self.codes[4::-1])
+        self.assertListEqual(self._shownItems(self.view), self.codes[4:1:-1])
+
+        # A category scanned again moves to the top and is shown
+        self.view.scrollTo(2)
+        self.checkout.scan(self.codes[0])
+        self.assertEqual(self.view.getRows()[0], self.codes[0])
+        self.assertEqual(self._shownItems(self.view)[0], self.codes[0])
+
+    def test_fullSignal(self):
+        self.checkout.scanMany(self.codes[:4])
+        other = Checkout(None, self.catalogue)
+        other.scanMany(self.codes[2:6])
+        other.copyTo(self.checkout)
+        self.assertListEqual(sorted(self.view.getRows()), self.codes[2:6])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+import unittest
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+sys.path.insert(0, "../src")
+from catalogue import Catalogue
+from checkout import Checkout
+from item import Item
+
+class Test_Catalogue(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.records = [
+            {"code": "SKU-0001", "name": "Gala apple", "image": "gala.png",
+             "price": 25, "multibuyMinimumPopulation": 3, "offerOnPopulation": 2, "offerOnPrice": 0},
+            {"code": "SKU-0002", "name": "Plantain", "image": "",
+             "price": 40, "multibuyMinimumPopulation": 3, "offerOnPopulation": 0, "offerOnPrice": 100},
+        ]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def _path(self, name):
+        return os.path.join(self.directory.name, name)
+
+    def _checkCatalogue(self, catalogue_):
+        self.assertEqual(len(catalogue_), 2)
+        self.assertIn("SKU-0002", catalogue_)
+        self.assertEqual(catalogue_.getItem("SKU-0001").getName(), "Gala apple")
+        self.assertEqual(catalogue_.getItem("SKU-0001").getImagePath(), self._path("gala.png"))
+        self.assertDictEqual(catalogue_.getItemsAndPrices(),
+                             {"SKU-0001": [25, 3, 2, 0], "SKU-0002": [40, 3, 0, 100]})
+
+    def test_init(self):
+        with self.assertRaises(ValueError):
+            Catalogue([])
+        with self.assertRaises(ValueError):
+            Catalogue([{"code": "SKU-0003"}])
+        with self.assertRaises(ValueError):
+            Catalogue(self.records + self.records[:1])
+        with self.assertRaises(TypeError):
+            Catalogue([dict(self.records[0], price="cheap")])
+        with self.assertRaises(TypeError):
+            Catalogue([dict(self.records[0], price=2.5)])
+        with self.assertRaises(ValueError):
+            Catalogue([dict(self.records[0], price=0)])
+        with self.assertRaises(ValueError):
+            Catalogue([dict(self.records[0], offerOnPrice=10)])
+        with self.assertRaises(ValueError):
+            Catalogue([dict(self.records[0], code="")])
+        # A bad record leaves the Item class untouched
+        with self.assertRaises(ValueError):
+            Catalogue([dict(self.records[0], code="SKU-0004"), dict(self.records[1], price=-1)])
+        self.assertNotIn("SKU-0004", Item.dictItemNamePerCode)
+
+    def test_getItem(self):
+        catalogue_ = Catalogue(self.records)
+        with self.assertRaises(TypeError):
+            catalogue_.getItem(1)
+        with self.assertRaises(ValueError):
+            catalogue_.getItem("Z")
+
+    def test_load(self):
+        with self.assertRaises(ValueError):
+            Catalogue.load(self._path("items.txt"))
+
+        with open(self._path("items.json"), "w") as file:
+            json.dump(self.records, file)
+        self._checkCatalogue(Catalogue.load(self._path("items.json")))
+
+        with open(self._path("items.csv"), "w") as file:
+            file.write(",".join(Catalogue.fields) + "\n")
+            for record in self.records:
+                file.write(",".join(str(record[field]) for field in Catalogue.fields) + "\n")
+        self._checkCatalogue(Catalogue.load(self._path("items.csv")))
+
+        connection = sqlite3.connect(self._path("items.db"))
+        connection.execute("CREATE TABLE items (code TEXT, name TEXT, image TEXT, price INTEGER, "
+                           "multibuyMinimumPopulation INTEGER, offerOnPopulation INTEGER, offerOnPrice INTEGER)")
+        connection.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               [tuple(record[field] for field in Catalogue.fields) for record in self.records])
+        connection.commit()
+        connection.close()
+        self._checkCatalogue(Catalogue.load(self._path("items.db")))
+
+    def test_checkout(self):
+        catalogue_ = Catalogue(self.records)
+        checkout_ = Checkout(None, catalogue_)
+        checkout_.scanMany(["SKU-0001"] * 4 + ["SKU-0002"] * 3)
+        self.assertTupleEqual(checkout_.total(), (75 + 100, 25 + 20))
+        self.assertIs(checkout_.getItemsCatalogue()["SKU-0001"], catalogue_.getItem("SKU-0001"))
+        # Loaded codes are not registered with the Item class, so
+        # dictionary catalogues do not depend on the loaded catalogues
+        with self.assertRaises(ValueError):
+            Checkout(None, {"SKU-0002": [50, 1, 0, 0]})
+
+    def test_independentCatalogues(self):
+        catalogue1 = Catalogue(self.records)
+        catalogue2 = Catalogue([dict(self.records[0], name="Braeburn apple", image="braeburn.png")],
+                               self.directory.name)
+        self.assertEqual(catalogue1.getItem("SKU-0001").getName(), "Gala apple")
+        self.assertEqual(catalogue1.getItem("SKU-0001").getImagePath(), "gala.png")
+        self.assertEqual(catalogue2.getItem("SKU-0001").getName(), "Braeburn apple")
+        self.assertEqual(catalogue2.getItem("SKU-0001").getImagePath(), self._path("braeburn.png"))
+        self.assertEqual(catalogue1.getItem("SKU-0002").getImagePath(), "")
+        self.assertNotIn("SKU-0001", Item.dictItemNamePerCode)
+        self.assertNotIn("SKU-0001", Item.dictItemImagePath)
+
+    def test_fromItemsAndPrices(self):
+        with self.assertRaises(TypeError):
+            Catalogue.fromItemsAndPrices([["A", 25, 3, 2, 0]])
+        with self.assertRaises(ValueError):
+            Catalogue.fromItemsAndPrices({"not registered": [25, 1, 0, 0]})
+        catalogue_ = Catalogue.fromItemsAndPrices(Checkout.defaultItemsAndPrices)
+        self.assertDictEqual(catalogue_.getItemsAndPrices(), Checkout.defaultItemsAndPrices)
+        self.assertEqual(catalogue_.getItem("A").getName(), "Apple")
+
+    def test_applyUpdates(self):
+        catalogue_ = Catalogue(self.records)
+        checkout_ = Checkout(None, catalogue_)
+        checkout_.scanMany(["SKU-0001"] * 3 + ["SKU-0002"] * 4)
+        self.assertTupleEqual(checkout_.total(), (50 + 140, 25 + 20))
+        self.assertEqual(catalogue_.getVersion(), 0)
+
+        # Invalid batches are rejected as a whole
+        with self.assertRaises(TypeError):
+            catalogue_.applyUpdates([("SKU-0001", 30)])
+        with self.assertRaises(ValueError):
+            catalogue_.applyUpdates({"SKU-0001": {"price": 30}, "SKU-9999": {"price": 30}})
+        with self.assertRaises(ValueError):
+            catalogue_.applyUpdates({"SKU-0001": {"price": 30}, "SKU-0002": {"name": "Banana"}})
+        with self.assertRaises(ValueError):
+            catalogue_.applyUpdates({"SKU-0001": {"price": 30}, "SKU-0002": {"price": 0}})
+        with self.assertRaises(TypeError):
+            catalogue_.applyUpdates({"SKU-0001": {"price": 30.5}})
+        with self.assertRaises(ValueError):
+            catalogue_.applyUpdates({"SKU-0001": {"offerOnPopulation": 2, "offerOnPrice": 40}})
+        self.assertEqual(catalogue_.getItem("SKU-0001").getPrice(), 25)
+        self.assertEqual(catalogue_.getVersion(), 0)
+
+        # Unchanged values are not updates
+        self.assertEqual(catalogue_.applyUpdates({"SKU-0001": {"price": 25}}), frozenset())
+        self.assertEqual(catalogue_.getVersion(), 0)
+
+        self.assertEqual(catalogue_.applyUpdates({"SKU-0001": {"price": 30}, "SKU-0002": {"offerOnPrice": 90}}),
+                         frozenset(["SKU-0001", "SKU-0002"]))
+        self.assertEqual(catalogue_.getVersion(), 1)
+        self.assertTupleEqual(checkout_.total(), (60 + 130, 30 + 30))
+        checkout_.checkTotals()
+
+        # Switching the kind of offer resets the other kind
+        catalogue_.applyUpdates({"SKU-0002": {"offerOnPopulation": 2}})
+        self.assertListEqual(catalogue_.getItemsAndPrices()["SKU-0002"], [40, 3, 2, 0])
+        self.assertTupleEqual(checkout_.total("SKU-0002"), (120, 40))
+        self.assertEqual(catalogue_.getVersion(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
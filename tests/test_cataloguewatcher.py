@@ -0,0 +1,76 @@
+import unittest
+import json
+import os
+import sys
+import tempfile
+sys.path.insert(0, "../src")
+from catalogue import Catalogue
+from cataloguewatcher import CatalogueWatcher
+from checkout import Checkout
+
+class FakeRoot():
+    def __init__(self):
+        self.callbacks = []
+
+    def after(self, delay, callback):
+        self.callbacks.append(callback)
+        return len(self.callbacks)
+
+    def after_cancel(self, afterId):
+        self.callbacks[afterId - 1] = None
+
+class Test_CatalogueWatcher(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "updates.json")
+        self.catalogue = Catalogue.fromItemsAndPrices(Checkout.defaultItemsAndPrices)
+        self.root = FakeRoot()
+        self.errors = []
+        self.watcher = CatalogueWatcher(self.catalogue, self.path, self.root, 500, self.errors.append)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, text, mtime):
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write(text)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            CatalogueWatcher(None, self.path, self.root)
+        with self.assertRaises(TypeError):
+            CatalogueWatcher(self.catalogue, 5, self.root)
+        with self.assertRaises(ValueError):
+            CatalogueWatcher(self.catalogue, self.path, self.root, 0)
+
+    def test_poll(self):
+        checkout_ = Checkout(None, self.catalogue)
+        checkout_.scan("A")
+        # A missing file is not an error
+        self.watcher.start()
+        self.assertEqual(len(self.root.callbacks), 1)
+        self.assertListEqual(self.errors, [])
+
+        self.write(json.dumps({"A": {"price": 30}}), 1000)
+        self.assertEqual(self.watcher.poll(), frozenset(["A"]))
+        self.assertTupleEqual(checkout_.total(), (30, 0))
+        # Unchanged files are not read again
+        self.assertEqual(self.watcher.poll(), frozenset())
+
+        self.write("{\"A\": {\"pri", 2000)
+        self.assertEqual(self.watcher.poll(), frozenset())
+        self.write(json.dumps({"A": {"price": -1}}), 3000)
+        self.assertEqual(self.watcher.poll(), frozenset())
+        self.assertEqual(len(self.errors), 2)
+        self.assertEqual(self.catalogue.getItem("A").getPrice(), 30)
+
+        self.write(json.dumps({"A": {"price": 35}, "P": {"price": 31}}), 4000)
+        self.assertEqual(self.watcher.poll(), frozenset(["A", "P"]))
+        self.assertEqual(self.catalogue.getVersion(), 2)
+        self.watcher.stop()
+        self.assertIsNone(self.root.callbacks[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,17 @@
 import unittest
 import sys
+from array import array
+from collections import Counter
 sys.path.insert(0, "../src")
 from checkout import Checkout
+from catalogue import Catalogue
+
+class RecordingListener():
+    def __init__(self):
+        self.signals = []
+
+    def slot(self, checkout, signalStrength="strong", changedItems=None):
+        self.signals.append((signalStrength, changedItems))
 
 class Test_Checkout(unittest.TestCase):
     def test_init(self):
@@ -52,6 +62,42 @@ class Test_Checkout(unittest.TestCase):
         with self.assertRaises(TypeError):
             chekout_.register(None)
 
+    def test_topics(self):
+        checkout_ = Checkout()
+        basketListener = RecordingListener()
+        appleListener = RecordingListener()
+        fruitListener = RecordingListener()
+        checkout_.register(basketListener)
+        checkout_.register(appleListener, ["A"])
+        checkout_.register(fruitListener, ["A", "B"])
+        with self.assertRaises(TypeError):
+            checkout_.register(appleListener, "A")
+        with self.assertRaises(ValueError):
+            checkout_.register(appleListener, ["Z"])
+
+        checkout_.scan("P")
+        checkout_.scan("A")
+        checkout_.scanMany(["A", "B"])
+        checkout_.signal("weak")
+        self.assertEqual(len(basketListener.signals), 4)
+        self.assertListEqual(appleListener.signals, [("strong", frozenset(["A"])), ("strong", frozenset(["A", "B"])),
+                                                     ("weak", None)])
+        # Listeners of several changed items are signalled once
+        self.assertListEqual(fruitListener.signals, appleListener.signals)
+
+        checkout_.unregister(fruitListener)
+        checkout_.scan("B")
+        self.assertEqual(len(fruitListener.signals), 3)
+        # Subscribing to the whole basket replaces the item topics
+        checkout_.register(appleListener)
+        checkout_.scan("P")
+        self.assertEqual(appleListener.signals[-1], ("strong", frozenset(["P"])))
+        checkout_.scan("A")
+        self.assertEqual(len(appleListener.signals), 5)
+        # Copies start with no listeners
+        Checkout(checkout_).scan("A")
+        self.assertEqual(len(appleListener.signals), 5)
+
     def test_unregister(self):        
         chekout_ = Checkout(None, {"A":[25,3,2,0]})
         with self.assertRaises(TypeError):
@@ -159,6 +205,19 @@ class Test_Checkout(unittest.TestCase):
             checkout_.checkout(["A", "B", "P"],{"A": 100})
         self.assertEqual(155, checkout_.checkout(["B", "A", "B", "P", "B"], {"A": 25, "B": 40, "P": 30}))
 
+        with self.assertRaises(TypeError):
+            checkout_.checkout(("A",),{})
+        with self.assertRaises(TypeError):
+            checkout_.checkout({"A": 1.},{})
+        with self.assertRaises(ValueError):
+            checkout_.checkout({"A": -1},{})
+        with self.assertRaises(ValueError):
+            checkout_.checkout(array("I", [1, 3]),{})
+        self.assertEqual(155, checkout_.checkout(Counter({"A": 1, "B": 3, "P": 1}), {}))
+        self.assertEqual(155, checkout_.checkout({"A": 1, "B": 3, "P": 1, }, {"B": 40}))
+        self.assertEqual(155, checkout_.checkout(array("I", [1, 3, 1]), {}))
+        self.assertEqual(33333*50 + 25, checkout_.checkout({"A": 100000}, {}))
+
 
     def test_total(self):
         checkout_ = Checkout(None, 
@@ -166,9 +225,8 @@ class Test_Checkout(unittest.TestCase):
                      "B": [40, 3, 0, 100],
                      "P": [30, 3, 0, 0]
                     })
-        checkout_._basket["A"]=1
-        checkout_._basket["B"]=3
-        checkout_._basket["P"]=1
+        for itemCode in ["A", "B", "B", "B", "P"]:
+            checkout_.scan(itemCode)
         with self.assertRaises(TypeError):
             checkout_.total(5)
         with self.assertRaises(ValueError):
@@ -176,6 +234,192 @@ class Test_Checkout(unittest.TestCase):
 
         total_, savings_ = checkout_.total()
         self.assertListEqual([total_, savings_], [155, 20])
+        self.assertTupleEqual(checkout_.total("B"), (100, 20))
+
+    def test_scanMany(self):
+        checkout_ = Checkout(None,
+                    {"A": [25, 3, 2, 0],
+                     "B": [40, 3, 0, 100],
+                     "P": [30, 1, 0, 0]
+                    })
+        listener = RecordingListener()
+        checkout_.register(listener)
+        with self.assertRaises(TypeError):
+            checkout_.scanMany("AB")
+        with self.assertRaises(TypeError):
+            checkout_.scanMany(5)
+        with self.assertRaises(TypeError):
+            checkout_.scanMany([1])
+        with self.assertRaises(ValueError):
+            checkout_.scanMany(["A", "Z"])
+        with self.assertRaises(ValueError):
+            checkout_.scanMany({"A": -1})
+        self.assertEqual(checkout_.getNumberOfItems(), 0)
+        self.assertListEqual(listener.signals, [])
+
+        checkout_.scanMany(["A", "B", "A", "A"])
+        checkout_.scanMany(Counter({"B": 2, "P": 0}), "weak")
+        self.assertDictEqual(checkout_.getBasket(), {"A": 3, "B": 3, "P": 0})
+        self.assertListEqual(listener.signals, [("strong", frozenset("AB")), ("weak", frozenset("B"))])
+
+    def test_apply(self):
+        checkout_ = Checkout(None,
+                    {"A": [25, 3, 2, 0],
+                     "B": [40, 3, 0, 100],
+                     "P": [30, 1, 0, 0]
+                    })
+        listener = RecordingListener()
+        checkout_.register(listener)
+        with self.assertRaises(TypeError):
+            checkout_.apply(["A"])
+        with self.assertRaises(TypeError):
+            checkout_.apply({"A": 1.})
+        with self.assertRaises(ValueError):
+            checkout_.apply({"A": 1}, "")
+        # Invalid changes leave the basket untouched
+        with self.assertRaises(ValueError):
+            checkout_.apply({"A": 2, "B": -1})
+        self.assertEqual(checkout_.getNumberOfItems(), 0)
+
+        checkout_.apply({"A": 2, "B": 3})
+        checkout_.apply({"A": -2, "B": 0, "P": 1})
+        self.assertDictEqual(checkout_.getBasket(), {"A": 0, "B": 3, "P": 1})
+        self.assertTupleEqual(checkout_.total(), (130, 20))
+        self.assertListEqual(listener.signals, [("strong", frozenset("AB")), ("strong", frozenset("AP"))])
+
+    def test_compactBasket(self):
+        with self.assertRaises(TypeError):
+            Checkout(None, {"A":[25,3,2,0]}, 1)
+        checkout_ = Checkout(None,
+                    {"A": [25, 3, 2, 0],
+                     "B": [40, 3, 0, 100],
+                     "P": [30, 1, 0, 0]
+                    }, compactBasket=True)
+        checkout_.scanMany(["A", "B", "B", "B", "P"])
+        self.assertDictEqual(dict(checkout_.getBasket()), {"A": 1, "B": 3, "P": 1})
+        self.assertListEqual(checkout_.getBasket().getCounts().tolist(), [1, 3, 1])
+        self.assertTupleEqual(checkout_.total(), (155, 20))
+        self.assertEqual(checkout_.checkout(checkout_.getBasket().getCounts(), {}), 155)
+
+        # Copies share the catalogue and only copy the counts
+        copy_ = Checkout(orig=checkout_)
+        self.assertIs(copy_.getItemsCatalogue(), checkout_.getItemsCatalogue())
+        copy_.clearBasket("B")
+        self.assertEqual(checkout_.getNumberOfItems("B"), 3)
+        copy_.copyTo(checkout_)
+        self.assertEqual(checkout_.getNumberOfItems(), 2)
+        with self.assertRaises(ValueError):
+            checkout_.apply({"A": -2})
+        checkout_.clearBasket()
+        self.assertListEqual(checkout_.getBasket().getCounts().tolist(), [0, 0, 0])
+
+    def test_reprice(self):
+        catalogue_ = Catalogue.fromItemsAndPrices(Checkout.defaultItemsAndPrices)
+        checkout_ = Checkout(None, catalogue_)
+        copy_ = Checkout(checkout_)
+        listener = RecordingListener()
+        checkout_.register(listener)
+        checkout_.scanMany(["A", "A", "A", "B"])
+        copy_.scan("A")
+        with self.assertRaises(TypeError):
+            checkout_.reprice("A")
+        with self.assertRaises(TypeError):
+            checkout_.reprice([1])
+        with self.assertRaises(ValueError):
+            checkout_.reprice(["Z"])
+
+        # One targeted signal per update, for the repriced categories only
+        listener.signals.clear()
+        catalogue_.applyUpdates({"A": {"price": 30}, "P": {"price": 35}})
+        self.assertListEqual(listener.signals, [("strong", frozenset(["A", "P"]))])
+        self.assertTupleEqual(checkout_.total(), (60 + 40, 30))
+        self.assertTupleEqual(copy_.total(), (30, 0))
+        checkout_.checkTotals()
+        copy_.checkTotals()
+
+        # Checkouts built from dictionaries own their items
+        other = Checkout()
+        other.scan("A")
+        self.assertTupleEqual(other.total(), (25, 0))
+
+    def test_trusted(self):
+        Checkout.consistencyCheck = True
+        try:
+            checkout_ = Checkout()
+            reference = Checkout()
+            listener = RecordingListener()
+            checkout_.register(listener)
+            trusted = checkout_.trusted()
+            trusted.scan("A")
+            trusted.scanMany(["A", "A", "B", "B", "B"], "weak")
+            trusted.unscan("B")
+            trusted.apply({"P": 2, "A": 0})
+            reference.scanMany(["A", "A", "A", "B", "B", "P", "P"])
+            self.assertDictEqual(dict(checkout_.getBasket()), dict(reference.getBasket()))
+            self.assertTupleEqual(trusted.total(), reference.total())
+            self.assertTupleEqual(trusted.total("B"), reference.total("B"))
+            self.assertEqual(trusted.getNumberOfItems(), 7)
+            self.assertEqual(trusted.getNumberOfItems("A"), 3)
+            self.assertEqual(trusted.checkout(["A", "A", "A", "B"]), checkout_.checkout(["A", "A", "A", "B"], {}))
+            self.assertEqual(trusted.checkout(checkout_.getBasket()), checkout_.total()[0])
+            self.assertListEqual(listener.signals, [("strong", frozenset(["A"])), ("weak", frozenset(["A", "B"])),
+                                                    ("strong", frozenset(["B"])), ("strong", frozenset(["P"]))])
+
+            # Arrays of counts are in the order of the catalogue
+            self.assertEqual(trusted.checkout(array("l", [3, 1, 0])), checkout_.checkout(array("l", [3, 1, 0]), {}))
+
+            # Unscanning the last item of a category or an empty one
+            # raises ValueError, as with the checkout itself
+            trusted.unscan("B")
+            with self.assertRaises(ValueError):
+                trusted.unscan("B")
+            self.assertEqual(checkout_.getNumberOfItems("B"), 0)
+            self.assertEqual(listener.signals[-1], ("strong", frozenset(["B"])))
+            with self.assertRaises(ValueError):
+                trusted.unscan("B")
+            self.assertEqual(len(listener.signals), 6)
+            trusted.scan("B")
+
+            trusted.clearBasket("A")
+            self.assertEqual(checkout_.getNumberOfItems("A"), 0)
+            trusted.clearBasket()
+            self.assertTupleEqual(checkout_.total(), (0, 0))
+            self.assertEqual(listener.signals[-1], ("strong", frozenset(["B", "P"])))
+        finally:
+            Checkout.consistencyCheck = False
+
+    def test_runningTotals(self):
+        Checkout.consistencyCheck = True
+        try:
+            checkout_ = Checkout(None,
+                        {"A": [25, 3, 2, 0],
+                         "B": [40, 3, 0, 100],
+                         "P": [30, 1, 0, 0]
+                        })
+            for itemCode in ["A", "B", "A", "P", "B", "A", "B", "B"]:
+                checkout_.scan(itemCode)
+            self.assertEqual(checkout_.getNumberOfItems(), 8)
+            self.assertTupleEqual(checkout_.total(), (50+140+30, 25+20))
+            checkout_.unscan("B")
+            checkout_.clearBasket("A")
+            self.assertEqual(checkout_.getNumberOfItems(), 4)
+            self.assertTupleEqual(checkout_.total(), (100+30, 20))
+
+            copy_ = Checkout(orig=checkout_)
+            copy_.scan("P")
+            self.assertTupleEqual(copy_.total(), (100+60, 20))
+            copy_.copyTo(checkout_)
+            self.assertTupleEqual(checkout_.total("P"), (60, 0))
+
+            checkout_.clearBasket()
+            self.assertEqual(checkout_.getNumberOfItems(), 0)
+            self.assertTupleEqual(checkout_.total(), (0, 0))
+
+            checkout_._basket["A"] = 4
+            with self.assertRaises(RuntimeError):
+                checkout_.checkTotals()
+        finally:
+            Checkout.consistencyCheck = False
           
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import sys
+sys.path.insert(0, "../src")
+from checkout import Checkout
+from checkoutoverlay import CheckoutOverlay
+from catalogue import Catalogue
+
+class RecordingListener():
+    def __init__(self):
+        self.signals = []
+
+    def slot(self, checkout, signalStrength="strong", changedItems=None):
+        self.signals.append((signalStrength, changedItems))
+
+class Test_CheckoutOverlay(unittest.TestCase):
+    def setUp(self):
+        Checkout.consistencyCheck = True
+        self.base = Checkout(None,
+                    {"A": [25, 3, 2, 0],
+                     "B": [40, 3, 0, 100],
+                     "P": [30, 1, 0, 0]
+                    })
+        self.base.scanMany(["A", "B", "B", "B"])
+        self.listener = RecordingListener()
+        self.base.register(self.listener)
+
+    def tearDown(self):
+        Checkout.consistencyCheck = False
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            CheckoutOverlay(None)
+
+    def test_changes(self):
+        overlay = CheckoutOverlay(self.base)
+        self.assertTupleEqual(overlay.total(), (125, 20))
+        self.assertListEqual(overlay.getItemCategoriesInBasket(), ["A", "B"])
+
+        overlay.scan("P")
+        overlay.unscan("B")
+        overlay.clearBasket("A")
+        self.assertTupleEqual(overlay.total(), (110, 0))
+        self.assertTupleEqual(overlay.total("A"), (0, 0))
+        self.assertEqual(overlay.getNumberOfItems(), 3)
+        self.assertListEqual(overlay.getItemCategoriesInBasket(), ["B", "P"])
+        self.assertDictEqual(overlay.getChanges(), {"A": -1, "B": -1, "P": 1})
+        overlay.checkTotals()
+        # The base is untouched
+        self.assertTupleEqual(self.base.total(), (125, 20))
+        self.assertListEqual(self.listener.signals, [])
+
+    def test_copyTo(self):
+        overlay = CheckoutOverlay(self.base)
+        with self.assertRaises(TypeError):
+            overlay.copyTo(5)
+        overlay.scan("P")
+        overlay.scan("B")
+        overlay.unscan("B")
+        overlay.copyTo(self.base)
+        self.assertDictEqual(self.base.getBasket(), {"A": 1, "B": 3, "P": 1})
+        self.assertListEqual(self.listener.signals, [("strong", frozenset("P"))])
+
+        other = Checkout()
+        overlay.clearBasket()
+        overlay.copyTo(other)
+        self.assertEqual(other.getNumberOfItems(), 0)
+        self.assertEqual(self.base.getNumberOfItems(), 5)
+
+    def test_reprice(self):
+        catalogue_ = Catalogue.fromItemsAndPrices(Checkout.defaultItemsAndPrices)
+        base = Checkout(None, catalogue_)
+        base.scanMany(["A", "B", "B", "B"])
+        overlay = CheckoutOverlay(base)
+        overlay.scan("A")
+        overlay.clearBasket("B")
+        overlay.scan("P")
+        catalogue_.applyUpdates({"A": {"price": 20}, "B": {"price": 50}})
+        self.assertTupleEqual(base.total(), (20 + 100, 50))
+        self.assertTupleEqual(overlay.total(), (40 + 30, 0))
+        self.assertTupleEqual(overlay.total("A"), (40, 0))
+        overlay.copyTo(base)
+        self.assertTupleEqual(base.total(), (40 + 30, 0))
+
+    def test_discard(self):
+        overlay = CheckoutOverlay(self.base)
+        overlay.clearBasket()
+        overlay.discard()
+        self.assertTupleEqual(overlay.total(), (125, 20))
+        overlay.copyTo(self.base)
+        self.assertListEqual(self.listener.signals, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import io
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import date, timedelta
+sys.path.insert(0, "../src")
+from checkout import Checkout
+from headless import HeadlessCheckout
+
+class Test_HeadlessCheckout(unittest.TestCase):
+    def setUp(self):
+        self.output = io.StringIO()
+        self.errors = io.StringIO()
+        self.engine = HeadlessCheckout(Checkout(), self.output, self.errors)
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            HeadlessCheckout(None)
+
+    def test_processEvent(self):
+        with self.assertRaises(TypeError):
+            self.engine.processEvent(5)
+        with self.assertRaises(ValueError):
+            self.engine.processEvent("Z")
+        with self.assertRaises(ValueError):
+            self.engine.processEvent("scan A 0")
+        with self.assertRaises(ValueError):
+            self.engine.processEvent("scan A many")
+        with self.assertRaises(ValueError):
+            self.engine.processEvent("unscan A")
+        with self.assertRaises(ValueError):
+            self.engine.processEvent("checkout now")
+
+    def test_run(self):
+        events = ["# first customer", "A", "B", "scan B 2", "", "P", "checkout",
+                  "Z", "scan A 4", "unscan A", "clear B", "checkout", "A"]
+        self.assertEqual(self.engine.run(line + "\n" for line in events), 1)
+        self.assertEqual(self.output.getvalue(),
+                         "Transaction 1: 5 items, total 155p, savings 20p\n"
+                         "Transaction 2: 3 items, total 50p, savings 25p\n")
+        self.assertIn("line 8", self.errors.getvalue())
+        self.assertIn("1 items were scanned after the last checkout", self.errors.getvalue())
+
+    def test_ledger(self):
+        from ledger import SalesLedger
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "sales.db")
+            ledger = SalesLedger(path)
+            engine = HeadlessCheckout(Checkout(), self.output, self.errors, ledger=ledger)
+            engine.run(["A\n", "A\n", "checkout\n"])
+            # The sale is in the database without closing the ledger,
+            # as after a crash
+            reader = SalesLedger(path)
+            self.assertDictEqual(reader.revenueBySku(date.today() - timedelta(1), date.today() + timedelta(1)), {"A": (2, 50, 0)})
+            reader.close()
+            ledger.close()
+
+    def test_noTkinter(self):
+        # The headless mode must not import tkinter
+        source = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+        script = ("import sys, PointOfSale; status = PointOfSale.Main(['--headless']); "
+                  "sys.exit(3 if 'tkinter' in sys.modules else status)")
+        result = subprocess.run([sys.executable, "-c", script], cwd=source, input="A\ncheckout\n",
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout, "Transaction 1: 1 items, total 25p, savings 0p\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
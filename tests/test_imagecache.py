@@ -0,0 +1,90 @@
+import unittest
+import os
+import sys
+import tempfile
+sys.path.insert(0, "../src")
+from imagecache import ImageCache
+
+class FakeImage():
+    def __init__(self, path, width=100, height=100):
+        self.path = path
+        self._width = width
+        self._height = height
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+    def subsample(self, x, y):
+        return FakeImage(self.path, self._width // x, self._height // y)
+
+    def write(self, path, format=None):
+        with open(path, "w") as file:
+            file.write("{} {}".format(self._width, self._height))
+
+class Test_ImageCache(unittest.TestCase):
+    def setUp(self):
+        self.loadedPaths = []
+
+    def _loader(self, path):
+        self.loadedPaths.append(path)
+        return FakeImage(path)
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            ImageCache(1.)
+        with self.assertRaises(ValueError):
+            ImageCache(0)
+        with self.assertRaises(TypeError):
+            ImageCache(thumbnailDirectory=5)
+        with self.assertRaises(TypeError):
+            ImageCache(loader=5)
+
+    def test_getImage(self):
+        cache = ImageCache(loader=self._loader)
+        with self.assertRaises(TypeError):
+            cache.getImage(5)
+        with self.assertRaises(TypeError):
+            cache.getImage("a.png", 1.)
+        with self.assertRaises(ValueError):
+            cache.getImage("a.png", 0)
+
+        image = cache.getImage("a.png", 10)
+        self.assertEqual(image.width(), 10)
+        self.assertIs(cache.getImage("a.png", 10), image)
+        self.assertIsNot(cache.getImage("a.png"), image)
+        self.assertListEqual(self.loadedPaths, ["a.png", "a.png"])
+        self.assertEqual(cache.getUsedBytes(), (10*10 + 100*100) * 4)
+        cache.clear()
+        self.assertEqual(cache.getUsedBytes(), 0)
+
+    def test_eviction(self):
+        # room for two full size images
+        cache = ImageCache(2*100*100*4, loader=self._loader)
+        cache.getImage("a.png")
+        cache.getImage("b.png")
+        cache.getImage("a.png")
+        cache.getImage("c.png")
+        self.assertEqual(cache.getUsedBytes(), 2*100*100*4)
+        # b was the least recently used image
+        cache.getImage("a.png")
+        cache.getImage("b.png")
+        self.assertListEqual(self.loadedPaths, ["a.png", "b.png", "c.png", "b.png"])
+
+    def test_thumbnailDirectory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            original = os.path.join(directory, "a.png")
+            with open(original, "w") as file:
+                file.write("image")
+            thumbnails = os.path.join(directory, "thumbnails")
+            ImageCache(thumbnailDirectory=thumbnails, loader=self._loader).getImage(original, 5)
+            self.assertEqual(len(os.listdir(thumbnails)), 1)
+            ImageCache(thumbnailDirectory=thumbnails, loader=self._loader).getImage(original, 5)
+            self.assertEqual(self.loadedPaths[0], original)
+            self.assertEqual(os.path.dirname(self.loadedPaths[1]), thumbnails)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import unittest
+import io
+import json
+import sys
+sys.path.insert(0, "../src")
+from checkout import Checkout
+from instrumentation import Instrumentation, LatencyHistogram
+
+class FakeClock():
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        self.now += 1000
+        return self.now
+
+class FakeWidget():
+    def __init__(self):
+        self.callbacks = []
+
+    def after_idle(self, callback):
+        self.callbacks.append(callback)
+        return str(len(self.callbacks))
+
+    def after_cancel(self, afterId):
+        pass
+
+class RecordingListener():
+    def __init__(self):
+        self.signals = []
+
+    def slot(self, checkout, signalStrength="strong", changedItems=None):
+        self.signals.append((signalStrength, changedItems))
+
+class Test_LatencyHistogram(unittest.TestCase):
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            LatencyHistogram(1.)
+        with self.assertRaises(ValueError):
+            LatencyHistogram(0)
+
+    def test_precision(self):
+        histogram = LatencyHistogram()
+        for value in [0, 1, 63, 64, 127, 1000, 123456789]:
+            low, high = histogram._bucketBounds(histogram._bucketIndex(value))
+            self.assertLessEqual(low, value)
+            self.assertGreaterEqual(high, value)
+            self.assertLessEqual(high - low, value / 32)
+        # Buckets are contiguous
+        for index in range(1, 1000):
+            self.assertEqual(histogram._bucketBounds(index)[0], histogram._bucketBounds(index - 1)[1] + 1)
+
+    def test_percentiles(self):
+        histogram = LatencyHistogram()
+        self.assertEqual(histogram.percentile(50), 0)
+        for value in range(1, 1001):
+            histogram.record(value * 1000)
+        self.assertEqual(histogram.count, 1000)
+        self.assertEqual(histogram.mean(), 500500)
+        self.assertEqual(histogram.min, 1000)
+        self.assertEqual(histogram.percentile(100), 1000000)
+        self.assertAlmostEqual(histogram.percentile(50), 500000, delta=500000 / 32)
+        self.assertAlmostEqual(histogram.percentile(99), 990000, delta=990000 / 32)
+        with self.assertRaises(ValueError):
+            histogram.percentile(101)
+        histogram.reset()
+        self.assertDictEqual(histogram.toDict(), {"count": 0, "mean": 0, "min": 0, "p50": 0, "p90": 0,
+                                                  "p99": 0, "p999": 0, "max": 0})
+
+class Test_Instrumentation(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.instrumentation = Instrumentation(clock=self.clock)
+
+    def tearDown(self):
+        self.instrumentation.disable()
+
+    def test_enableDisable(self):
+        original = Checkout.scan
+        self.instrumentation.enable(widgets=False)
+        self.assertTrue(self.instrumentation.isEnabled())
+        self.assertIsNot(Checkout.scan, original)
+        self.assertEqual(Checkout.scan.__name__, "scan")
+        self.instrumentation.disable()
+        self.assertFalse(self.instrumentation.isEnabled())
+        self.assertIs(Checkout.scan, original)
+
+    def test_recording(self):
+        checkout = Checkout()
+        listener = RecordingListener()
+        checkout.register(listener)
+        self.instrumentation.enable(widgets=False)
+        checkout.scan("A")
+        checkout.scanMany(["A", "B"])
+        self.instrumentation.disable()
+        checkout.scan("P")
+
+        statistics = self.instrumentation.toDict()
+        self.assertEqual(statistics["histograms"]["Checkout.scan"]["count"], 1)
+        self.assertEqual(statistics["histograms"]["Checkout.scanMany"]["count"], 1)
+        self.assertEqual(statistics["histograms"]["Checkout.signal"]["count"], 2)
+        self.assertEqual(statistics["histograms"]["Checkout._setItemCount"]["count"], 3)
+        self.assertDictEqual(statistics["counters"], {"signalledListeners": 2, "signals": 2})
+        self.assertEqual(len(listener.signals), 3)
+
+        self.instrumentation.reset()
+        self.assertDictEqual(self.instrumentation.toDict()["histograms"], {})
+
+    def test_scanToPaint(self):
+        from updatescheduler import UpdateScheduler
+        widget = FakeWidget()
+        scheduler = UpdateScheduler(widget, 0)
+        checkout = Checkout()
+        checkout.register(scheduler.deferred(RecordingListener()))
+        self.instrumentation.enable(widget)
+        checkout.scan("A")
+        checkout.scan("B")
+        scheduler.flush()
+        self.assertEqual(len(widget.callbacks), 2)
+        widget.callbacks[-1]()
+        histograms = self.instrumentation.toDict()["histograms"]
+        self.assertEqual(histograms["scanToPaint"]["count"], 1)
+        self.assertEqual(histograms["tkRepaint"]["count"], 1)
+        self.assertGreater(histograms["scanToPaint"]["max"], histograms["tkRepaint"]["max"])
+
+    def test_unpaintedChanges(self):
+        from checkoutoverlay import CheckoutOverlay
+        from updatescheduler import UpdateScheduler
+        widget = FakeWidget()
+        scheduler = UpdateScheduler(widget, 0)
+        checkout = Checkout()
+        checkout.register(scheduler.deferred(RecordingListener()))
+        overlay = CheckoutOverlay(checkout)
+        overlay.register(RecordingListener())
+        self.instrumentation.enable(widget)
+        # Changes of the staff page overlay are not painted by a flush
+        overlay.scan("A")
+        overlay.scan("B")
+        self.clock.now += 60 * 10 ** 9
+        checkout.scan("P")
+        scheduler.flush()
+        widget.callbacks[-1]()
+        histograms = self.instrumentation.toDict()["histograms"]
+        self.assertEqual(histograms["scanToPaint"]["count"], 1)
+        self.assertLess(histograms["scanToPaint"]["max"], 10 ** 6)
+
+        # Nor are the changes of a checkout without scheduled listeners
+        Checkout().scan("A")
+        self.clock.now += 60 * 10 ** 9
+        checkout.scan("A")
+        scheduler.flush()
+        widget.callbacks[-1]()
+        histograms = self.instrumentation.toDict()["histograms"]
+        self.assertEqual(histograms["scanToPaint"]["count"], 2)
+        self.assertLess(histograms["scanToPaint"]["max"], 10 ** 6)
+
+    def test_trustedScanToPaint(self):
+        from updatescheduler import UpdateScheduler
+        widget = FakeWidget()
+        scheduler = UpdateScheduler(widget, 0)
+        checkout = Checkout()
+        checkout.register(scheduler.deferred(RecordingListener()))
+        self.instrumentation.enable(widget)
+        # The path of the scans of a barcode scanner
+        checkout.trusted().scanMany(["A", "A", "B"])
+        scheduler.flush()
+        widget.callbacks[-1]()
+        histograms = self.instrumentation.toDict()["histograms"]
+        self.assertEqual(histograms["_TrustedCheckout.scanMany"]["count"], 1)
+        self.assertEqual(histograms["Checkout._setItemCount"]["count"], 2)
+        self.assertEqual(histograms["scanToPaint"]["count"], 1)
+        self.assertGreater(histograms["scanToPaint"]["max"], histograms["tkRepaint"]["max"])
+
+    def test_dump(self):
+        self.instrumentation.enable(widgets=False)
+        Checkout().scan("A")
+        stream = io.StringIO()
+        self.instrumentation.dump(stream)
+        self.assertIn("Checkout.scan", stream.getvalue())
+        stream = io.StringIO()
+        self.instrumentation.dump(stream, "json")
+        self.assertEqual(json.loads(stream.getvalue())["histograms"]["Checkout.scan"]["count"], 1)
+        with self.assertRaises(ValueError):
+            self.instrumentation.dump(stream, "xml")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,6 +29,14 @@ class Test_Item(unittest.TestCase):
         with self.assertRaises(ValueError):
           Item("A", 30, 3, 2, 2)
 
+    def test_trusted(self):
+        item = Item.trusted("B", 40, 3, 0, 100)
+        reference = Item("B", 40, 3, 0, 100)
+        self.assertIsInstance(item, Item)
+        self.assertEqual(item.getName(), "Banana")
+        for groupSize in range(10):
+            self.assertTupleEqual(item.getMultibuyCost(groupSize), reference.getMultibuyCost(groupSize))
+
     def test_getMultibuyCost(self):
         item = Item("A", 30, 3, 2, 0)
         with self.assertRaises(TypeError):
@@ -36,6 +44,40 @@ class Test_Item(unittest.TestCase):
         with self.assertRaises(ValueError):
           item.getMultibuyCost(-1)
 
+    def test_costTable(self):
+        item = Item("B", 40, 3, 0, 100)
+        # Table lookups, table growth and the formula beyond the table
+        self.assertIsNone(item._costTable)
+        for groupSize in range(200):
+            self.assertTupleEqual(item.getMultibuyCost(groupSize), item._calculateMultibuyCost(groupSize))
+        self.assertEqual(len(item._costTable), 4 * Item.costTableSize)
+        for groupSize in [Item.maxCostTableSize - 1, Item.maxCostTableSize, 10**6]:
+            self.assertTupleEqual(item.getMultibuyCost(groupSize), item._calculateMultibuyCost(groupSize))
+        self.assertEqual(len(item._costTable), Item.maxCostTableSize)
+        self.assertTupleEqual(item.getMultibuyCost(7), (240, 40))
+
+    def test_setters(self):
+        item = Item("A", 30, 3, 2, 0)
+        self.assertTupleEqual(item.getMultibuyCost(3), (60, 30))
+        with self.assertRaises(TypeError):
+          item.setPrice(1.5)
+        with self.assertRaises(ValueError):
+          item.setPrice(0)
+        with self.assertRaises(TypeError):
+          item.setOffer(3, "2", 0)
+        with self.assertRaises(ValueError):
+          item.setOffer(3, 2, 2)
+        self.assertTupleEqual(item.getMultibuyCost(3), (60, 30))
+
+        # Changes invalidate the cost table
+        item.setPrice(20)
+        self.assertEqual(item.getPrice(), 20)
+        self.assertTupleEqual(item.getMultibuyCost(3), (40, 20))
+        item.setOffer(2, 0, 30)
+        self.assertEqual(item.getMultibuyMinimumPopulation(), 2)
+        self.assertEqual(item.getOfferOnPrice(), 30)
+        self.assertTupleEqual(item.getMultibuyCost(3), (50, 10))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import os
+import sys
+import tempfile
+sys.path.insert(0, "../src")
+from checkout import Checkout
+from journal import TransactionJournal
+
+class Test_TransactionJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "lane.journal")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            TransactionJournal(5)
+        with self.assertRaises(TypeError):
+            TransactionJournal(self.path, 1.)
+        with self.assertRaises(ValueError):
+            TransactionJournal(self.path, 0)
+        with self.assertRaises(ValueError):
+            TransactionJournal(self.path, 1, -1)
+
+    def test_recover(self):
+        self.assertDictEqual(TransactionJournal.recover(self.path), {})
+        journal = TransactionJournal(self.path, groupSize=1000, commitInterval=1000)
+        lane1 = Checkout()
+        lane2 = Checkout()
+        journal.attach(lane1, "lane 1")
+        journal.attach(lane2, "lane 2")
+        lane1.scanMany(["A", "A", "B"])
+        lane2.scan("P")
+        journal.recordCheckout(lane2)
+        lane2.clearBasket()
+        lane2.scan("B")
+        lane1.unscan("A")
+        # Buffered records are lost in a crash, committed ones are not
+        self.assertDictEqual(TransactionJournal.recover(self.path), {"lane 1": {"A": 2, "B": 1}})
+        journal.commit()
+        self.assertDictEqual(TransactionJournal.recover(self.path), {"lane 1": {"A": 1, "B": 1}, "lane 2": {"B": 1}})
+        journal.close()
+
+        # Reopening the journal restores the baskets into new checkouts
+        journal = TransactionJournal(self.path)
+        restored = Checkout()
+        journal.attach(restored, "lane 1")
+        self.assertDictEqual(restored.getBasket(), {"A": 1, "B": 1, "P": 0})
+        restored.clearBasket("B")
+        journal.close()
+        self.assertDictEqual(TransactionJournal.recover(self.path), {"lane 1": {"A": 1}, "lane 2": {"B": 1}})
+
+    def test_tornRecord(self):
+        journal = TransactionJournal(self.path, groupSize=1)
+        checkout_ = Checkout()
+        journal.attach(checkout_, "lane")
+        checkout_.scan("A")
+        checkout_.scan("B")
+        journal.close()
+        with open(self.path, "r+b") as file:
+            file.truncate(os.path.getsize(self.path) - 3)
+        self.assertDictEqual(TransactionJournal.recover(self.path), {"lane": {"A": 1}})
+
+        # The torn record is cut off before new records are appended
+        journal = TransactionJournal(self.path, groupSize=1)
+        checkout_ = Checkout()
+        journal.attach(checkout_, "lane")
+        checkout_.scan("P")
+        journal.close()
+        self.assertDictEqual(TransactionJournal.recover(self.path), {"lane": {"A": 1, "P": 1}})
+
+    def test_snapshot(self):
+        journal = TransactionJournal(self.path, groupSize=1)
+        checkout_ = Checkout()
+        journal.attach(checkout_, "lane")
+        for index in range(100):
+            checkout_.scan("A")
+        checkout_.scan("B")
+        sizeBefore = os.path.getsize(self.path)
+        journal.snapshot()
+        self.assertLess(os.path.getsize(self.path), sizeBefore)
+        checkout_.scan("P")
+        journal.close()
+        self.assertDictEqual(TransactionJournal.recover(self.path), {"lane": {"A": 100, "B": 1, "P": 1}})
+
+    def test_automaticSnapshot(self):
+        journal = TransactionJournal(self.path, groupSize=1, snapshotSize=1000)
+        checkout_ = Checkout()
+        journal.attach(checkout_, "lane")
+        sizes = []
+        for index in range(200):
+            checkout_.scan("A")
+            sizes.append(os.path.getsize(self.path))
+        # The journal shrank whenever a snapshot was taken
+        self.assertTrue(any(size < previous for previous, size in zip(sizes, sizes[1:])))
+        self.assertLess(max(sizes), 1000 + 100)
+        journal.close()
+        self.assertDictEqual(TransactionJournal.recover(self.path), {"lane": {"A": 200}})
+
+        with self.assertRaises(TypeError):
+            TransactionJournal(self.path, snapshotSize=1.)
+        with self.assertRaises(ValueError):
+            TransactionJournal(self.path, snapshotSize=0)
+
+    def test_attachUnknownItems(self):
+        journal = TransactionJournal(self.path, groupSize=1)
+        checkout_ = Checkout(None, {"A": [25, 3, 2, 0], "B": [40, 3, 0, 100], "P": [30, 1, 0, 0]})
+        journal.attach(checkout_, "lane")
+        checkout_.scanMany(["A", "P", "P"])
+        journal.close()
+
+        # The pears are no longer sold
+        journal = TransactionJournal(self.path, groupSize=1)
+        checkout_ = Checkout(None, {"A": [25, 3, 2, 0], "B": [40, 3, 0, 100]})
+        self.assertDictEqual(journal.attach(checkout_, "lane"), {"P": 2})
+        self.assertDictEqual(checkout_.getBasket(), {"A": 1, "B": 0})
+        journal.close()
+        self.assertDictEqual(TransactionJournal.recover(self.path), {"lane": {"A": 1}})
+
+
+if __name__ == '__main__':
+    unittest.main()
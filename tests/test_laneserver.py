@@ -0,0 +1,169 @@
+import unittest
+import asyncio
+import json
+import sys
+sys.path.insert(0, "../src")
+from laneserver import SessionManager, LaneServer
+
+class FakeClock():
+    def __init__(self):
+        self.now = 0.
+
+    def __call__(self):
+        return self.now
+
+class Test_SessionManager(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.manager = SessionManager(maxSessions=3, idleTimeout=10, clock=self.clock)
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            SessionManager(maxSessions="3")
+        with self.assertRaises(ValueError):
+            SessionManager(maxSessions=0)
+        with self.assertRaises(ValueError):
+            SessionManager(idleTimeout=0)
+
+    def test_acquire(self):
+        with self.assertRaises(TypeError):
+            self.manager.acquire(7)
+        session1 = self.manager.acquire("1")
+        self.manager.release(session1)
+        session2 = self.manager.acquire("2")
+        self.manager.release(session2)
+        self.assertIs(self.manager.acquire("1"), session1)
+        self.manager.release(session1)
+        # Sessions share the Item instances of the catalogue
+        self.assertIs(session1.checkout.getItemsCatalogue(), session2.checkout.getItemsCatalogue())
+        session1.checkout.scan("A")
+        self.assertEqual(session2.checkout.getNumberOfItems(), 0)
+
+        # The least recently used session makes room for a new lane
+        self.manager.release(self.manager.acquire("3"))
+        self.manager.release(self.manager.acquire("4"))
+        self.assertEqual(len(self.manager), 3)
+        self.assertNotIn("2", self.manager)
+        self.assertIn("1", self.manager)
+
+        # Sessions in use are never evicted
+        busy = [self.manager.acquire(laneId) for laneId in ["1", "3", "4"]]
+        with self.assertRaises(RuntimeError):
+            self.manager.acquire("5")
+        self.assertFalse(self.manager.closeSession("1"))
+        for session in busy:
+            self.manager.release(session)
+        self.assertTrue(self.manager.closeSession("1"))
+        self.assertFalse(self.manager.closeSession("1"))
+
+    def test_evictIdle(self):
+        self.manager.release(self.manager.acquire("1"))
+        self.clock.now = 5
+        self.manager.release(self.manager.acquire("2"))
+        busy = self.manager.acquire("3")
+        self.clock.now = 12
+        self.assertListEqual(self.manager.evictIdle(), ["1"])
+        self.clock.now = 30
+        self.assertListEqual(self.manager.evictIdle(), ["2"])
+        self.assertIn("3", self.manager)
+        self.manager.release(busy)
+        self.assertListEqual(self.manager.evictIdle(100), ["3"])
+
+
+class Test_LaneServer(unittest.TestCase):
+    def setUp(self):
+        self.server = LaneServer(SessionManager())
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            LaneServer(None)
+
+    def test_handleRequest(self):
+        async def requests():
+            responses = []
+            for request in [{"lane": "1", "op": "scan", "item": "A", "count": 3},
+                            {"lane": "2", "op": "scan", "item": "B"},
+                            {"lane": "1", "op": "scan", "item": "P"},
+                            {"lane": "1", "op": "unscan", "item": "A"},
+                            {"lane": "1", "op": "total"},
+                            {"lane": "1", "op": "checkout"},
+                            {"lane": "1", "op": "total"},
+                            {"lane": "2", "op": "clear"},
+                            {"lane": "1", "op": "unscan", "item": "A"},
+                            {"lane": "1", "op": "scan", "item": "Z"},
+                            {"lane": "1", "op": "scan", "item": "A", "count": "2"},
+                            {"lane": "1", "op": "refund"},
+                            {"op": "total"},
+                            {"lane": "2", "op": "close"},
+                            ["lane", "1"]]:
+                responses.append(await self.server.handleRequest(request))
+            return responses
+
+        responses = asyncio.run(requests())
+        self.assertListEqual(responses[:8], [
+            {"ok": True, "items": 3, "total": 50, "savings": 25},
+            {"ok": True, "items": 1, "total": 40, "savings": 0},
+            {"ok": True, "items": 4, "total": 80, "savings": 25},
+            {"ok": True, "items": 3, "total": 80, "savings": 0},
+            {"ok": True, "items": 3, "total": 80, "savings": 0},
+            {"ok": True, "items": 3, "total": 80, "savings": 0},
+            {"ok": True, "items": 0, "total": 0, "savings": 0},
+            {"ok": True, "items": 0, "total": 0, "savings": 0}])
+        self.assertListEqual(responses[8:], [
+            {"ok": False, "error": "ValueError"},
+            {"ok": False, "error": "ValueError"},
+            {"ok": False, "error": "TypeError"},
+            {"ok": False, "error": "ValueError"},
+            {"ok": False, "error": "TypeError"},
+            {"ok": True},
+            {"ok": False, "error": "TypeError"}])
+
+    def test_update(self):
+        async def requests():
+            responses = [await self.server.handleRequest({"lane": "1", "op": "scan", "item": "A", "count": 2})]
+            for request in [{"op": "update", "items": {"A": {"price": 30}}},
+                            {"op": "update", "items": {"A": {"price": 0}}},
+                            {"op": "update"},
+                            {"lane": "1", "op": "total"},
+                            {"lane": "2", "op": "scan", "item": "A"}]:
+                responses.append(await self.server.handleRequest(request))
+            return responses
+
+        self.assertListEqual(asyncio.run(requests()), [
+            {"ok": True, "items": 2, "total": 50, "savings": 0},
+            {"ok": True, "changed": ["A"], "version": 1},
+            {"ok": False, "error": "ValueError"},
+            {"ok": False, "error": "TypeError"},
+            {"ok": True, "items": 2, "total": 60, "savings": 0},
+            {"ok": True, "items": 1, "total": 30, "savings": 0}])
+
+    def test_socket(self):
+        async def session():
+            listening = await self.server.start()
+            port = listening.sockets[0].getsockname()[1]
+            try:
+                # Lanes on separate connections are served concurrently
+                async def lane(laneId, itemCode):
+                    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                    for line in ['{{"lane": "{}", "op": "scan", "item": "{}"}}'.format(laneId, itemCode),
+                                 "not json",
+                                 '{{"lane": "{}", "op": "checkout"}}'.format(laneId)]:
+                        writer.write(line.encode("utf-8") + b"\n")
+                    await writer.drain()
+                    responses = [json.loads(await reader.readline()) for index in range(3)]
+                    writer.close()
+                    await writer.wait_closed()
+                    return responses
+                return await asyncio.gather(lane("1", "A"), lane("2", "B"))
+            finally:
+                await self.server.close()
+
+        responses = asyncio.run(session())
+        self.assertListEqual(responses[0], [{"ok": True, "items": 1, "total": 25, "savings": 0},
+                                            {"ok": False, "error": "ValueError"},
+                                            {"ok": True, "items": 1, "total": 25, "savings": 0}])
+        self.assertDictEqual(responses[1][2], {"ok": True, "items": 1, "total": 40, "savings": 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import os
+import sys
+import tempfile
+from datetime import date, datetime
+sys.path.insert(0, "../src")
+from checkout import Checkout
+from ledger import SalesLedger
+
+class Test_SalesLedger(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "sales.db")
+        self.ledger = SalesLedger(self.path, batchSize=2)
+        self.checkout = Checkout()
+
+    def tearDown(self):
+        self.ledger.close()
+        self.directory.cleanup()
+
+    def record(self, itemCodes, moment):
+        self.checkout.scanMany(itemCodes)
+        self.ledger.recordTransaction(self.checkout, "lane 1", moment.timestamp())
+        self.checkout.clearBasket()
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            SalesLedger(None)
+        with self.assertRaises(TypeError):
+            SalesLedger(":memory:", "10")
+        with self.assertRaises(ValueError):
+            SalesLedger(":memory:", 0)
+
+    def test_recordTransaction(self):
+        with self.assertRaises(TypeError):
+            self.ledger.recordTransaction(self.checkout, 1)
+        with self.assertRaises(TypeError):
+            self.ledger.recordTransaction(self.checkout, "lane 1", "now")
+
+    def test_reports(self):
+        self.record(["A", "A", "A", "B"], datetime(2024, 3, 1, 9, 15))
+        self.record(["B", "B", "B", "P"], datetime(2024, 3, 1, 9, 45))
+        self.record(["A", "P"], datetime(2024, 3, 1, 17, 5))
+        self.record(["A"], datetime(2024, 3, 2, 10, 0))
+
+        with self.assertRaises(TypeError):
+            self.ledger.revenueBySku("2024-03-01", date(2024, 3, 1))
+        with self.assertRaises(ValueError):
+            self.ledger.revenueBySku(date(2024, 3, 2), date(2024, 3, 1))
+
+        self.assertDictEqual(self.ledger.revenueBySku(date(2024, 3, 1), date(2024, 3, 1)),
+                             {"A": (4, 75, 25), "B": (4, 140, 20), "P": (2, 60, 0)})
+        self.assertDictEqual(self.ledger.revenueBySku(date(2024, 3, 1), date(2024, 3, 31)),
+                             {"A": (5, 100, 25), "B": (4, 140, 20), "P": (2, 60, 0)})
+        self.assertDictEqual(self.ledger.revenueBySku(date(2024, 4, 1), date(2024, 4, 30)), {})
+        self.assertListEqual(self.ledger.revenueByDay(date(2024, 2, 1), date(2024, 3, 31)),
+                             [(date(2024, 3, 1), 10, 275, 45), (date(2024, 3, 2), 1, 25, 0)])
+        self.assertListEqual(self.ledger.revenueByHour(datetime(2024, 3, 1, 9, 30), datetime(2024, 3, 1, 23)),
+                             [(datetime(2024, 3, 1, 9), 2, 220, 45), (datetime(2024, 3, 1, 17), 1, 55, 0)])
+        self.assertTupleEqual(self.ledger.itemSales("A", datetime(2024, 3, 1, 9), datetime(2024, 3, 1, 12)),
+                              (3, 50, 25))
+        self.assertTupleEqual(self.ledger.itemSales("Z", datetime(2024, 3, 1), datetime(2024, 3, 2)), (0, 0, 0))
+
+    def test_persistence(self):
+        # Buffered transactions are written on close and the aggregates
+        # keep growing across sessions, one transaction at a time
+        self.record(["A"], datetime(2024, 3, 1, 9))
+        self.ledger.close()
+        self.ledger = SalesLedger(self.path)
+        self.record(["A", "A"], datetime(2024, 3, 1, 10))
+        self.assertDictEqual(self.ledger.revenueBySku(date(2024, 3, 1), date(2024, 3, 1)), {"A": (3, 75, 0)})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+import os
+import random
+import sys
+import tempfile
+sys.path.insert(0, "../src")
+from checkout import Checkout
+import pricingengine
+
+@unittest.skipIf(pricingengine.np is None, "numpy is not installed")
+class Test_PricingEngine(unittest.TestCase):
+    def setUp(self):
+        self.checkout = Checkout(None,
+                        {"A": [25, 3, 2, 0],
+                         "B": [40, 3, 0, 100],
+                         "P": [30, 1, 0, 0]
+                        })
+        self.engine = pricingengine.PricingEngine(self.checkout.getItemsCatalogue())
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            pricingengine.PricingEngine([1])
+        with self.assertRaises(ValueError):
+            pricingengine.PricingEngine({})
+
+    def test_price(self):
+        np = pricingengine.np
+        with self.assertRaises(TypeError):
+            self.engine.price(np.ones((2, 3)))
+        with self.assertRaises(ValueError):
+            self.engine.price(np.ones((2, 2), dtype=int))
+        with self.assertRaises(ValueError):
+            self.engine.price(-np.ones((2, 3), dtype=int))
+
+        rng = random.Random(4)
+        baskets = [{itemCode: rng.randrange(0, 50) for itemCode in "ABP"} for index in range(200)]
+        totalCost, savings = self.engine.price(self.engine.countMatrix(baskets))
+        for index, basket in enumerate(baskets):
+            self.checkout.clearBasket()
+            self.checkout.apply(basket)
+            self.assertTupleEqual((int(totalCost[index]), int(savings[index])), self.checkout.total())
+
+    def test_priceFile(self):
+        np = pricingengine.np
+        counts = np.arange(30, dtype=np.int64).reshape(10, 3)
+        expectedCost, expectedSavings = self.engine.price(counts)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "baskets.npy")
+            np.save(path, counts)
+            chunks = list(self.engine.priceFile(path, chunkSize=4))
+        self.assertEqual(len(chunks), 3)
+        self.assertListEqual(np.concatenate([cost for cost, _ in chunks]).tolist(), expectedCost.tolist())
+        self.assertListEqual(np.concatenate([saving for _, saving in chunks]).tolist(), expectedSavings.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
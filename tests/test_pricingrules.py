@@ -0,0 +1,109 @@
+import unittest
+import sys
+sys.path.insert(0, "../src")
+from checkout import Checkout
+from item import Item
+from pricingrules import MultibuyRule, BundleRule, PricingRules
+
+class Test_PricingRules(unittest.TestCase):
+    def setUp(self):
+        self.unitPrices = {"A": 25, "B": 40, "P": 30}
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            PricingRules([("A", 25)])
+        with self.assertRaises(ValueError):
+            PricingRules({})
+        with self.assertRaises(ValueError):
+            PricingRules({"A": 0})
+        with self.assertRaises(TypeError):
+            PricingRules(self.unitPrices, ["A"])
+        with self.assertRaises(ValueError):
+            PricingRules(self.unitPrices, [MultibuyRule("Z", 2, 10)])
+        with self.assertRaises(ValueError):
+            PricingRules(self.unitPrices, [BundleRule({"A": 1, "Z": 1}, 10)])
+        with self.assertRaises(TypeError):
+            MultibuyRule("A", 2., 10)
+        with self.assertRaises(ValueError):
+            MultibuyRule("A", 0, 10)
+        with self.assertRaises(ValueError):
+            BundleRule({"A": 0}, 10)
+        with self.assertRaises(ValueError):
+            BundleRule({}, 10)
+
+    def test_matchesGetMultibuyCost(self):
+        checkout = Checkout()
+        rules = PricingRules.fromItemsCatalogue(checkout.getItemsCatalogue())
+        for itemCode, item in checkout.getItemsCatalogue().items():
+            for count in range(50):
+                self.assertTupleEqual(rules.itemCost(itemCode, count), item.getMultibuyCost(count))
+
+        # Any single offer that is not dearer than the unit price
+        for price in [1, 7, 30]:
+            for groupSize in range(2, 6):
+                offers = [(offerOnPopulation, 0) for offerOnPopulation in range(groupSize)]
+                offers += [(0, offerOnPrice) for offerOnPrice in range(1, groupSize * price + 1, 5)]
+                for offerOnPopulation, offerOnPrice in offers:
+                    item = Item("A", price, groupSize, offerOnPopulation, offerOnPrice)
+                    rules = PricingRules.fromItemsCatalogue({"A": item})
+                    for count in range(20):
+                        self.assertTupleEqual(rules.itemCost("A", count), item.getMultibuyCost(count))
+
+    def test_itemCost(self):
+        # Tiered offers: the cheapest combination wins
+        rules = PricingRules(self.unitPrices, [MultibuyRule("A", 2, 45), MultibuyRule("A", 5, 100)])
+        with self.assertRaises(TypeError):
+            rules.itemCost("A", 1.)
+        with self.assertRaises(ValueError):
+            rules.itemCost("Z", 1)
+        with self.assertRaises(ValueError):
+            rules.itemCost("A", -1)
+        self.assertTupleEqual(rules.itemCost("A", 0), (0, 0))
+        self.assertTupleEqual(rules.itemCost("A", 1), (25, 0))
+        self.assertTupleEqual(rules.itemCost("A", 3), (70, 5))
+        self.assertTupleEqual(rules.itemCost("A", 5), (100, 25))
+        self.assertTupleEqual(rules.itemCost("A", 7), (145, 30))
+        # 2 for 45 beats 5 for 100 on 4 items, not on 10
+        self.assertTupleEqual(rules.itemCost("A", 4), (90, 10))
+        self.assertTupleEqual(rules.itemCost("A", 10), (200, 50))
+
+        # A dearer offer is never taken
+        rules = PricingRules(self.unitPrices, [MultibuyRule("P", 2, 70)])
+        self.assertTupleEqual(rules.itemCost("P", 4), (120, 0))
+
+    def test_cost(self):
+        # Meal deal competing with the multi-buy offer on bananas
+        rules = PricingRules.fromItemsCatalogue(Checkout().getItemsCatalogue(),
+                                                [BundleRule({"A": 1, "B": 1, "P": 1}, 80)])
+        with self.assertRaises(TypeError):
+            rules.cost(["A"])
+        with self.assertRaises(ValueError):
+            rules.cost({"Z": 1})
+        with self.assertRaises(ValueError):
+            rules.cost({"A": -1})
+        self.assertTupleEqual(rules.cost({}), (0, 0))
+        self.assertTupleEqual(rules.cost({"A": 1, "B": 1, "P": 1}), (80, 15))
+        # 3 bananas for 100 and one meal deal beat two meal deals
+        self.assertTupleEqual(rules.cost({"A": 2, "B": 4, "P": 2}), (235, 35))
+        self.assertTupleEqual(rules.cost({"A": 3, "B": 3, "P": 3}), (240, 45))
+        # The basket of a checkout can be priced directly
+        checkout = Checkout()
+        checkout.scanMany(["A", "B", "P", "P"])
+        self.assertTupleEqual(rules.cost(checkout.getBasket()), (110, 15))
+
+        # Without bundles the cost is the sum of the item costs
+        rules = PricingRules.fromItemsCatalogue(checkout.getItemsCatalogue())
+        self.assertTupleEqual(rules.cost(checkout.getBasket()), checkout.total())
+
+    def test_memo(self):
+        rules = PricingRules(self.unitPrices, [BundleRule({"A": 2, "P": 1}, 60), BundleRule({"A": 1, "B": 1}, 55)],
+                             maxMemoSize=10)
+        for count in range(30):
+            expected = rules.cost({"A": count, "B": count, "P": count})
+            self.assertTupleEqual(rules.cost({"A": count, "B": count, "P": count}), expected)
+        self.assertLessEqual(len(rules._bundleMemo), 10)
+        self.assertTupleEqual(rules.cost({"A": 3, "B": 1, "P": 1}), (115, 30))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import random
+import sys
+sys.path.insert(0, "../src")
+from rowallocator import RowAllocator
+
+class Test_RowAllocator(unittest.TestCase):
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            RowAllocator(1)
+        with self.assertRaises(ValueError):
+            RowAllocator("random")
+        with self.assertRaises(ValueError):
+            RowAllocator("insertion", 0)
+
+    def test_policies(self):
+        for policy, expected in [("firstFree", ["A", "D", "C"]), ("insertion", ["A", "C", "D"]),
+                                 ("recentFirst", ["D", "C", "A"])]:
+            rows = RowAllocator(policy)
+            for key in ["A", "B", "C"]:
+                rows.add(key)
+            rows.remove("B")
+            rows.add("D")
+            self.assertListEqual(rows.keys(), expected, policy)
+            self.assertListEqual([rows.keyAt(row) for row in range(len(rows))], expected, policy)
+            self.assertListEqual([rows.rowOf(key) for key in expected], [0, 1, 2], policy)
+            with self.assertRaises(ValueError):
+                rows.add("A")
+            with self.assertRaises(ValueError):
+                rows.remove("B")
+            with self.assertRaises(IndexError):
+                rows.keyAt(3)
+
+        rows = RowAllocator("insertion")
+        for key in ["A", "B", "C"]:
+            rows.add(key)
+        self.assertEqual(rows.touch("A"), 2)
+        self.assertListEqual(rows.keys(), ["B", "C", "A"])
+        rows = RowAllocator("recentFirst")
+        for key in ["A", "B", "C"]:
+            rows.add(key)
+        self.assertEqual(rows.touch("A"), 0)
+        self.assertListEqual(rows.keys(), ["A", "C", "B"])
+
+    def test_againstList(self):
+        # Random updates past the initial slots, checked against a list
+        random.seed(5)
+        for policy in RowAllocator.policies:
+            rows = RowAllocator(policy, 4)
+            model = []
+            for step in range(3000):
+                key = random.randrange(40)
+                if (key in rows):
+                    if (random.random() < 0.5):
+                        rows.remove(key)
+                        model.remove(key)
+                    else:
+                        row = rows.touch(key)
+                        if (policy != "firstFree"):
+                            model.remove(key)
+                            model.insert(0 if policy == "recentFirst" else len(model), key)
+                        self.assertEqual(row, model.index(key))
+                else:
+                    row = rows.add(key)
+                    if (policy == "recentFirst"):
+                        model.insert(0, key)
+                    elif (policy == "insertion"):
+                        model.append(key)
+                    else:
+                        model.insert(row, key)
+                    self.assertEqual(row, model.index(key))
+                self.assertEqual(len(rows), len(model))
+            self.assertListEqual(rows.keys(), model)
+            self.assertListEqual([rows.keyAt(row) for row in range(len(rows))], model)
+            rows.clear()
+            self.assertListEqual(rows.keys(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+import unittest
+import os
+import socket
+import sys
+import tempfile
+import time
+sys.path.insert(0, "../src")
+from checkout import Checkout
+from scannerinput import ScannerInput, ScanDecoder
+
+class FakeRoot():
+    """Stands in for the tkinter root: callbacks run when run() is called"""
+
+    def __init__(self):
+        self.callbacks = {}
+        self.nextId = 0
+
+    def after(self, delay, callback):
+        self.nextId += 1
+        self.callbacks[self.nextId] = callback
+        return self.nextId
+
+    def after_cancel(self, afterId):
+        del self.callbacks[afterId]
+
+    def run(self):
+        callbacks = self.callbacks
+        self.callbacks = {}
+        for callback in callbacks.values():
+            callback()
+
+class RecordingListener():
+    def __init__(self):
+        self.signals = 0
+
+    def slot(self, checkout, signalStrength="strong", changedItems=None):
+        self.signals += 1
+
+class Test_ScanDecoder(unittest.TestCase):
+    def test_feed(self):
+        decoder = ScanDecoder()
+        self.assertListEqual(decoder.feed(b"A\rB\r\nP\n\n  \r"), ["A", "B", "P"])
+        self.assertListEqual(decoder.feed(b"A"), [])
+        self.assertListEqual(decoder.feed(b"B\r"), ["AB"])
+        self.assertListEqual(decoder.feed(b"P"), [])
+        self.assertListEqual(decoder.flush(), ["P"])
+        self.assertListEqual(decoder.flush(), [])
+
+class Test_ScannerInput(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.checkout = Checkout()
+        self.listener = RecordingListener()
+        self.checkout.register(self.listener)
+        self.errors = []
+        self.scanner = ScannerInput(self.root, self.checkout, self.errors.append)
+
+    def tearDown(self):
+        self.scanner.stop()
+
+    def waitForScans(self, numberOfScans):
+        deadline = time.monotonic() + 5
+        while (self.scanner.numberOfScans + self.scanner.numberOfErrors < numberOfScans and time.monotonic() < deadline):
+            time.sleep(0.01)
+            self.root.run()
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            ScannerInput(None, self.checkout)
+        with self.assertRaises(TypeError):
+            ScannerInput(self.root, self.checkout, None, 1.5)
+        with self.assertRaises(ValueError):
+            ScannerInput(self.root, self.checkout, None, 0)
+        with self.assertRaises(TypeError):
+            self.scanner.start(5)
+
+    @unittest.skipUnless(hasattr(os, "mkfifo"), "named pipes are not available")
+    def test_fifo(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "scanner")
+            os.mkfifo(path)
+            self.scanner.start(path)
+            with self.assertRaises(RuntimeError):
+                self.scanner.start(path)
+
+            # A burst of 1000 scans, written by two scanner sessions
+            writer = os.open(path, os.O_WRONLY)
+            os.write(writer, b"A\r" * 600 + b"Z\r")
+            os.close(writer)
+            writer = os.open(path, os.O_WRONLY)
+            os.write(writer, b"B\r\n" * 300 + b"P\r\n" * 100)
+            os.close(writer)
+            self.waitForScans(1001)
+
+        self.assertDictEqual(self.checkout.getBasket(), {"A": 600, "B": 300, "P": 100})
+        self.assertListEqual(self.errors, ["Z"])
+        # Far fewer signals than scans
+        self.assertLess(self.listener.signals, 100)
+
+    def test_startError(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(FileNotFoundError):
+                self.scanner.start(os.path.join(directory, "no scanner"))
+        with socket.create_server(("127.0.0.1", 0)) as server:
+            address = server.getsockname()
+        with self.assertRaises(ConnectionRefusedError):
+            self.scanner.start(address)
+
+        # The scanner can be started again once the source exists
+        with socket.create_server(("127.0.0.1", 0)) as server:
+            self.scanner.start(server.getsockname())
+            connection, _ = server.accept()
+            with connection:
+                connection.sendall(b"B\r")
+                self.waitForScans(1)
+        self.assertEqual(self.checkout.getNumberOfItems("B"), 1)
+
+    def test_tcp(self):
+        with socket.create_server(("127.0.0.1", 0)) as server:
+            self.scanner.start(server.getsockname())
+            connection, _ = server.accept()
+            with connection:
+                connection.sendall(b"P\rP\r")
+                self.waitForScans(2)
+                self.assertEqual(self.checkout.getNumberOfItems("P"), 2)
+
+                # Scans wait in the queue while paused
+                self.scanner.paused = True
+                connection.sendall(b"A\r")
+                time.sleep(0.1)
+                self.root.run()
+                self.assertEqual(self.checkout.getNumberOfItems("A"), 0)
+                self.scanner.paused = False
+                self.waitForScans(3)
+                self.assertEqual(self.checkout.getNumberOfItems("A"), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import sys
+import tkinter as tk
+from types import SimpleNamespace
+sys.path.insert(0, "../src")
+from catalogue import Catalogue
+from checkout import Checkout
+from staffpage import StaffPage
+
+def setUpModule():
+    global root
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        raise unittest.SkipTest("no display is available")
+    root.withdraw()
+
+def tearDownModule():
+    root.destroy()
+
+class FakeCustomerPage():
+    def __init__(self, checkout):
+        self.root = root
+        self._checkout = checkout
+
+    def getPageName(self):
+        return "customerPage"
+
+    def getCheckout(self):
+        return self._checkout
+
+class Test_StaffPage(unittest.TestCase):
+    def setUp(self):
+        self.codes = ["SKU-{:03d}".format(index) for index in range(35)]
+        catalogue = Catalogue([{"code": itemCode, "name": "Item {}".format(index), "image": "",
+                                "price": 10, "multibuyMinimumPopulation": 1,
+                                "offerOnPopulation": 0, "offerOnPrice": 0} for index, itemCode in enumerate(self.codes)])
+        self.checkout = Checkout(None, catalogue)
+        self.checkout.scanMany([self.codes[30], self.codes[5], self.codes[5]])
+        try:
+            self.page = StaffPage(FakeCustomerPage(self.checkout), "abc")
+        except tk.TclError as error:
+            # e.g. the .ico icon or the grab on some window managers
+            self.skipTest("the staff page cannot be opened here: {}".format(error))
+
+    def tearDown(self):
+        self.page.destroy()
+
+    def _rows(self):
+        return list(self.page.dictItemControlsWidgets)
+
+    def test_open(self):
+        # Only the categories in the basket have a row
+        self.assertListEqual(self._rows(), [self.codes[30], self.codes[5]])
+        self.assertEqual(self.page.btnMoreItems.winfo_manager(), "grid")
+        row = self.page.dictItemControlsWidgets[self.codes[5]]
+        self.assertEqual(row.itemCard.itemPopulation, 2)
+
+        # The rows change the basket of the staff page
+        row._updateItemCount(1, "weak")
+        self.assertEqual(self.page._checkout.getNumberOfItems(self.codes[5]), 3)
+        self.assertEqual(self.checkout.getNumberOfItems(self.codes[5]), 2)
+
+    def test_moreRows(self):
+        self.page._addMoreRows()
+        self.assertEqual(len(self._rows()), 12)
+        self.assertListEqual(self._rows()[2:], self.codes[:5] + self.codes[6:11])
+        self.assertEqual(self.page.dictItemControlsWidgets[self.codes[0]].itemCard.itemPopulation, 0)
+
+        # The mouse wheel at the end of the list also adds rows
+        self.page.rowsCanvas.yview_moveto(1.)
+        self.page._onMouseWheel(SimpleNamespace(delta=-120))
+        self.assertEqual(len(self._rows()), 22)
+
+        # The button disappears once every item has a row
+        self.page._addMoreRows()
+        self.page._addMoreRows()
+        self.assertEqual(len(self._rows()), 35)
+        self.assertEqual(self.page.btnMoreItems.winfo_manager(), "")
+        self.page._addMoreRows()
+        self.assertEqual(len(self._rows()), 35)
+
+    def test_search(self):
+        self.page.entrySearch.insert(0, "sku-01")
+        self.page._onSearch()
+        self.assertListEqual(self._rows()[2:], self.codes[10:20])
+
+        # At most 10 items per search, one of which has a row already
+        self.page.entrySearch.delete(0, tk.END)
+        self.page.entrySearch.insert(0, "Item")
+        self.page._onSearch()
+        self.assertListEqual(self._rows()[12:], self.codes[:5] + self.codes[6:10])
+
+        # Rows of items already found are not created again
+        self.page.entrySearch.delete(0, tk.END)
+        self.page.entrySearch.insert(0, "Item 30")
+        self.page._onSearch()
+        self.assertEqual(len(self._rows()), 21)
+
+        # Paging skips the items found by the search
+        self.page._addMoreRows()
+        self.assertListEqual(self._rows()[21:], self.codes[20:30])
+
+
+if __name__ == '__main__':
+    unittest.main()
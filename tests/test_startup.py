@@ -0,0 +1,40 @@
+import unittest
+import os
+import subprocess
+import sys
+
+SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+def importedModules(statement):
+    """Return the names of the modules imported by statement in a fresh
+    interpreter, as reported by python -X importtime
+    """
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            cwd=SOURCE, capture_output=True, text=True, check=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if (line.startswith("import time:") and not "cumulative" in line):
+            modules.add(line.split("|")[-1].strip())
+    return modules
+
+class Test_Startup(unittest.TestCase):
+    def test_engineImports(self):
+        # Pricing and the headless mode must not load the GUI or the
+        # catalogue file formats
+        for module in ["checkout", "headless"]:
+            modules = importedModules("import " + module)
+            self.assertIn(module, modules)
+            for slowModule in ["tkinter", "imagecache", "sqlite3", "csv", "json"]:
+                self.assertNotIn(slowModule, modules, "import {} loads {}".format(module, slowModule))
+
+    def test_customerPageImports(self):
+        # The staff pages and the item cards are loaded on demand
+        modules = importedModules("import customerpage")
+        self.assertIn("customerpage", modules)
+        for lateModule in ["staffpage", "staffloginpopup", "staffpagecontrols", "basketview", "iteminfocard", "imagecache"]:
+            self.assertNotIn(lateModule, modules, "import customerpage loads {}".format(lateModule))
+
+
+if __name__ == '__main__':
+    unittest.main()
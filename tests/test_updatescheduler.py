@@ -0,0 +1,86 @@
+import unittest
+import sys
+sys.path.insert(0, "../src")
+from checkout import Checkout
+from updatescheduler import UpdateScheduler
+
+class FakeWidget():
+    def __init__(self):
+        self.callbacks = {}
+        self.delays = []
+
+    def after(self, delay, callback):
+        self.delays.append(delay)
+        self.callbacks[str(len(self.delays))] = callback
+        return str(len(self.delays))
+
+    def after_idle(self, callback):
+        return self.after("idle", callback)
+
+    def after_cancel(self, afterId):
+        del self.callbacks[afterId]
+
+    def runPending(self):
+        callbacks = list(self.callbacks.values())
+        self.callbacks = {}
+        for callback in callbacks:
+            callback()
+
+class RecordingListener():
+    def __init__(self):
+        self.signals = []
+
+    def slot(self, checkout, signalStrength="strong", changedItems=None):
+        self.signals.append((signalStrength, changedItems))
+
+class Test_UpdateScheduler(unittest.TestCase):
+    def setUp(self):
+        self.widget = FakeWidget()
+        self.checkout = Checkout()
+        self.listener = RecordingListener()
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            UpdateScheduler(None)
+        with self.assertRaises(TypeError):
+            UpdateScheduler(self.widget, 1.)
+        with self.assertRaises(ValueError):
+            UpdateScheduler(self.widget, -1)
+        with self.assertRaises(TypeError):
+            UpdateScheduler(self.widget).deferred(None)
+
+    def test_coalescing(self):
+        scheduler = UpdateScheduler(self.widget)
+        self.assertIs(scheduler.deferred(self.listener), scheduler.deferred(self.listener))
+        self.checkout.register(scheduler.deferred(self.listener))
+        self.checkout.scan("A", "weak")
+        self.checkout.scan("B", "strong")
+        self.checkout.scan("A", "weak")
+        self.assertListEqual(self.listener.signals, [])
+        self.assertListEqual(self.widget.delays, [16])
+        self.widget.runPending()
+        self.assertListEqual(self.listener.signals, [("strong", frozenset("AB"))])
+
+        self.checkout.scan("P", "weak")
+        self.checkout.signal("weak")
+        self.checkout.scan("A", "weak")
+        self.widget.runPending()
+        self.assertListEqual(self.listener.signals[1:], [("weak", None)])
+
+    def test_flush(self):
+        scheduler = UpdateScheduler(self.widget, 0)
+        self.checkout.register(scheduler.deferred(self.listener))
+        self.checkout.scan("A")
+        self.assertListEqual(self.widget.delays, ["idle"])
+        scheduler.flush()
+        self.assertListEqual(self.listener.signals, [("strong", frozenset("A"))])
+        self.assertDictEqual(self.widget.callbacks, {})
+
+        self.checkout.scan("A")
+        scheduler.cancel()
+        scheduler.flush()
+        self.assertEqual(len(self.listener.signals), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()